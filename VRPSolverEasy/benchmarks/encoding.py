@@ -0,0 +1,98 @@
+""" This module measures the time and the size of the json given to
+the solver for the largest instances of the demos """
+
+import os
+import sys
+import time
+import getopt
+from VRPSolverEasy.src import geometry, solver
+from VRPSolverEasy.demos import CVRP, CVRPTW
+
+PATH_DATA = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                         os.path.normpath("../demos/data"))
+
+
+def largest_instances(folder, nb_instances):
+    """Return the paths of the largest files of a folder in demos/data"""
+    path_folder = os.path.join(PATH_DATA, folder)
+    paths = [os.path.join(path_folder, name)
+             for name in os.listdir(path_folder)
+             if not name.startswith("__")]
+    paths.sort(key=os.path.getsize, reverse=True)
+    return paths[:nb_instances]
+
+
+def build_cvrp(path):
+    """Build the model of the CVRP demo"""
+    data = CVRP.read_cvrp_instances(path)
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           max_number=data.nb_customers,
+                           capacity=data.vehicle_capacity, var_cost_dist=1)
+    model.add_depot(id=0)
+    for i in range(data.nb_customers):
+        model.add_customer(id=i + 1, demand=data.cust_demands[i])
+    model.add_links_from_matrix(geometry.distance_matrix(
+        [data.depot_coordinates] + data.cust_coordinates, rounding="round",
+        number_digit=0))
+    return model
+
+
+def build_cvrptw(path):
+    """Build the model of the CVRPTW demo"""
+    data = CVRPTW.read_cvrptw_instances(path)
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           max_number=data.max_number,
+                           capacity=data.vehicle_capacity,
+                           tw_begin=data.depot_tw_begin,
+                           tw_end=data.depot_tw_end, var_cost_dist=1)
+    model.add_depot(id=0, service_time=data.depot_service_time,
+                    tw_begin=data.depot_tw_begin, tw_end=data.depot_tw_end)
+    for i in range(data.nb_customers):
+        model.add_customer(id=i + 1, service_time=data.cust_service_time[i],
+                           tw_begin=data.cust_tw_begin[i],
+                           tw_end=data.cust_tw_end[i],
+                           demand=data.cust_demands[i])
+    matrix = geometry.distance_matrix(
+        [data.depot_coordinates] + data.cust_coordinates, rounding="round")
+    model.add_links_from_matrix(matrix, time=matrix)
+    return model
+
+
+def run_benchmark(nb_instances=2):
+    """Print the time and the size of the pretty json used before and of
+    the compact json given now to the solver"""
+    print(f"{'instance':<16}{'links':>8}{'pretty (s)':>12}{'pretty (MB)':>13}"
+          f"{'compact (s)':>13}{'compact (MB)':>14}{'cached (s)':>12}")
+    results = []
+    for folder, build in (("CVRP", build_cvrp), ("CVRPTW", build_cvrptw)):
+        for path in largest_instances(folder, nb_instances):
+            model = build(path)
+            start = time.perf_counter()
+            pretty = str(model).encode('UTF-8')
+            time_pretty = time.perf_counter() - start
+            start = time.perf_counter()
+            compact = model.get_json()
+            time_compact = time.perf_counter() - start
+            model.parameters.time_limit += 1
+            start = time.perf_counter()
+            model.get_json()
+            time_cached = time.perf_counter() - start
+            results.append((os.path.basename(path), len(pretty),
+                            len(compact)))
+            print(f"{os.path.basename(path):<16}"
+                  f"{len(model.links.values()):>8}"
+                  f"{time_pretty:>12.4f}{len(pretty) / 1e6:>13.3f}"
+                  f"{time_compact:>13.4f}{len(compact) / 1e6:>14.3f}"
+                  f"{time_cached:>12.4f}")
+    return results
+
+
+if __name__ == "__main__":
+    NB_INSTANCES = 2
+    opts = getopt.getopt(sys.argv[1:], "n:")
+    for opt, arg in opts[0]:
+        if opt in ["-n"]:
+            NB_INSTANCES = int(arg)
+    run_benchmark(NB_INSTANCES)
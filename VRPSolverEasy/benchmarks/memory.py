@@ -0,0 +1,89 @@
+""" This module measures the memory used by the points and links
+of a model """
+
+import sys
+import getopt
+import tracemalloc
+from VRPSolverEasy.src import solver
+
+
+class DictLink(solver.Link):
+    """Link keeping its attributes in a __dict__, as before the
+    introduction of __slots__"""
+
+
+class DictPoint(solver.Point):
+    """Point keeping its attributes in a __dict__, as before the
+    introduction of __slots__"""
+
+
+def measure(build):
+    """Return the number of bytes allocated by build and still in use,
+    and the object returned by build"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def links_objects(link_class, nb_points):
+    """Build one link object for each pair of points"""
+    return [link_class(i, j, distance=float(i + j), time=float(i + j))
+            for i in range(nb_points) for j in range(i + 1, nb_points)]
+
+
+def links_model(nb_points):
+    """Build a model with one link for each pair of points with add_link"""
+    model = solver.Model()
+    for i in range(nb_points):
+        for j in range(i + 1, nb_points):
+            model.add_link(start_point_id=i, end_point_id=j,
+                           distance=float(i + j), time=float(i + j))
+    return model
+
+
+def links_model_matrix(nb_points):
+    """Build a model with one link for each pair of points with
+    add_links_from_matrix"""
+    model = solver.Model()
+    matrix = [[float(i + j) for j in range(nb_points)]
+              for i in range(nb_points)]
+    model.add_links_from_matrix(matrix, time=matrix)
+    return model
+
+
+def run_benchmark(nb_points=300):
+    """Print the number of bytes used by a link and a point"""
+    nb_links = nb_points * (nb_points - 1) // 2
+    results = []
+    for name, build in (
+            ("Link with __dict__", lambda: links_objects(DictLink, nb_points)),
+            ("Link with __slots__",
+             lambda: links_objects(solver.Link, nb_points)),
+            ("Model.add_link", lambda: links_model(nb_points)),
+            ("Model.add_links_from_matrix",
+             lambda: links_model_matrix(nb_points))):
+        size = measure(build)[0]
+        results.append((name, size / nb_links))
+
+    for name, point_class in (("Point with __dict__", DictPoint),
+                              ("Point with __slots__", solver.Point)):
+        size = measure(lambda: [point_class(i, demand=i, tw_end=100)
+                                for i in range(nb_points)])[0]
+        results.append((name, size / nb_points))
+
+    print(f"Memory used for {nb_points} points and {nb_links} links")
+    for name, bytes_per_object in results:
+        print(f"{name:<30} : {bytes_per_object:8.1f} bytes")
+    return results
+
+
+if __name__ == "__main__":
+    NB_POINTS = 300
+    opts = getopt.getopt(sys.argv[1:], "n:")
+    for opt, arg in opts[0]:
+        if opt in ["-n"]:
+            NB_POINTS = int(arg)
+    run_benchmark(NB_POINTS)
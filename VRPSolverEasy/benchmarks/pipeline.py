@@ -0,0 +1,84 @@
+""" This module measures the python side of Model.solve() on many small
+models, the native library is replaced by a stand-in backend """
+
+import sys
+import json
+import time
+import getopt
+import random
+from VRPSolverEasy.src import solver, constants
+
+
+class StandInBackend:
+    """Backend returning one route per customer without solving"""
+
+    def solve(self, payload):
+        """Return the output of bapcod for the routes depot-customer-depot"""
+        model = json.loads(payload)
+        vehicle_type = model["VehicleTypes"][0]
+        depot = vehicle_type["startPointId"]
+        routes = [{"vehicleTypeId": vehicle_type["id"], "routeCost": 0,
+                   "visitedPoints": [
+                       {"pointId": point_id, "pointName": "", "load": 0,
+                        "endTime": 0, "incomingArcName": ""}
+                       for point_id in (depot, point["id"], depot)]}
+                  for point in model["Points"] if "idCustomer" in point]
+        return json.dumps({
+            "Status": {"code": constants.OPTIMAL_SOL_FOUND,
+                       "message": "OPTIMAL_SOL_FOUND"},
+            "Solution": {"bestSolutionValue": 0, "Routes": routes},
+            "Statistics": {"solutionTime": 0, "solutionValue": 0,
+                           "bestLB": 0, "rootLB": 0, "rootTime": 0,
+                           "nbBranchAndBoundNodes": 0}}).encode('UTF-8')
+
+
+def build_model(nb_customers, rand):
+    """Build a random cvrp model"""
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           max_number=nb_customers, capacity=100,
+                           var_cost_dist=1)
+    model.add_depot(id=0)
+    coordinates = [(rand.uniform(0, 100), rand.uniform(0, 100))
+                   for _ in range(nb_customers + 1)]
+    for i in range(1, nb_customers + 1):
+        model.add_customer(id=i, demand=rand.randint(1, 30))
+    model.add_links_from_matrix(
+        [[((x_i - x_j)**2 + (y_i - y_j)**2)**0.5 for x_j, y_j in coordinates]
+         for x_i, y_i in coordinates])
+    return model
+
+
+def run_benchmark(nb_models=1000, nb_customers=10):
+    """Print the time of solving nb_models small models with the
+    stand-in backend and the loading time of the native library"""
+    try:
+        print(f"native library loaded in "
+              f"{solver.NativeBackend().load_time:.4f} s")
+    except solver.ModelError:
+        print("native library not found")
+    rand = random.Random(0)
+    models = [build_model(nb_customers, rand) for _ in range(nb_models)]
+    solver.set_backend(StandInBackend())
+    try:
+        start = time.perf_counter()
+        for model in models:
+            model.solve()
+        elapsed = time.perf_counter() - start
+    finally:
+        solver.set_backend(None)
+    print(f"{nb_models} models of {nb_customers} customers solved in "
+          f"{elapsed:.4f} s ({nb_models / elapsed:.0f} models per second)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    NB_MODELS = 1000
+    NB_CUSTOMERS = 10
+    opts = getopt.getopt(sys.argv[1:], "n:c:")
+    for opt, arg in opts[0]:
+        if opt in ["-n"]:
+            NB_MODELS = int(arg)
+        elif opt in ["-c"]:
+            NB_CUSTOMERS = int(arg)
+    run_benchmark(NB_MODELS, NB_CUSTOMERS)
@@ -0,0 +1,57 @@
+""" This module compares the python side of Model.solve() with all links
+and with the links given by Model.sparsify_links(), the native library is
+replaced by a stand-in backend """
+
+import sys
+import time
+import getopt
+import random
+from VRPSolverEasy.src import solver
+from VRPSolverEasy.benchmarks.pipeline import StandInBackend, build_model
+
+
+def measure(nb_customers, nb_nearest=None):
+    """Return the times of building, sparsifying, serializing and solving
+    a random model, the size of its payload and its number of links"""
+    start = time.perf_counter()
+    model = build_model(nb_customers, random.Random(0))
+    build_time = time.perf_counter() - start
+    sparsify_time = 0
+    if nb_nearest is not None:
+        sparsify_time = model.sparsify_links(nb_nearest).time
+    start = time.perf_counter()
+    payload = model.get_json()
+    serialize_time = time.perf_counter() - start
+    solver.set_backend(StandInBackend())
+    try:
+        start = time.perf_counter()
+        model.solve()
+        solve_time = time.perf_counter() - start
+    finally:
+        solver.set_backend(None)
+    return (build_time, sparsify_time, serialize_time, solve_time,
+            len(payload), len(model.links))
+
+
+def run_benchmark(nb_customers=1000, nb_nearest=10):
+    """Print the measures with all links and with sparse links"""
+    print(f"{nb_customers} customers, {nb_nearest} nearest neighbors")
+    for name, k in (("all links", None), ("sparse", nb_nearest)):
+        (build_time, sparsify_time, serialize_time, solve_time, size,
+         nb_links) = measure(nb_customers, k)
+        print(f"{name:>10}: {nb_links} links, build {build_time:.3f} s, "
+              f"sparsify {sparsify_time:.3f} s, "
+              f"serialize {serialize_time:.3f} s ({size / 2**20:.2f} MB), "
+              f"solve {solve_time:.3f} s")
+
+
+if __name__ == "__main__":
+    NB_CUSTOMERS = 1000
+    NB_NEAREST = 10
+    opts = getopt.getopt(sys.argv[1:], "c:k:")
+    for opt, arg in opts[0]:
+        if opt in ["-c"]:
+            NB_CUSTOMERS = int(arg)
+        elif opt in ["-k"]:
+            NB_NEAREST = int(arg)
+    run_benchmark(NB_CUSTOMERS, NB_NEAREST)
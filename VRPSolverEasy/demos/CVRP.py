@@ -1,11 +1,10 @@
 """ This module allows to solve CVRPLIB instances of
 Capacitated Vehicle Routing Problem """
 
-import os
-import math
 import sys
 import getopt
-from VRPSolverEasy.src import solver
+from VRPSolverEasy.src import geometry, solver
+from VRPSolverEasy.io import readers
 
 
 class DataCvrp:
@@ -26,21 +25,6 @@ class DataCvrp:
         self.depot_coordinates = depot_coordinates
 
 
-def compute_euclidean_distance(x_i, y_i, x_j, y_j, number_digit=3):
-    """Compute the euclidean distance between 2 points from graph"""
-    return round(math.sqrt((x_i - x_j)**2 +
-                           (y_i - y_j)**2), number_digit)
-
-
-def read_instance(name: str):
-    """ Read an instance in the folder data from a given name """
-
-    with open(
-            os.path.normpath(name),
-            "r", encoding="UTF-8") as file:
-        return [str(element) for element in file.read().split()]
-
-
 def solve_demo(instance_name,
                time_resolution=30,
                solver_name_input="CLP",
@@ -86,31 +70,11 @@ def solve_demo(instance_name,
                            demand=data.cust_demands[i]
                            )
 
-    # Compute the links between depot and other points
-    for i,cust_i in enumerate(data.cust_coordinates):
-        dist = compute_euclidean_distance(cust_i[0],
-                                          cust_i[1],
-                                          data.depot_coordinates[0],
-                                          data.depot_coordinates[1],
-                                          0)
-
-        model.add_link(start_point_id=0,
-                       end_point_id=i + 1,
-                       distance=dist
-                       )
-
-    # Compute the links between points
-    for i,cust_i in enumerate(data.cust_coordinates):
-        for j in range(i + 1, len(data.cust_coordinates)):
-            dist = compute_euclidean_distance(cust_i[0],
-                                              cust_i[1],
-                                              data.cust_coordinates[j][0],
-                                              data.cust_coordinates[j][1],
-                                              0)
-            model.add_link(start_point_id=i + 1,
-                           end_point_id=j + 1,
-                           distance=dist
-                           )
+    # Compute the links between all points (the depot is the point 0)
+    coordinates = [data.depot_coordinates] + data.cust_coordinates
+    model.add_links_from_matrix(
+        geometry.packed_distances(coordinates, rounding="round",
+                                  number_digit=0))
 
     # set parameters
     model.set_parameters(time_limit=time_resolution,
@@ -158,76 +122,15 @@ def read_cvrp_instances(instance_full_path):
     """Read literature instances from CVRPLIB by giving the name of instance
        and returns dictionary containing all elements of model"""
 
-    instance_iter = iter(
-        read_instance(instance_full_path))
-
-    id_point = 0
-    dimension_input = -1
-    capacity_input = -1
-
-    while True:
-        element = next(instance_iter)
-        if element == "DIMENSION":
-            next(instance_iter)  # pass ":"
-            dimension_input = int(next(instance_iter))
-        elif element == "CAPACITY":
-            next(instance_iter)  # pass ":"
-            capacity_input = int(next(instance_iter))
-        elif element == "EDGE_WEIGHT_TYPE":
-            next(instance_iter)  # pass ":"
-            element = next(instance_iter)
-            if element != "EUC_2D":
-                raise Exception("EDGE_WEIGHT_TYPE : " + element + """
-                is not supported (only EUC_2D)""")
-        elif element == "NODE_COORD_SECTION":
-            break
-
-    vehicle_capacity = capacity_input
-
-    # get demands and coordinates
-    cust_coordinates = []
-    depot_coordinates = []
-
-    for current_id in range(dimension_input):
-        point_id = int(next(instance_iter))
-        if point_id != current_id + 1:
-            raise Exception("Unexpected index")
-        x_coord = float(next(instance_iter))
-        y_coord = float(next(instance_iter))
-        if id_point == 0:
-            depot_coordinates = [x_coord, y_coord]
-        else:
-            cust_coordinates.append([x_coord, y_coord])
-        id_point += 1
-
-    element = next(instance_iter)
-    if element != "DEMAND_SECTION":
-        raise Exception("Expected line DEMAND_SECTION")
-
-    # Get the demands
-    cust_demands = []
-    for current_id in range(dimension_input):
-        point_id = int(next(instance_iter))
-        if point_id != current_id + 1:
-            raise Exception("Unexpected index")
-        demand = int(next(instance_iter))
-        if current_id > 0:
-            cust_demands.append(demand)
-
-    element = next(instance_iter)
-    if element != "DEPOT_SECTION":
-        raise Exception("Expected line DEPOT_SECTION")
-    next(instance_iter)  # pass id depot
-
-    end_depot_section = int(next(instance_iter))
-    if end_depot_section != -1:
+    instance = readers.read_cvrplib(instance_full_path)
+    if instance.nb_depots != 1:
         raise Exception("Expected only one depot.")
 
-    return DataCvrp(vehicle_capacity,
-                    dimension_input - 1,
-                    cust_demands,
-                    cust_coordinates,
-                    depot_coordinates
+    return DataCvrp(int(instance.vehicle_capacities[0]),
+                    instance.nb_customers,
+                    instance.demands.tolist(),
+                    instance.coordinates.tolist(),
+                    instance.depot_coordinates[0].tolist()
                     )
 
 
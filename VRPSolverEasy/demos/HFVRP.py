@@ -1,11 +1,10 @@
 """ This module allows to solve Queiroga instances of
 Heterogeneous Fleet Vehicle Routing Problem """
 
-import os
-import math
 import sys
 import getopt
-from VRPSolverEasy.src import solver
+from VRPSolverEasy.src import geometry, solver
+from VRPSolverEasy.io import readers
 
 
 class DataHfvrp:
@@ -34,19 +33,6 @@ class DataHfvrp:
         self.depot_coordinates = depot_coordinates
 
 
-def compute_euclidean_distance(x_i, y_i, x_j, y_j, number_digit=3):
-    """Compute the euclidean distance between 2 points from graph"""
-    return round(math.sqrt((x_i - x_j)**2 +
-                           (y_i - y_j)**2), number_digit)
-
-
-def read_instance(name: str):
-    """ Read an instance in the folder data from a given name """
-    with open(
-            os.path.normpath(name),
-            "r", encoding="UTF-8") as file:
-        return [str(element) for element in file.read().split()]
-
 def solve_demo(instance_name,
                time_resolution=30,
                solver_name_input="CLP",
@@ -106,28 +92,10 @@ def solve_demo(instance_name,
                            demand=data.cust_demands[i]
                            )
 
-    # Compute the links between depot and other points
-    for i,cust_i in enumerate(data.cust_coordinates):
-        dist = compute_euclidean_distance(cust_i[0],
-                                          cust_i[1],
-                                          data.depot_coordinates[0],
-                                          data.depot_coordinates[1])
-        model.add_link(start_point_id=0,
-                       end_point_id=i + 1,
-                       distance=dist
-                       )
-
-    # Compute the links between points
-    for i,cust_i in enumerate(data.cust_coordinates):
-        for j in range(i + 1, len(data.cust_coordinates)):
-            dist = compute_euclidean_distance(cust_i[0],
-                                              cust_i[1],
-                                              data.cust_coordinates[j][0],
-                                              data.cust_coordinates[j][1])
-            model.add_link(start_point_id=i + 1,
-                           end_point_id=j + 1,
-                           distance=dist
-                           )
+    # Compute the links between all points (the depot is the point 0)
+    coordinates = [data.depot_coordinates] + data.cust_coordinates
+    model.add_links_from_matrix(
+        geometry.packed_distances(coordinates, rounding="round"))
 
     # set parameters
     model.set_parameters(time_limit=time_resolution,
@@ -153,147 +121,23 @@ def solve_demo(instance_name,
 def read_hfvrp_classic_instances(instance_full_path):
     """Read literature instances of HFVRP by giving the name of instance
         and returns dictionary containing all elements of model"""
-    instance_iter = iter(
-        read_instance(instance_full_path))
-
-    nb_points = int(next(instance_iter))
-
-    next(instance_iter)  # pass id depot (always 0)
-    depot_x = int(next(instance_iter))
-    depot_y = int(next(instance_iter))
-    next(instance_iter) #depot demand
-    id_point = 0
-
-    # get demands and coordinates
-    cust_coordinates = []
-    cust_demands = []
-    depot_coordinates = [depot_x, depot_y]
-
-    for _ in range(nb_points):
-        id_point += 1
-        next(instance_iter)  # pass id point (take index)
-        x_coord = float(next(instance_iter))
-        y_coord = float(next(instance_iter))
-        demand = int(next(instance_iter))
-        cust_coordinates.append([x_coord, y_coord])
-        cust_demands.append(demand)
-
-    nb_vehicles = int(next(instance_iter))
-
-    vehicle_capacities = []
-    vehicle_fixed_costs = []
-    vehicle_var_costs = []
-    vehicle_max_numbers = []
-
-    for _ in range(1, nb_vehicles + 1):
-        capacity = int(next(instance_iter))
-        fixed_cost = float(next(instance_iter))
-        var_cost_dist = float(next(instance_iter))
-        next(instance_iter)  # pass min number
-        max_number = int(next(instance_iter))
-
-        vehicle_capacities.append(capacity)
-        vehicle_fixed_costs.append(fixed_cost)
-        vehicle_var_costs.append(var_cost_dist)
-        vehicle_max_numbers.append(max_number)
-
-    return DataHfvrp(nb_points,
-                     nb_vehicles,
-                     vehicle_capacities,
-                     vehicle_fixed_costs,
-                     vehicle_var_costs,
-                     vehicle_max_numbers,
-                     cust_demands,
-                     cust_coordinates,
-                     depot_coordinates
-                     )
+    return _data_hfvrp(readers.read_golden(instance_full_path))
 
 def read_hfvrp_XH_instances(instance_full_path):
     """Read new format instances of HFVRP by giving the path of the instance
        and returns a DataHfvrp object containing all elements of the model."""
-    
-    with open(instance_full_path, 'r') as f:
-        lines = f.readlines()
-
-    vehicle_capacities = []
-    vehicle_fixed_costs = []
-    vehicle_var_costs = []
-    vehicle_max_numbers = []
-    cust_coordinates = []
-    cust_demands = []
-    depot_coordinates = None
-
-    reading_section = None
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith("NAME") or line.startswith("COMMENT") or line.startswith("TYPE") or line.startswith("EDGE_WEIGHT_TYPE"):
-            continue
-        elif line.startswith("DIMENSION"):
-            nb_points = int(line.split(":")[1].strip()) - 1 
-        elif line.startswith("VEHICLE_KINDS"):
-            nb_vehicle_types = int(line.split(":")[1].strip())
-        elif line.startswith("CAPACITIES"):
-            reading_section = "CAPACITIES"
-            continue
-        elif line.startswith("FIXED_COSTS"):
-            reading_section = "FIXED_COSTS"
-            continue
-        elif line.startswith("VARIABLE_COSTS"):
-            reading_section = "VARIABLE_COSTS"
-            continue
-        elif line.startswith("NUMBER_OF_VEHICLES"):
-            reading_section = "NUMBER_OF_VEHICLES"
-            continue
-        elif line.startswith("NODE_COORD_SECTION"):
-            reading_section = "NODE_COORD_SECTION"
-            continue
-        elif line.startswith("DEMAND_SECTION"):
-            reading_section = "DEMAND_SECTION"
-            continue
-        elif line.startswith("DEPOT_SECTION"):
-            reading_section = "DEPOT_SECTION"
-            continue
-        elif line.startswith("EOF"):
-            break
-
-        if reading_section == "CAPACITIES":
-            vehicle_capacities = list(map(int, line.split()))
-        elif reading_section == "FIXED_COSTS":
-            vehicle_fixed_costs = list(map(float, line.split()))
-        elif reading_section == "VARIABLE_COSTS":
-            vehicle_var_costs = list(map(float, line.split()))
-        elif reading_section == "NUMBER_OF_VEHICLES":
-            vehicle_max_numbers = list(map(int, line.split()))
-        elif reading_section == "NODE_COORD_SECTION":
-            parts = line.split()
-            node_id = int(parts[0]) - 1  # Adjusting index to start from 0
-            x_coord = float(parts[1])
-            y_coord = float(parts[2])
-            if node_id == 0:
-                depot_coordinates = [x_coord, y_coord]
-            else:
-                cust_coordinates.append([x_coord, y_coord])
-        elif reading_section == "DEMAND_SECTION":
-            parts = line.split()
-            node_id = int(parts[0]) - 1  # Adjusting index to start from 0
-            demand = int(parts[1])
-            if node_id != 0:
-                cust_demands.append(demand)
-        elif reading_section == "DEPOT_SECTION":
-            depot_id = int(line) - 1  # Adjusting index to start from 0
-            if depot_id == -2:  # Depot end signal
-                break
-
-    return DataHfvrp(nb_points,
-                     nb_vehicle_types,
-                     vehicle_capacities,
-                     vehicle_fixed_costs,
-                     vehicle_var_costs,
-                     vehicle_max_numbers,
-                     cust_demands,
-                     cust_coordinates,
-                     depot_coordinates
+    return _data_hfvrp(readers.read_cvrplib(instance_full_path))
+
+def _data_hfvrp(instance):
+    return DataHfvrp(instance.nb_customers,
+                     instance.nb_vehicle_types,
+                     instance.vehicle_capacities.tolist(),
+                     instance.vehicle_fixed_costs.tolist(),
+                     instance.vehicle_var_costs.tolist(),
+                     instance.vehicle_max_numbers.tolist(),
+                     instance.demands.tolist(),
+                     instance.coordinates.tolist(),
+                     instance.depot_coordinates[0].tolist()
                      )
 
 
@@ -1,11 +1,10 @@
 """ This module allows to solve Cordeau’s instances of
 Multi Depot Vehicle Routing Problem """
 
-import os
-import math
 import sys
 import getopt
-from VRPSolverEasy.src import solver
+from VRPSolverEasy.src import geometry, solver
+from VRPSolverEasy.io import readers
 
 
 class DataMdvrp:
@@ -28,21 +27,6 @@ class DataMdvrp:
         self.depot_coordinates = depot_coordinates
 
 
-def compute_euclidean_distance(x_i, y_i, x_j, y_j, number_digit=3):
-    """Compute the euclidean distance between 2 points from graph"""
-    return round(math.sqrt((x_i - x_j)**2 +
-                           (y_i - y_j)**2), number_digit)
-
-
-def read_instance(name: str):
-    """ Read an instance in the folder data from a given name """
-
-    with open(
-            os.path.normpath(name),
-            "r", encoding="UTF-8") as file:
-        return [str(element) for element in file.read().split()]
-
-
 def solve_demo(instance_name,
                time_resolution=30,
                solver_name_input="CLP",
@@ -95,32 +79,20 @@ def solve_demo(instance_name,
 
 
 
-    nb_link = 0
-
     # Compute the links between depots and other points
-    for index,coord_depot in enumerate(data.depot_coordinates):
-        for i, cust_i in enumerate(data.cust_coordinates):
-            dist = compute_euclidean_distance(
-                cust_i[0],
-                cust_i[1],
-                coord_depot[0],
-                coord_depot[1])
+    depot_distances = geometry.distance_matrix(data.depot_coordinates,
+                                               data.cust_coordinates,
+                                               rounding="round")
+    for index, distances in enumerate(depot_distances.tolist()):
+        for i, dist in enumerate(distances):
             model.add_link(start_point_id=index+data.nb_customers,
                            end_point_id=i,
                            distance=dist
                            )
 
     # Compute the links between points
-    for i,cust_i in enumerate(data.cust_coordinates):
-        for j in range(i + 1, len(data.cust_coordinates)):
-            dist = compute_euclidean_distance(cust_i[0],
-                                              cust_i[1],
-                                              data.cust_coordinates[j][0],
-                                              data.cust_coordinates[j][1])
-            model.add_link(start_point_id=i,
-                           end_point_id=j,
-                           distance=dist
-                           )
+    model.add_links_from_matrix(
+        geometry.packed_distances(data.cust_coordinates, rounding="round"))
 
     # set parameters
     model.set_parameters(time_limit=time_resolution,
@@ -145,55 +117,14 @@ def solve_demo(instance_name,
 def read_mdvrp_instances(instance_full_path):
     """Read literature instances of MDVRP by giving the name of instance
         and returns dictionary containing all elements of model"""
-    instance_iter = iter(
-        read_instance(instance_full_path))
-
-    # pass type instance
-    next(instance_iter)
-
-    next(instance_iter)
-
-    nb_customers = int(next(instance_iter))
-    nb_depots = int(next(instance_iter))
-
-    vehicle_capacities = []
-    for _ in range(nb_depots):
-        # pass max duration
-        next(instance_iter)
-        vehicle_capacities.append(int(next(instance_iter)))
-
-    cust_demands = []
-    cust_coordinates = []
-    for _ in range(nb_customers):
-        next(instance_iter)
-        cust_x = int(next(instance_iter))
-        cust_y = int(next(instance_iter))
-        cust_coordinates.append([cust_x, cust_y])
-        # pass duration
-        next(instance_iter)
-
-        cust_demand = int(next(instance_iter))
-        cust_demands.append(cust_demand)
-        for _ in range(6):
-            next(instance_iter)
-
-    depot_coordinates = []
-    # add depots and vehicle types
-    for _ in range(nb_depots):
-        next(instance_iter)
-        cust_x = int(next(instance_iter))
-        cust_y = int(next(instance_iter))
-        depot_coordinates.append([cust_x, cust_y])
-
-        for _ in range(4):
-            next(instance_iter)
-
-    return DataMdvrp(nb_customers,
-                     nb_depots,
-                     vehicle_capacities[0],
-                     cust_demands,
-                     cust_coordinates,
-                     depot_coordinates
+    instance = readers.read_cordeau(instance_full_path)
+
+    return DataMdvrp(instance.nb_customers,
+                     instance.nb_depots,
+                     int(instance.vehicle_capacities[0]),
+                     instance.demands.tolist(),
+                     instance.coordinates.tolist(),
+                     instance.depot_coordinates.tolist()
                      )
 
 
@@ -1,11 +1,11 @@
 """ This module allows to solve instances of
 a Rich Vehicle Routing Problem """
 
-import os
 import math
 import sys
 import getopt
 from VRPSolverEasy.src import solver
+from VRPSolverEasy.io import readers
 
 class Depot:
     def __init__(self, id, x, y, tw_begin, tw_end):
@@ -72,13 +72,6 @@ def compute_euclidean_distance(x_i, y_i, x_j, y_j, number_digit=3):
     return round(math.sqrt((x_i - x_j)**2 +
                            (y_i - y_j)**2), number_digit)
 
-def read_instance(name: str):
-    """ Read an instance in the folder data from a given name """
-    with open(
-            os.path.normpath(name),
-            "r", encoding="UTF-8") as file:
-        return [str(element) for element in file.read().split()]
-
 def solve_demo(instance_name,
                time_resolution=30,
                solver_name_input="CLP",
@@ -217,56 +210,36 @@ def solve_demo(instance_name,
 def read_richvrp_instance(instance_full_path):
     """Read instance of RichVRP by giving the name of instance
         and returns dictionary containing all elements of model"""
-    instance_iter = iter(
-        read_instance(instance_full_path))
-
-    nb_depots = int(next(instance_iter))
-
-    # Read depots
-    depots = []
-    for _ in range(nb_depots):
-        id = int(next(instance_iter))
-        x = int(next(instance_iter))
-        y = int(next(instance_iter))
-        tw_begin = int(next(instance_iter))
-        tw_end = int(next(instance_iter))
-        depots.append(Depot(id, x, y, tw_begin, tw_end))
-
-    # Read big vehicle
-    capacity_big_veh = int(next(instance_iter))
-    fixed_cost_big_veh = int(next(instance_iter))
-    var_cost_big_veh = float(next(instance_iter))
-    max_numb_big_veh = int(next(instance_iter))
-    big_vehicle = Vehicle(capacity_big_veh, fixed_cost_big_veh, var_cost_big_veh, max_numb_big_veh)
-
-    # Read small vehicle
-    capacity_small_veh = int(next(instance_iter))
-    fixed_cost_small_veh = int(next(instance_iter))
-    var_cost_small_veh = float(next(instance_iter))
-    max_numb_small_veh = int(next(instance_iter))
-    small_vehicle = Vehicle(capacity_small_veh, fixed_cost_small_veh, var_cost_small_veh, max_numb_small_veh)
-
-    # Read customers
-    nb_customers = int(next(instance_iter))
+    instance = readers.read_richvrp(instance_full_path)
+
+    depots = [Depot(*values) for values in zip(
+        instance.depot_ids.tolist(),
+        *instance.depot_coordinates.astype(int).T.tolist(),
+        instance.depot_tw_begin.astype(int).tolist(),
+        instance.depot_tw_end.astype(int).tolist())]
+    # the vehicles are the same at each depot
+    big_vehicle, small_vehicle = [Vehicle(
+        int(instance.vehicle_capacities[i]),
+        int(instance.vehicle_fixed_costs[i]),
+        float(instance.vehicle_var_costs[i]),
+        int(instance.vehicle_max_numbers[i])) for i in range(2)]
+
+    windows = iter(zip(instance.tw_begin.astype(int).tolist(),
+                       instance.tw_end.astype(int).tolist()))
     customers = []
-    for _ in range(nb_customers):
-        id = int(next(instance_iter))
-        x = int(next(instance_iter))
-        y = int(next(instance_iter))
-        demand = int(next(instance_iter))
-        service_time = int(next(instance_iter))
-        optional = int(next(instance_iter)) == 1 if True else False
-        small_vehicle_flag = int(next(instance_iter)) == 1 if True else False
-        nb_time_windows = int(next(instance_iter))
-        time_windows = []
-        for _ in range(nb_time_windows):
-            tw_begin = int(next(instance_iter))
-            tw_end = int(next(instance_iter))
-            time_windows.append((tw_begin, tw_end))
-        customers.append(Customer(id, x, y, demand, service_time, optional, small_vehicle_flag, time_windows))
+    for i, id in enumerate(instance.customer_ids.tolist()):
+        x, y = instance.coordinates[i].astype(int).tolist()
+        time_windows = [next(windows)
+                        for _ in range(instance.window_counts[i])]
+        customers.append(Customer(id, x, y, int(instance.demands[i]),
+                                  int(instance.service_times[i]),
+                                  bool(instance.optional[i]),
+                                  bool(instance.only_small_vehicles[i]),
+                                  time_windows))
 
     return DataRichVrp(depots, big_vehicle, small_vehicle, customers)
 
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         solve_demo(sys.argv[1:])
@@ -0,0 +1,2 @@
+"""Heuristics giving feasible solutions of the models, for example to
+set the upper bound of the solver"""
@@ -0,0 +1,329 @@
+"""This module gives the data of a model to the heuristics in numpy arrays,
+evaluates their routes and builds their solutions.
+
+A route is a list of indices of customer points. Its vehicle type starts
+at the start point of the type (if any) at the beginning of the time window
+of the type. At each point, the time is the end of the service:
+the travel time of the link and the service time of the point are added,
+then the time is raised to the beginning of the time window of the point
+and must not exceed its end. A time window ending at 0 is not bounded.
+The cost of a link for a vehicle type is its fixed cost plus its distance
+and its time multiplied by the variable costs of the type, among parallel
+links the cheapest one is used."""
+
+import numpy as np
+from VRPSolverEasy.src import constants, solver
+
+INFINITY = float("inf")
+
+
+def _window_end(tw_end):
+    return INFINITY if tw_end == 0 else tw_end
+
+
+class RoutingData:
+    """Points, vehicle types and links of a model indexed from 0.
+
+    Customers with the same id_customer are alternative points of one
+    customer, which must be visited once unless it has a penalty."""
+
+    def __init__(self, model):
+        self.model = model
+        points = list(dict.values(model.points))
+        self.nb_points = len(points)
+        self.ids = [point.id for point in points]
+        self.index = {point_id: i for i, point_id in enumerate(self.ids)}
+        self.names = [point.name for point in points]
+        self.demand = [point.demand for point in points]
+        self.service_time = [point.service_time for point in points]
+        self.tw_begin = [point.tw_begin for point in points]
+        self.tw_end = [_window_end(point.tw_end) for point in points]
+        self.id_customer = [point.id_customer for point in points]
+        self.is_customer = [point.id_customer != 0 for point in points]
+        self.point_cost = [0 if point.id_customer != 0
+                           else point.penalty_or_cost for point in points]
+
+        # alternative points of each customer
+        self.customers = {}
+        self.penalty = {}
+        for i, point in enumerate(points):
+            if point.id_customer == 0:
+                continue
+            self.customers.setdefault(point.id_customer, []).append(i)
+            self.penalty[point.id_customer] = max(
+                self.penalty.get(point.id_customer, 0),
+                point.penalty_or_cost)
+
+        vehicle_types = list(dict.values(model.vehicle_types))
+        self.nb_types = len(vehicle_types)
+        self.type_ids = [vehicle.id for vehicle in vehicle_types]
+        self.type_index = {type_id: k
+                           for k, type_id in enumerate(self.type_ids)}
+        self.capacity = [vehicle.capacity for vehicle in vehicle_types]
+        self.fixed_cost = [vehicle.fixed_cost for vehicle in vehicle_types]
+        self.max_number = [vehicle.max_number for vehicle in vehicle_types]
+        self.max_total = model.max_total_vehicles_number
+        self.start = [self.index.get(vehicle.start_point_id, -1)
+                      for vehicle in vehicle_types]
+        self.end = [self.index.get(vehicle.end_point_id, -1)
+                    for vehicle in vehicle_types]
+        self.type_tw_begin = [vehicle.tw_begin for vehicle in vehicle_types]
+        self.type_tw_end = [_window_end(vehicle.tw_end)
+                            for vehicle in vehicle_types]
+
+        # bit k of allowed[i] is set if the vehicle type k can visit i
+        all_types = (1 << self.nb_types) - 1
+        self.allowed = []
+        for point in points:
+            allowed = all_types
+            for type_id in point.incompatible_vehicles:
+                if type_id in self.type_index:
+                    allowed &= ~(1 << self.type_index[type_id])
+            self.allowed.append(allowed)
+
+        self.__read_links()
+        # matrices of cost, time, distance and link row of each type,
+        # shared by the types with the same variable costs
+        self.cost = []
+        self.time = []
+        self.distance = []
+        self.link = []
+        matrices = {}
+        for vehicle in vehicle_types:
+            key = (vehicle.var_cost_dist, vehicle.var_cost_time)
+            if key not in matrices:
+                matrices[key] = self.__matrices(*key)
+            cost, time, distance, link = matrices[key]
+            self.cost.append(cost)
+            self.time.append(time)
+            self.distance.append(distance)
+            self.link.append(link)
+
+    def __read_links(self):
+        """Read all links in arrays of rows, undirected links are given
+        in both directions"""
+        columns = self.model.links.columns()
+        alive = np.frombuffer(columns.alive, dtype=np.int8).astype(bool)
+        start = np.frombuffer(columns.start_point_id, dtype=np.int32)[alive]
+        end = np.frombuffer(columns.end_point_id, dtype=np.int32)[alive]
+        distance = np.frombuffer(columns.distance)[alive]
+        time = np.frombuffer(columns.time)[alive]
+        fixed_cost = np.frombuffer(columns.fixed_cost)[alive]
+        directed = np.frombuffer(columns.is_directed,
+                                 dtype=np.int8)[alive].astype(bool)
+        names = np.frombuffer(columns.name, dtype=np.int32)[alive]
+        self.link_names = list(columns.names)
+        free_links = self.model.links.free_links()
+        if free_links:
+            self.link_names.extend(link.name for link in free_links)
+            start = np.concatenate(
+                (start, [link.start_point_id for link in free_links]))
+            end = np.concatenate(
+                (end, [link.end_point_id for link in free_links]))
+            distance = np.concatenate(
+                (distance, [link.distance for link in free_links]))
+            time = np.concatenate((time, [link.time for link in free_links]))
+            fixed_cost = np.concatenate(
+                (fixed_cost, [link.fixed_cost for link in free_links]))
+            directed = np.concatenate(
+                (directed, [link.is_directed for link in free_links]))
+            names = np.concatenate(
+                (names, np.arange(len(columns.names),
+                                  len(self.link_names))))
+
+        # indices of the points of each link
+        ids = np.array(self.ids, dtype=np.int64)
+        order = np.argsort(ids)
+        sorted_ids = ids[order]
+
+        def to_index(point_ids):
+            position = np.searchsorted(sorted_ids, point_ids)
+            position = np.minimum(position, max(len(ids) - 1, 0))
+            found = sorted_ids[position] == point_ids if len(ids) else \
+                np.zeros(len(point_ids), dtype=bool)
+            return np.where(found, order[position], -1)
+
+        start = to_index(start)
+        end = to_index(end)
+        known = (start >= 0) & (end >= 0) & (start != end)
+        start, end, directed = start[known], end[known], directed[known]
+        distance, time = distance[known], time[known]
+        fixed_cost, names = fixed_cost[known], names[known]
+        reverse = ~directed
+        self.__rows = (np.concatenate((start, end[reverse])),
+                       np.concatenate((end, start[reverse])),
+                       np.concatenate((distance, distance[reverse])),
+                       np.concatenate((time, time[reverse])),
+                       np.concatenate((fixed_cost, fixed_cost[reverse])),
+                       np.concatenate((names, names[reverse])))
+
+    def __matrices(self, var_cost_dist, var_cost_time):
+        """Build the matrices of the cheapest links for variable costs"""
+        start, end, distance, time, fixed_cost, names = self.__rows
+        size = self.nb_points
+        cost = fixed_cost + var_cost_dist * distance + var_cost_time * time
+        # without parallel links, each row is written in its own cell and
+        # the cheapest links need not be sorted out
+        row_matrix = np.full((size, size), -1, dtype=np.int64)
+        row_matrix[start, end] = np.arange(len(start))
+        rows = row_matrix[row_matrix >= 0]
+        if len(rows) < len(start):
+            pairs = start.astype(np.int64) * size + end
+            order = np.lexsort((cost, pairs))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = pairs[order][1:] != pairs[order][:-1]
+            rows = order[first]
+        cost_matrix = np.full((size, size), INFINITY)
+        time_matrix = np.zeros((size, size))
+        distance_matrix = np.zeros((size, size))
+        link_matrix = np.zeros((size, size), dtype=np.int32)
+        cost_matrix[start[rows], end[rows]] = cost[rows]
+        time_matrix[start[rows], end[rows]] = time[rows]
+        distance_matrix[start[rows], end[rows]] = distance[rows]
+        link_matrix[start[rows], end[rows]] = names[rows]
+        return cost_matrix, time_matrix, distance_matrix, link_matrix
+
+    def can_visit(self, k, route):
+        """Return True if the vehicle type k can visit all points of route"""
+        bit = 1 << k
+        return all(self.allowed[i] & bit for i in route)
+
+    def route_cost(self, k, route):
+        """Return the cost of route for the vehicle type k, or None if
+        the route is not feasible"""
+        if sum(self.demand[i] for i in route) > self.capacity[k]:
+            return None
+        bit = 1 << k
+        cost_matrix = self.cost[k]
+        time_matrix = self.time[k]
+        tw_begin = self.tw_begin
+        tw_end = self.tw_end
+        service_time = self.service_time
+        previous = self.start[k]
+        cost = self.fixed_cost[k]
+        time = self.type_tw_begin[k]
+        if previous >= 0:
+            if not self.allowed[previous] & bit:
+                return None
+            cost += self.point_cost[previous]
+            time = max(time, tw_begin[previous])
+        for i in route:
+            if not self.allowed[i] & bit:
+                return None
+            if previous >= 0:
+                link_cost = cost_matrix.item(previous, i)
+                if link_cost == INFINITY:
+                    return None
+                cost += link_cost
+                time += time_matrix.item(previous, i)
+            time = max(time + service_time[i], tw_begin[i])
+            if time > tw_end[i]:
+                return None
+            previous = i
+        end = self.end[k]
+        if end >= 0:
+            if not self.allowed[end] & bit:
+                return None
+            if previous >= 0:
+                link_cost = cost_matrix.item(previous, end)
+                if link_cost == INFINITY:
+                    return None
+                cost += link_cost
+                time += time_matrix.item(previous, end)
+            time = max(time + service_time[end], tw_begin[end])
+            if time > tw_end[end]:
+                return None
+            if end != self.start[k]:
+                cost += self.point_cost[end]
+        if time > self.type_tw_end[k]:
+            return None
+        return cost
+
+    def fleet_is_feasible(self, types):
+        """Return True if the vehicle types of the routes are available"""
+        if len(types) > self.max_total:
+            return False
+        counts = [0] * self.nb_types
+        for k in types:
+            counts[k] += 1
+        return all(count <= maximum
+                   for count, maximum in zip(counts, self.max_number))
+
+    def unserved_penalty(self, routes):
+        """Return the penalties of the customers not visited by routes,
+        or None if a customer without penalty is not visited"""
+        visited = set(self.id_customer[i] for _, route in routes
+                      for i in route)
+        penalty = 0
+        for id_customer in self.customers:
+            if id_customer in visited:
+                continue
+            if self.penalty[id_customer] <= 0:
+                return None
+            penalty += self.penalty[id_customer]
+        return penalty
+
+    def routes(self, solution):
+        """Return the routes (vehicle type, customer points) of a solution"""
+        routes = []
+        for route in solution.routes:
+            k = self.type_index[route.vehicle_type_id]
+            routes.append((k, [self.index[point_id]
+                               for point_id in route.point_ids
+                               if self.is_customer[self.index[point_id]]]))
+        return routes
+
+    def __visited_points(self, k, route):
+        """Build the visited points of a route in the output format"""
+        visited_points = []
+        previous = self.start[k]
+        load = 0
+        time = self.type_tw_begin[k]
+        path = list(route)
+        if previous >= 0:
+            time = max(time, self.tw_begin[previous])
+            visited_points.append((previous, 0, time, str()))
+        if self.end[k] >= 0:
+            path.append(self.end[k])
+        for i in path:
+            name = str()
+            if previous >= 0:
+                time += self.time[k].item(previous, i)
+                name = self.link_names[self.link[k].item(previous, i)]
+            load += self.demand[i] if self.is_customer[i] else 0
+            time = max(time + self.service_time[i], self.tw_begin[i])
+            visited_points.append((i, load, time, name))
+            previous = i
+        return [{constants.ROUTE.POINT_ID.value: self.ids[i],
+                 constants.ROUTE.POINT_NAME.value: self.names[i],
+                 constants.ROUTE.LOAD.value: load,
+                 constants.ROUTE.TIME.value: time,
+                 constants.ROUTE.INCOMING_ARC_NAME.value: name}
+                for i, load, time, name in visited_points]
+
+    def solution(self, routes):
+        """Build the solution of feasible routes, given as a list of
+        (vehicle type, customer points), or None if the routes are not
+        a feasible solution"""
+        routes = [(k, route) for k, route in routes if route]
+        penalty = self.unserved_penalty(routes)
+        if penalty is None or \
+                not self.fleet_is_feasible([k for k, _ in routes]):
+            return None
+        value = penalty
+        output_routes = []
+        for k, route in routes:
+            cost = self.route_cost(k, route)
+            if cost is None:
+                return None
+            value += cost
+            output_routes.append({
+                constants.ROUTE.VEHICLE_TYPE_ID.value: self.type_ids[k],
+                constants.ROUTE.ROUTE_COST.value: cost,
+                constants.ROUTE.VISITED_POINTS.value:
+                    self.__visited_points(k, route)})
+        output = {"Status": {"code": constants.FEASIBLE_SOL_FOUND,
+                             "message": "FEASIBLE_SOL_FOUND"},
+                  "Solution": {"bestSolutionValue": value,
+                               "Routes": output_routes}}
+        return solver.Solution(output, constants.FEASIBLE_SOL_FOUND)
@@ -0,0 +1,224 @@
+"""This module builds a feasible solution of a model with the savings
+heuristic of Clarke and Wright"""
+
+import numpy as np
+from VRPSolverEasy.heuristics.routing import RoutingData, INFINITY
+
+# a merge must decrease the cost by more than this value
+EPSILON = 1e-9
+
+
+def _initial_routes(data):
+    """Serve each customer by its own route with the cheapest vehicle
+    type and alternative point, return the routes and their costs,
+    or None if a customer without penalty cannot be served"""
+    routes = []
+    for id_customer, points in data.customers.items():
+        best = None
+        for i in points:
+            for k in range(data.nb_types):
+                cost = data.route_cost(k, [i])
+                if cost is not None and (best is None or cost < best[0]):
+                    best = (cost, k, i)
+        if best is None:
+            if data.penalty[id_customer] <= 0:
+                return None
+            continue
+        cost, k, i = best
+        routes.append([k, [i], cost])
+    return routes
+
+
+def _candidates(data, points, minimum_saving):
+    """Return the merges (i, j, vehicle type) of the routes ending with i
+    and starting with j, with a saving greater than minimum_saving,
+    sorted by decreasing saving"""
+    points = np.array(points, dtype=np.int64)
+    savings = []
+    for k in range(data.nb_types):
+        cost = data.cost[k][np.ix_(points, points)]
+        saving = -cost
+        if data.end[k] >= 0:
+            saving = saving + data.cost[k][points, data.end[k]][:, None]
+        if data.start[k] >= 0:
+            saving = saving + data.cost[k][data.start[k], points][None, :]
+        with np.errstate(invalid="ignore"):
+            rows, columns = np.nonzero((saving > minimum_saving) &
+                                       (saving < INFINITY) &
+                                       (cost < INFINITY))
+        savings.append((saving[rows, columns], points[rows],
+                        points[columns], np.full(len(rows), k)))
+    saving, first, second, types = (np.concatenate(values)
+                                    for values in zip(*savings))
+    order = np.argsort(-saving, kind="stable")
+    return zip(first[order].tolist(), second[order].tolist(),
+               types[order].tolist())
+
+
+def _repair_fleet(data, routes):
+    """Move routes to other vehicle types until the numbers of vehicles
+    are respected, return False if it is not possible"""
+    counts = [0] * data.nb_types
+    for k, _, _ in routes:
+        counts[k] += 1
+    for route in sorted(routes, key=lambda route: route[2]):
+        k = route[0]
+        if counts[k] <= data.max_number[k]:
+            continue
+        best = None
+        for other in range(data.nb_types):
+            if counts[other] >= data.max_number[other]:
+                continue
+            cost = data.route_cost(other, route[1])
+            if cost is not None and (best is None or cost < best[0]):
+                best = (cost, other)
+        if best is None:
+            return False
+        counts[k] -= 1
+        counts[best[1]] += 1
+        route[0] = best[1]
+        route[2] = best[0]
+    return len(routes) <= data.max_total
+
+
+def _remove_optional(data, routes):
+    """Remove the customers with a penalty lower than their cost"""
+    for route in routes:
+        k, points, cost = route
+        position = 0
+        while position < len(points):
+            i = points[position]
+            penalty = data.penalty[data.id_customer[i]]
+            if penalty > 0:
+                rest = points[:position] + points[position + 1:]
+                rest_cost = data.route_cost(k, rest) if rest else 0
+                if rest_cost is not None and \
+                        cost - rest_cost > penalty + EPSILON:
+                    points, cost = rest, rest_cost
+                    continue
+            position += 1
+        route[1] = points
+        route[2] = cost
+    return [route for route in routes if route[1]]
+
+
+def _fleet_excess(data, routes):
+    """Return the number of routes exceeding the number of vehicles"""
+    counts = [0] * data.nb_types
+    for k, _, _ in routes:
+        counts[k] += 1
+    return max(sum(max(0, count - maximum) for count, maximum
+                   in zip(counts, data.max_number)),
+               len(routes) - data.max_total)
+
+
+def _merge(data, routes, minimum_saving, reduce_fleet):
+    """Merge the routes in the order of the savings. With reduce_fleet,
+    merges increasing the cost are accepted until the numbers of vehicles
+    are respected. Return the remaining routes."""
+    route_of = {}
+    for route in routes:
+        for point in route[1]:
+            route_of[point] = route
+    excess = _fleet_excess(data, routes) if reduce_fleet else 0
+    for i, j, k in _candidates(data, list(route_of), minimum_saving):
+        if reduce_fleet and excess <= 0:
+            break
+        first = route_of[i]
+        second = route_of[j]
+        if first is second or first[1][-1] != i and first[1][0] != i \
+                or second[1][0] != j and second[1][-1] != j:
+            continue
+        first_points = first[1] if first[1][-1] == i else first[1][::-1]
+        second_points = second[1] if second[1][0] == j \
+            else second[1][::-1]
+        merged = first_points + second_points
+        cost = data.route_cost(k, merged)
+        if cost is None or not reduce_fleet and \
+                cost > first[2] + second[2] - EPSILON:
+            continue
+        first[0], first[1], first[2] = k, merged, cost
+        second[1] = []
+        for point in second_points:
+            route_of[point] = first
+        if reduce_fleet:
+            excess = _fleet_excess(
+                data, [route for route in routes if route[1]])
+    return [route for route in routes if route[1]]
+
+
+def _best_insertion(data, route, point):
+    """Return the cost and the points of route with point inserted at its
+    best position, or None if it cannot be inserted"""
+    k, points, cost = route
+    best = None
+    for position in range(len(points) + 1):
+        inserted = points[:position] + [point] + points[position:]
+        inserted_cost = data.route_cost(k, inserted)
+        if inserted_cost is not None and \
+                (best is None or inserted_cost < best[0]):
+            best = (inserted_cost, inserted)
+    return best
+
+
+def _empty_routes(data, routes):
+    """Empty the shortest routes by inserting their points in other routes
+    until the numbers of vehicles are respected. Return the remaining
+    routes."""
+    for route in sorted(routes, key=lambda route: len(route[1])):
+        if _fleet_excess(data, [route for route in routes if route[1]]) <= 0:
+            break
+        others = [other for other in routes
+                  if other is not route and other[1]]
+        changes = {}
+        for point in route[1]:
+            best = None
+            for other in others:
+                current = changes.get(id(other), (other[2], other[1]))
+                insertion = _best_insertion(
+                    data, (other[0], current[1], current[0]), point)
+                if insertion is not None and (
+                        best is None or insertion[0] - current[0] < best[0]):
+                    best = (insertion[0] - current[0], other, insertion)
+            if best is None:
+                changes = None
+                break
+            changes[id(best[1])] = best[2]
+        if changes is None:
+            continue
+        for other in others:
+            if id(other) in changes:
+                other[2], other[1] = changes[id(other)]
+        route[1] = []
+    return [route for route in routes if route[1]]
+
+
+def savings_routes(data):
+    """Return the routes (vehicle type, customer points) built by the
+    savings heuristic, or None if no feasible solution is found"""
+    routes = _initial_routes(data)
+    if routes is None:
+        return None
+    if routes:
+        routes = _merge(data, routes, EPSILON, False)
+    if not _repair_fleet(data, routes):
+        routes = _merge(data, routes, -INFINITY, True)
+        if not _repair_fleet(data, routes):
+            routes = _empty_routes(data, routes)
+        if not _repair_fleet(data, routes):
+            return None
+    routes = _remove_optional(data, routes)
+    return [(k, points) for k, points, _ in routes]
+
+
+def savings(model):
+    """Build a feasible solution of the model with the savings heuristic
+    of Clarke and Wright, it respects the capacities, the time windows,
+    the vehicle types and the incompatible vehicles.
+    Return a Solution, whose value is its cost,
+    or None if no feasible solution is found"""
+    data = RoutingData(model)
+    routes = savings_routes(data)
+    if routes is None:
+        return None
+    return data.solution(routes)
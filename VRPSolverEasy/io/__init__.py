@@ -0,0 +1,2 @@
+"""Readers of the instances of the literature, parsed with numpy in
+columnar arrays, and building of the models of these instances"""
@@ -0,0 +1,190 @@
+"""This module contains the instances read by
+:py:mod:`VRPSolverEasy.io.readers`, stored in columnar numpy arrays:
+one array for each attribute, with one row for each depot, customer or
+vehicle type."""
+
+import numpy as np
+from VRPSolverEasy.src import geometry, solver
+
+
+class Instance:
+    """Depots, customers and vehicle types of an instance.
+
+    Customers have one time window each, except if window_counts is given:
+    the time windows of customer i are then the window_counts[i] next ones
+    in tw_begin and tw_end. The arrays of time windows, service times,
+    optional customers and small vehicles are None when the format does
+    not have them. Vehicle types are at the depot of index vehicle_depots,
+    their routes end anywhere if open_routes is True.
+
+    The distances are euclidean, rounded to number_digit digits, the
+    times are the distances if time_from_distance is True.
+    """
+
+    def __init__(
+            self,
+            name=str(),
+            depot_ids=None,
+            depot_coordinates=None,
+            depot_tw_begin=None,
+            depot_tw_end=None,
+            depot_service_times=None,
+            customer_ids=None,
+            coordinates=None,
+            demands=None,
+            service_times=None,
+            tw_begin=None,
+            tw_end=None,
+            window_counts=None,
+            optional=None,
+            only_small_vehicles=None,
+            vehicle_depots=None,
+            vehicle_capacities=None,
+            vehicle_fixed_costs=None,
+            vehicle_var_costs=None,
+            vehicle_max_numbers=None,
+            vehicle_small=None,
+            open_routes=False,
+            number_digit=3,
+            time_from_distance=False):
+        self.name = name
+        self.depot_ids = depot_ids
+        self.depot_coordinates = depot_coordinates
+        self.depot_tw_begin = depot_tw_begin
+        self.depot_tw_end = depot_tw_end
+        self.depot_service_times = depot_service_times
+        self.customer_ids = customer_ids
+        self.coordinates = coordinates
+        self.demands = demands
+        self.service_times = service_times
+        self.tw_begin = tw_begin
+        self.tw_end = tw_end
+        self.window_counts = window_counts
+        self.optional = optional
+        self.only_small_vehicles = only_small_vehicles
+        self.vehicle_depots = vehicle_depots
+        self.vehicle_capacities = vehicle_capacities
+        self.vehicle_fixed_costs = vehicle_fixed_costs
+        self.vehicle_var_costs = vehicle_var_costs
+        self.vehicle_max_numbers = vehicle_max_numbers
+        self.vehicle_small = vehicle_small
+        self.open_routes = open_routes
+        self.number_digit = number_digit
+        self.time_from_distance = time_from_distance
+
+    @property
+    def nb_depots(self):
+        """Number of depots"""
+        return len(self.depot_ids)
+
+    @property
+    def nb_customers(self):
+        """Number of customers"""
+        return len(self.customer_ids)
+
+    @property
+    def nb_vehicle_types(self):
+        """Number of vehicle types"""
+        return len(self.vehicle_capacities)
+
+    def __str__(self):
+        return (f"Instance {self.name} : {self.nb_depots} depots, "
+                f"{self.nb_customers} customers, "
+                f"{self.nb_vehicle_types} vehicle types")
+
+    def to_model(self):
+        """Return the :py:class:`Model` of the instance. Vehicle type i
+        has the id i + 1. The points of a customer with several time
+        windows have the ids of the customer, then the ids following
+        the largest id of the instance."""
+        model = solver.Model()
+        depot_ids = self.depot_ids.tolist()
+        for i, depot_id in enumerate(depot_ids):
+            model.add_depot(id=depot_id, **_row(i, (
+                ("service_time", self.depot_service_times),
+                ("tw_begin", self.depot_tw_begin),
+                ("tw_end", self.depot_tw_end))))
+
+        big_vehicle_ids = []
+        for i in range(self.nb_vehicle_types):
+            depot = int(self.vehicle_depots[i])
+            model.add_vehicle_type(
+                id=i + 1,
+                start_point_id=depot_ids[depot],
+                end_point_id=-1 if self.open_routes else depot_ids[depot],
+                capacity=int(self.vehicle_capacities[i]),
+                fixed_cost=float(self.vehicle_fixed_costs[i]),
+                var_cost_dist=float(self.vehicle_var_costs[i]),
+                max_number=int(self.vehicle_max_numbers[i]),
+                **_row(depot, (("tw_begin", self.depot_tw_begin),
+                               ("tw_end", self.depot_tw_end))))
+            if self.vehicle_small is not None and \
+                    not self.vehicle_small[i]:
+                big_vehicle_ids.append(i + 1)
+
+        point_ids, rows = self.__add_customers(model, big_vehicle_ids)
+
+        # links between customers, then between depots and customers,
+        # the points of a customer are not linked together
+        coordinates = np.asarray(self.coordinates, dtype=np.float64)[rows]
+        if self.nb_depots == 1:
+            coordinates = np.vstack((self.depot_coordinates, coordinates))
+            point_ids = depot_ids + point_ids
+        distances = geometry.packed_distances(
+            coordinates, rounding="round", number_digit=self.number_digit)
+        model.add_links_from_matrix(
+            distances, time=distances if self.time_from_distance else None,
+            point_ids=point_ids)
+        if self.nb_depots > 1:
+            depot_distances = geometry.distance_matrix(
+                self.depot_coordinates, coordinates, rounding="round",
+                number_digit=self.number_digit).tolist()
+            for depot_id, distances in zip(depot_ids, depot_distances):
+                for point_id, distance in zip(point_ids, distances):
+                    model.add_link(
+                        start_point_id=depot_id, end_point_id=point_id,
+                        distance=distance,
+                        time=distance if self.time_from_distance else 0.0)
+        if self.window_counts is not None:
+            for first, count in zip(np.cumsum(self.window_counts) -
+                                    self.window_counts, self.window_counts):
+                for i in range(first, first + count):
+                    for j in range(i + 1, first + count):
+                        model.delete_link(point_ids[i], point_ids[j])
+        return model
+
+    def __add_customers(self, model, big_vehicle_ids):
+        """Add the points of the customers, return their ids and the
+        row of their customer"""
+        customer_ids = self.customer_ids.tolist()
+        if self.window_counts is None:
+            rows = np.arange(self.nb_customers)
+        else:
+            rows = np.repeat(np.arange(self.nb_customers),
+                             self.window_counts)
+        next_id = max(customer_ids + self.depot_ids.tolist()) + 1
+        point_ids = []
+        for window, row in enumerate(rows.tolist()):
+            point_id = customer_ids[row]
+            if window > 0 and rows[window - 1] == row:
+                point_id = next_id
+                next_id += 1
+            point_ids.append(point_id)
+            values = _row(row, (("service_time", self.service_times),))
+            values.update(_row(window, (("tw_begin", self.tw_begin),
+                                        ("tw_end", self.tw_end))))
+            if self.optional is not None and self.optional[row]:
+                values["penalty"] = 1.0
+            if self.only_small_vehicles is not None and \
+                    self.only_small_vehicles[row]:
+                values["incompatible_vehicles"] = big_vehicle_ids
+            model.add_customer(id=point_id, id_customer=customer_ids[row],
+                               demand=int(self.demands[row]), **values)
+        return point_ids, rows
+
+
+def _row(index, columns):
+    """Return the values of the row index of the columns given by name,
+    without the columns which are None"""
+    return {name: column[index].item() for name, column in columns
+            if column is not None}
@@ -0,0 +1,174 @@
+"""This module keeps the instances of a library of files in one binary
+archive, so that they are parsed only once.
+
+The archive stores each attribute of :py:class:`Instance` of all the
+instances in one array, with the offsets of the rows of each instance,
+and an index of the files with their modification time, size and sha256.
+A file is parsed again only if its content changed: its sha256 is
+computed only if its modification time or its size changed.
+"""
+
+import os
+import hashlib
+import numpy as np
+from VRPSolverEasy.src import cache
+from VRPSolverEasy.io import readers
+from VRPSolverEasy.io.instances import Instance
+
+PATH_DEMO_DATA = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                              os.path.normpath("../demos/data"))
+
+# folder of demos/data, extension of the files and their format
+DEMO_FORMATS = (("CVRP", ".vrp", "cvrplib"),
+                ("CVRPTW", ".txt", "solomon"),
+                ("HFVRP", ".txt", "golden"),
+                ("HFVRP", ".vrp", "cvrplib"),
+                ("MDVRP", "", "cordeau"),
+                ("RichVRP", ".txt", "richvrp"))
+
+# attributes of Instance stored in arrays, with the rows of each instance
+_ARRAYS = ("depot_ids", "depot_coordinates", "depot_tw_begin",
+           "depot_tw_end", "depot_service_times", "customer_ids",
+           "coordinates", "demands", "service_times", "tw_begin", "tw_end",
+           "window_counts", "optional", "only_small_vehicles",
+           "vehicle_depots", "vehicle_capacities", "vehicle_fixed_costs",
+           "vehicle_var_costs", "vehicle_max_numbers", "vehicle_small")
+
+# attributes of Instance stored in one value by instance
+_VALUES = ("name", "open_routes", "number_digit", "time_from_distance")
+
+
+def demo_files():
+    """Return the paths and the formats of the instances of demos/data"""
+    files = []
+    for folder, extension, format in DEMO_FORMATS:
+        path_folder = os.path.join(PATH_DEMO_DATA, folder)
+        for name in sorted(os.listdir(path_folder)):
+            if name.startswith("__") or \
+                    os.path.splitext(name)[1] != extension:
+                continue
+            files.append((os.path.join(path_folder, name), format))
+    return files
+
+
+def _pack(instances):
+    """Return the arrays of the attributes of instances"""
+    arrays = {}
+    for attribute in _ARRAYS:
+        columns = [getattr(instance, attribute) for instance in instances]
+        present = [column for column in columns if column is not None]
+        arrays[attribute + "_none"] = np.array([column is None
+                                                for column in columns])
+        arrays[attribute + "_offsets"] = np.cumsum(
+            [0] + [0 if column is None else len(column)
+                   for column in columns])
+        arrays[attribute] = np.concatenate(present) if present else \
+            np.zeros(0)
+    for attribute in _VALUES:
+        arrays[attribute] = np.array([getattr(instance, attribute)
+                                      for instance in instances])
+    return arrays
+
+
+def _unpack(arrays):
+    """Return the instances of the arrays given by _pack, their arrays
+    are views of the arrays given"""
+    columns = [(attribute, arrays[attribute],
+                arrays[attribute + "_offsets"].tolist(),
+                arrays[attribute + "_none"].tolist())
+               for attribute in _ARRAYS]
+    values = [(attribute, arrays[attribute].tolist())
+              for attribute in _VALUES]
+    instances = []
+    for i in range(len(arrays["name"])):
+        attributes = {attribute: None if none[i] else
+                      column[offsets[i]:offsets[i + 1]]
+                      for attribute, column, offsets, none in columns}
+        attributes.update((attribute, value[i])
+                          for attribute, value in values)
+        instances.append(Instance(**attributes))
+    return instances
+
+
+def _digest(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class InstanceLibrary:
+    """Instances of a list of files, given by their paths and formats
+    (see :py:func:`readers.read`), by default the instances of
+    demos/data. They are read from an archive of
+    :py:class:`cache.InstanceCache` and only the files which changed since
+    the archive was written are parsed. nb_parsed is the number of files
+    parsed when the library was loaded."""
+
+    def __init__(self, files=None, instance_cache=None):
+        if files is None:
+            files = demo_files()
+        self.paths = [os.path.abspath(path) for path, _ in files]
+        self.formats = [format for _, format in files]
+        if instance_cache is None:
+            instance_cache = cache.InstanceCache()
+        self.cache = instance_cache
+        self.nb_parsed = 0
+        self.__index = {path: i for i, path in enumerate(self.paths)}
+        self.__instances = self.__load()
+
+    def __len__(self):
+        return len(self.__instances)
+
+    def __iter__(self):
+        return iter(self.__instances)
+
+    def __getitem__(self, path):
+        """Return the instance of the file path"""
+        return self.__instances[self.__index[os.path.abspath(path)]]
+
+    def items(self):
+        """Return the paths of the files and their instances"""
+        return zip(self.paths, self.__instances)
+
+    def __load(self):
+        """Return the instances, from the archive if it is up to date"""
+        key = self.cache.key("\n".join(
+            path + " " + format
+            for path, format in zip(self.paths, self.formats)))
+        stamps = []
+        for path in self.paths:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+
+        arrays = self.cache.load(key)
+        stored = {}
+        if arrays is not None and "paths" in arrays:
+            instances = _unpack(arrays)
+            if arrays["paths"].tolist() == self.paths and \
+                    arrays["stamps"].tolist() == [list(stamp) for stamp
+                                                  in stamps]:
+                return instances
+            stored = {path: (tuple(stamp), digest, instance)
+                      for path, stamp, digest, instance in zip(
+                          arrays["paths"].tolist(),
+                          arrays["stamps"].tolist(),
+                          arrays["digests"].tolist(), instances)}
+
+        instances = []
+        digests = []
+        for path, format, stamp in zip(self.paths, self.formats, stamps):
+            stored_stamp, digest, instance = stored.get(path,
+                                                        (None, None, None))
+            if stamp != stored_stamp:
+                new_digest = _digest(path)
+                if new_digest != digest:
+                    instance = readers.read(path, format)
+                    self.nb_parsed += 1
+                digest = new_digest
+            instances.append(instance)
+            digests.append(digest)
+        arrays = _pack(instances)
+        arrays["paths"] = np.array(self.paths)
+        arrays["stamps"] = np.array(stamps, dtype=np.int64).reshape(-1, 2)
+        arrays["digests"] = np.array(digests)
+        self.cache.store(key, arrays)
+        return instances
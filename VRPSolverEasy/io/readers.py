@@ -0,0 +1,366 @@
+"""This module reads the instances of the literature in
+:py:class:`Instance` objects.
+
+The numbers of a file are not read one by one: each section is parsed at
+once by numpy and reshaped in a table with one row by point or vehicle
+type. The formats are:
+    - "cvrplib": CVRPLIB instances (EUC_2D), and the heterogeneous fleet
+      instances of Queiroga et al. with the sections CAPACITIES,
+      FIXED_COSTS, VARIABLE_COSTS and NUMBER_OF_VEHICLES
+    - "solomon": CVRPTW instances of Solomon
+    - "golden": HFVRP instances of Golden et al.
+    - "cordeau": MDVRP instances of Cordeau et al.
+    - "richvrp": instances of the RichVRP demo
+"""
+
+import os
+import re
+import warnings
+import numpy as np
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.solver import PropertyError
+from VRPSolverEasy.io.instances import Instance
+
+# keyword of a line of the header of a CVRPLIB file, with its value
+_KEYWORD = re.compile(r"^[ \t]*([A-Z][A-Z_]*)[ \t]*:[ \t]*(.*?)[ \t]*$",
+                      re.MULTILINE)
+
+# sections of a CVRPLIB file, found without reading all the lines
+_CVRPLIB_SECTIONS = ("NODE_COORD_SECTION", "DEMAND_SECTION",
+                     "DEPOT_SECTION", "CAPACITIES", "FIXED_COSTS",
+                     "VARIABLE_COSTS", "NUMBER_OF_VEHICLES", "EOF")
+
+
+class InstanceError(Exception):
+    """Exception raised when a file does not follow its format.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, path, message):
+        self.message = os.path.basename(path) + " : " + message
+        super().__init__(self.message)
+
+
+def _text(path):
+    with open(os.path.normpath(path), "r", encoding="UTF-8") as file:
+        return file.read()
+
+
+def _numbers(text, path):
+    """Return the numbers of text, separated by white spaces"""
+    with warnings.catch_warnings():
+        # numpy warns instead of raising when a token is not a number
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=np.float64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise InstanceError(path, "unexpected text in a numeric section")
+
+
+def _table(values, nb_columns, path, nb_rows=None):
+    """Return values in nb_rows rows of nb_columns columns"""
+    if nb_rows is None:
+        nb_rows = len(values) // nb_columns
+    if len(values) != nb_rows * nb_columns:
+        raise InstanceError(path, f"expected {nb_rows} rows of "
+                                  f"{nb_columns} numbers")
+    return values.reshape(nb_rows, nb_columns)
+
+
+def _ragged_table(values, start, nb_rows, nb_columns, count_column,
+                  count_size, path):
+    """Return the table of nb_rows rows beginning at start, whose rows have
+    nb_columns numbers followed by count_size numbers for each unit of
+    the column count_column, the variable parts of the rows and the
+    position following the table"""
+    count = values[start + count_column] if start < len(values) else 0
+    width = nb_columns + int(count) * count_size
+    end = start + nb_rows * width
+    if end <= len(values):
+        rows = values[start:end].reshape(nb_rows, width)
+        if np.all(rows[:, count_column] == count):
+            return rows[:, :nb_columns], rows[:, nb_columns:].ravel(), end
+    # the rows have different lengths
+    starts = []
+    position = start
+    for _ in range(nb_rows):
+        if position + nb_columns > len(values):
+            raise InstanceError(path, f"expected {nb_rows} rows")
+        starts.append(position)
+        position += nb_columns + int(values[position + count_column]) * \
+            count_size
+    if position > len(values):
+        raise InstanceError(path, f"expected {nb_rows} rows")
+    starts = np.array(starts)
+    rows = values[starts[:, None] + np.arange(nb_columns)]
+    extra = np.concatenate([values[first + nb_columns:last] for first, last
+                            in zip(starts, np.append(starts[1:], position))])
+    return rows, extra, position
+
+
+def _check_ids(ids, first, path):
+    if len(ids) > 0 and not (ids[0] == first and
+                             np.all(np.diff(ids) == 1)):
+        raise InstanceError(path, "unexpected index")
+
+
+def _keyword_position(text, keyword):
+    """Return the position of keyword at the beginning of a line of text,
+    or -1"""
+    position = text.find(keyword)
+    while position > 0 and text[position - 1] not in "\n \t":
+        position = text.find(keyword, position + 1)
+    return position
+
+
+def _sections(text):
+    """Return the values of the keywords of the header and the text of the
+    sections of a CVRPLIB file"""
+    positions = sorted(
+        (position, keyword) for keyword, position in
+        ((keyword, _keyword_position(text, keyword))
+         for keyword in _CVRPLIB_SECTIONS) if position >= 0)
+    end = positions[0][0] if positions else len(text)
+    header = {match.group(1): match.group(2)
+              for match in _KEYWORD.finditer(text, 0, end)}
+    sections = {}
+    for (position, keyword), following in zip(
+            positions, positions[1:] + [(len(text), None)]):
+        sections[keyword] = text[position + len(keyword):following[0]]
+    return header, sections
+
+
+def read_cvrplib(path):
+    """Read an instance of CVRPLIB. The vehicles are those of the
+    sections CAPACITIES, ... if they are given, otherwise one vehicle
+    type of capacity CAPACITY with a unit cost by distance and one
+    vehicle by customer. Distances are rounded to the nearest integer,
+    to 3 digits with a heterogeneous fleet."""
+    header, sections = _sections(_text(path))
+    weight_type = header.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+    if weight_type != "EUC_2D":
+        raise InstanceError(path, "EDGE_WEIGHT_TYPE : " + weight_type +
+                            " is not supported (only EUC_2D)")
+    if "DIMENSION" not in header:
+        raise InstanceError(path, "expected DIMENSION")
+    for section in ("NODE_COORD_SECTION", "DEMAND_SECTION", "DEPOT_SECTION"):
+        if section not in sections:
+            raise InstanceError(path, "expected " + section)
+    nb_points = int(header["DIMENSION"])
+    nodes = _table(_numbers(sections["NODE_COORD_SECTION"], path), 3, path,
+                   nb_points)
+    demands = _table(_numbers(sections["DEMAND_SECTION"], path), 2, path,
+                     nb_points)
+    _check_ids(nodes[:, 0], 1, path)
+    _check_ids(demands[:, 0], 1, path)
+    # a few numbers, faster to read without numpy
+    depots = [int(value) for value in sections["DEPOT_SECTION"].split()]
+    if len(depots) == 0 or depots[-1] != -1:
+        raise InstanceError(path, "expected -1 at the end of DEPOT_SECTION")
+    if depots == [1, -1]:
+        depot_rows = np.zeros(1, dtype=np.int64)
+        customer_rows = np.arange(1, nb_points)
+    else:
+        is_depot = np.zeros(nb_points, dtype=bool)
+        is_depot[np.array(depots[:-1]) - 1] = True
+        depot_rows = np.flatnonzero(is_depot)
+        customer_rows = np.flatnonzero(~is_depot)
+
+    if "CAPACITIES" in sections:
+        fleet = [_numbers(sections[section], path) for section in
+                 ("CAPACITIES", "FIXED_COSTS", "VARIABLE_COSTS",
+                  "NUMBER_OF_VEHICLES")]
+        nb_types = int(header.get("VEHICLE_KINDS", len(fleet[0])))
+        if any(len(values) != nb_types for values in fleet):
+            raise InstanceError(path, f"expected {nb_types} vehicle kinds")
+        number_digit = 3
+    else:
+        nb_types = 1
+        fleet = [np.array([float(header["CAPACITY"])]), np.zeros(1),
+                 np.ones(1), np.array([float(len(customer_rows))])]
+        number_digit = 0
+    return Instance(
+        name=header.get("NAME", os.path.basename(path)),
+        depot_ids=depot_rows,
+        depot_coordinates=nodes[depot_rows, 1:],
+        customer_ids=customer_rows,
+        coordinates=nodes[customer_rows, 1:],
+        demands=demands[customer_rows, 1].astype(np.int64),
+        vehicle_depots=np.zeros(nb_types, dtype=np.int64),
+        vehicle_capacities=fleet[0].astype(np.int64),
+        vehicle_fixed_costs=fleet[1],
+        vehicle_var_costs=fleet[2],
+        vehicle_max_numbers=fleet[3].astype(np.int64),
+        number_digit=number_digit)
+
+
+def read_solomon(path):
+    """Read an instance of Solomon. The end of the time window of a
+    customer includes its service time, the times are the distances,
+    rounded to 3 digits."""
+    text = _text(path)
+    name = text.split(None, 1)[0] if text.strip() else str()
+    vehicle = re.search(r"CAPACITY(.*?)CUSTOMER", text, re.DOTALL)
+    # the table of the points follows the line of its column names
+    points = re.search(r"CUSTOMER[^\n]*\n[^\n]*\n", text)
+    if vehicle is None or points is None:
+        raise InstanceError(path, "expected sections VEHICLE and CUSTOMER")
+    max_number, capacity = _table(_numbers(vehicle.group(1), path), 2, path,
+                                  1)[0]
+    rows = _table(_numbers(text[points.end():], path), 7, path)
+    _check_ids(rows[:, 0], 0, path)
+    customers = rows[1:]
+    return Instance(
+        name=name,
+        depot_ids=np.zeros(1, dtype=np.int64),
+        depot_coordinates=rows[:1, 1:3],
+        depot_tw_begin=rows[:1, 4],
+        depot_tw_end=rows[:1, 5],
+        depot_service_times=rows[:1, 6],
+        customer_ids=customers[:, 0].astype(np.int64),
+        coordinates=customers[:, 1:3],
+        demands=customers[:, 3].astype(np.int64),
+        service_times=customers[:, 6],
+        tw_begin=customers[:, 4],
+        tw_end=customers[:, 5] + customers[:, 6],
+        vehicle_depots=np.zeros(1, dtype=np.int64),
+        vehicle_capacities=np.array([capacity], dtype=np.int64),
+        vehicle_fixed_costs=np.zeros(1),
+        vehicle_var_costs=np.ones(1),
+        vehicle_max_numbers=np.array([max_number], dtype=np.int64),
+        time_from_distance=True)
+
+
+def read_golden(path):
+    """Read an instance of HFVRP of Golden et al. (number of customers,
+    points, number of vehicle types, then capacity, fixed cost, variable
+    cost, minimum and maximum number of each type)"""
+    values = _numbers(_text(path), path)
+    if len(values) == 0:
+        raise InstanceError(path, "empty file")
+    nb_customers = int(values[0])
+    end = 1 + 4 * (nb_customers + 1)
+    points = _table(values[1:end], 4, path, nb_customers + 1)
+    _check_ids(points[:, 0], 0, path)
+    if end >= len(values):
+        raise InstanceError(path, "expected the number of vehicle types")
+    nb_types = int(values[end])
+    fleet = _table(values[end + 1:], 5, path, nb_types)
+    return Instance(
+        name=os.path.basename(path),
+        depot_ids=np.zeros(1, dtype=np.int64),
+        depot_coordinates=points[:1, 1:3],
+        customer_ids=points[1:, 0].astype(np.int64),
+        coordinates=points[1:, 1:3],
+        demands=points[1:, 3].astype(np.int64),
+        vehicle_depots=np.zeros(nb_types, dtype=np.int64),
+        vehicle_capacities=fleet[:, 0].astype(np.int64),
+        vehicle_fixed_costs=fleet[:, 1],
+        vehicle_var_costs=fleet[:, 2],
+        vehicle_max_numbers=fleet[:, 4].astype(np.int64))
+
+
+def read_cordeau(path):
+    """Read an instance of MDVRP of Cordeau et al. (type, number of
+    vehicles by depot, of customers and of depots, then maximum duration
+    and capacity of the vehicles of each depot, customers and depots).
+    Customers have the ids of the file, the depots follow them. The
+    maximum durations are not read."""
+    values = _numbers(_text(path), path)
+    if len(values) < 4:
+        raise InstanceError(path, "expected type, m, n and t")
+    nb_vehicles, nb_customers, nb_depots = values[1:4].astype(np.int64)
+    end = 4 + 2 * nb_depots
+    fleet = _table(values[4:end], 2, path, nb_depots)
+    # i x y d q f a and the a visit combinations of each point
+    customers, _, end = _ragged_table(values, end, nb_customers, 7, 6, 1,
+                                      path)
+    depots, _, end = _ragged_table(values, end, nb_depots, 7, 6, 1, path)
+    if end != len(values):
+        raise InstanceError(path, "unexpected numbers at the end")
+    _check_ids(customers[:, 0], 1, path)
+    _check_ids(depots[:, 0], nb_customers + 1, path)
+    return Instance(
+        name=os.path.basename(path),
+        depot_ids=depots[:, 0].astype(np.int64),
+        depot_coordinates=depots[:, 1:3],
+        customer_ids=customers[:, 0].astype(np.int64),
+        coordinates=customers[:, 1:3],
+        demands=customers[:, 4].astype(np.int64),
+        vehicle_depots=np.arange(nb_depots),
+        vehicle_capacities=fleet[:, 1].astype(np.int64),
+        vehicle_fixed_costs=np.zeros(nb_depots),
+        vehicle_var_costs=np.ones(nb_depots),
+        vehicle_max_numbers=np.full(nb_depots, nb_vehicles))
+
+
+def read_richvrp(path):
+    """Read an instance of the RichVRP demo: depots, big and small
+    vehicles available at each depot, customers with several time windows.
+    The routes end anywhere and the times are the distances, rounded to 3
+    digits."""
+    values = _numbers(_text(path), path)
+    if len(values) == 0:
+        raise InstanceError(path, "empty file")
+    nb_depots = int(values[0])
+    end = 1 + 5 * nb_depots
+    depots = _table(values[1:end], 5, path, nb_depots)
+    vehicles = _table(values[end:end + 8], 4, path, 2)
+    end += 8
+    if end >= len(values):
+        raise InstanceError(path, "expected the number of customers")
+    nb_customers = int(values[end])
+    # id x y demand service optional small count and count time windows
+    customers, windows, end = _ragged_table(values, end + 1, nb_customers,
+                                            8, 7, 2, path)
+    if end != len(values):
+        raise InstanceError(path, "unexpected numbers at the end")
+    windows = windows.reshape(-1, 2)
+    fleet = np.tile(vehicles, (nb_depots, 1))
+    return Instance(
+        name=os.path.basename(path),
+        depot_ids=depots[:, 0].astype(np.int64),
+        depot_coordinates=depots[:, 1:3],
+        depot_tw_begin=depots[:, 3],
+        depot_tw_end=depots[:, 4],
+        customer_ids=customers[:, 0].astype(np.int64),
+        coordinates=customers[:, 1:3],
+        demands=customers[:, 3].astype(np.int64),
+        service_times=customers[:, 4],
+        optional=customers[:, 5] == 1,
+        only_small_vehicles=customers[:, 6] == 1,
+        tw_begin=windows[:, 0],
+        tw_end=windows[:, 1],
+        window_counts=customers[:, 7].astype(np.int64),
+        vehicle_depots=np.repeat(np.arange(nb_depots), 2),
+        vehicle_capacities=fleet[:, 0].astype(np.int64),
+        vehicle_fixed_costs=fleet[:, 1],
+        vehicle_var_costs=fleet[:, 2],
+        vehicle_max_numbers=fleet[:, 3].astype(np.int64),
+        vehicle_small=np.tile([False, True], nb_depots),
+        open_routes=True,
+        time_from_distance=True)
+
+
+READERS = {"cvrplib": read_cvrplib,
+           "solomon": read_solomon,
+           "golden": read_golden,
+           "cordeau": read_cordeau,
+           "richvrp": read_richvrp}
+
+
+def read(path, format):
+    """Read the instance of path in the format given
+    (see :py:data:`constants.INSTANCE_FORMATS`)"""
+    if format not in constants.INSTANCE_FORMATS:
+        raise PropertyError(constants.FORMAT_STR,
+                            constants.ENUM_STR_PROPERTY,
+                            str(constants.INSTANCE_FORMATS))
+    return READERS[format](path)
+
+
+def read_model(path, format):
+    """Return the :py:class:`Model` of the instance of path"""
+    return read(path, format).to_model()
@@ -0,0 +1,124 @@
+"""This module computes quick lower bounds of a model without solving it"""
+
+import numpy as np
+from VRPSolverEasy.src.presolve import (_capacity_bound, _link_costs,
+                                        _link_rows, _point_index)
+
+
+def _cost_matrix(model, points):
+    """Return the symmetric matrix of the cheapest cost of a link between
+    two points for any vehicle type and direction"""
+    rows = _link_rows(model.links.columns())
+    cost = _link_costs(model, rows)
+    first = _point_index(points, rows["start"])
+    second = _point_index(points, rows["end"])
+    valid = rows["alive"] & (first >= 0) & (second >= 0)
+    first, second, cost = first[valid], second[valid], cost[valid]
+    for link in model.links.free_links():
+        ids = np.array([link.start_point_id, link.end_point_id])
+        ends = _point_index(points, ids)
+        if (ends >= 0).all():
+            first = np.append(first, ends[0])
+            second = np.append(second, ends[1])
+            cost = np.append(cost, min(
+                vehicle.var_cost_dist * link.distance +
+                vehicle.var_cost_time * link.time + link.fixed_cost
+                for vehicle in dict.values(model.vehicle_types)))
+    matrix = np.full((len(points), len(points)), np.inf)
+    np.minimum.at(matrix, (first, second), cost)
+    return np.minimum(matrix, matrix.T)
+
+
+def _spanning_forest_edges(matrix):
+    """Return the costs of the edges of a minimum spanning forest (Prim),
+    one tree for each connected component of the graph"""
+    size = len(matrix)
+    in_tree = np.zeros(size, dtype=bool)
+    distance = np.full(size, np.inf)
+    edges = []
+    for _ in range(size):
+        candidate = np.where(in_tree, np.nan, distance)
+        vertex = int(np.nanargmin(candidate))
+        if candidate[vertex] < np.inf:
+            edges.append(candidate[vertex])
+        in_tree[vertex] = True
+        np.minimum(distance, matrix[vertex], out=distance)
+    return np.array(edges)
+
+
+def vehicles_bound(model):
+    """Return the smallest number of vehicles whose capacities cover the
+    demand of the mandatory customers, or None if the vehicles available
+    are not enough"""
+    points = list(dict.values(model.points))
+    vehicle_types = list(dict.values(model.vehicle_types))
+    penalty = {}
+    demand = {}
+    for point in points:
+        if point.id_customer == 0:
+            continue
+        penalty[point.id_customer] = max(penalty.get(point.id_customer, 0),
+                                         point.penalty_or_cost)
+        demand[point.id_customer] = min(demand.get(point.id_customer,
+                                                   np.inf), point.demand)
+    nb_vehicles = _capacity_bound(
+        sum(demand[id_customer] for id_customer in demand
+            if penalty[id_customer] <= 0),
+        [vehicle.capacity for vehicle in vehicle_types],
+        [vehicle.max_number for vehicle in vehicle_types])
+    if nb_vehicles is None or nb_vehicles > model.max_total_vehicles_number:
+        return None
+    return nb_vehicles
+
+
+def routing_bound(model, min_nb_vehicles=1):
+    """Return a lower bound of the cost of the routes given by a K-tree:
+    the K routes of a solution visit the customers with n - K links between
+    customers, forming a forest of K trees, and 2K links with the depots.
+    For each K from min_nb_vehicles to the number of vehicles available,
+    the bound adds the minimum spanning forest of the customers without
+    its most expensive links to keep K trees, the 2K cheapest links to
+    the depots (each link counted at most twice) and K fixed costs.
+
+    The bound is only computed when all routes start and end at a depot
+    and each customer is a single mandatory point, else None is returned.
+    float("inf") is returned if the customers cannot be connected."""
+    points = list(dict.values(model.points))
+    vehicle_types = list(dict.values(model.vehicle_types))
+    ids = {point.id for point in points}
+    if not vehicle_types or any(
+            vehicle.start_point_id not in ids or
+            vehicle.end_point_id not in ids for vehicle in vehicle_types):
+        return None
+    customers = [i for i, point in enumerate(points) if point.id_customer]
+    id_customers = [points[i].id_customer for i in customers]
+    if len(set(id_customers)) != len(id_customers) or \
+            any(points[i].penalty_or_cost > 0 for i in customers):
+        return None
+    if not customers:
+        return 0.0
+    depots = [i for i, point in enumerate(points) if not point.id_customer]
+    matrix = _cost_matrix(model, points)
+    forest = np.sort(_spanning_forest_edges(
+        matrix[np.ix_(customers, customers)]))[::-1]
+    nb_components = len(customers) - len(forest)
+    depot_costs = np.sort(np.repeat(
+        matrix[np.ix_(depots, customers)].min(axis=0), 2))
+
+    max_nb_vehicles = min(model.max_total_vehicles_number,
+                          sum(vehicle.max_number
+                              for vehicle in vehicle_types),
+                          len(customers))
+    nb_vehicles = np.arange(max(1, min_nb_vehicles, nb_components),
+                            max_nb_vehicles + 1)
+    if len(nb_vehicles) == 0:
+        return float("inf")
+    # forest of K trees: the spanning forest without its K - c largest
+    # edges, where c is its number of trees
+    largest = np.concatenate(([0], np.cumsum(forest)))
+    forest_cost = largest[-1] - largest[nb_vehicles - nb_components]
+    depot_sums = np.concatenate(([0], np.cumsum(depot_costs)))
+    depot_cost = depot_sums[2 * nb_vehicles]
+    fixed_cost = min(vehicle.fixed_cost for vehicle in vehicle_types)
+    bounds = forest_cost + depot_cost + nb_vehicles * fixed_cost
+    return float(bounds.min())
@@ -0,0 +1,288 @@
+"""This module stores files in a cache directory with a least recently
+used eviction, it is safe to use the same directory in several processes"""
+
+import os
+import sys
+import hashlib
+import tempfile
+import zipfile
+import numpy as np
+
+
+def cache_directory(name):
+    """Return the directory name in the cache folder of the user"""
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME",
+                              os.path.expanduser("~/.cache"))
+    return os.path.join(base, "VRPSolverEasy", name)
+
+
+class DiskCache:
+    """Files of a directory, named by their key. When the total size of
+    the files exceeds max_size bytes, the least recently used files are
+    deleted. Files are written atomically, so several processes can
+    share the directory."""
+
+    suffix = str()
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """Return the path of the file of key"""
+        return os.path.join(self.directory, key + self.suffix)
+
+    def lookup(self, key):
+        """Return the path of the file of key if it exists, else None.
+        The file becomes the most recently used."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def read(self, key):
+        """Return the content of the file of key, or None"""
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except OSError:
+            # deleted by another process
+            return None
+
+    def write(self, key, data):
+        """Write the bytes data in the file of key"""
+        self.write_with(key, lambda file: file.write(data))
+
+    def write_with(self, key, save):
+        """Write the file of key with save, called with the file opened
+        in binary mode, and return its path"""
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory,
+                                                 suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                save(file)
+            path = self.path(key)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        self.added()
+        return path
+
+    def added(self):
+        """Delete the least recently used files if needed once a file is
+        added in the directory. The size of the directory is read again,
+        as other processes may have added files."""
+        if self.size() > self.max_size:
+            self.evict()
+
+    def remove(self, key):
+        """Delete the file of key if it exists"""
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def entries(self):
+        """Return (last use, path, size) for all files of the cache"""
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if not entry.name.endswith(self.suffix) or \
+                        entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def evict(self):
+        """Delete the least recently used files until the total size
+        is lower than max_size"""
+        entries = sorted(self.entries())
+        size = sum(entry[2] for entry in entries)
+        for _, path, file_size in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= file_size
+
+    def size(self):
+        """Return the total size of the files of the cache"""
+        return sum(entry[2] for entry in self.entries())
+
+    def clear(self):
+        """Delete all files of the cache"""
+        for _, path, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ResultCache(DiskCache):
+    """Outputs of bapcod, with their statistics, stored by the sha256 of
+    the json given to the solver (the model and its parameters) and of a
+    context given by the model (the version of the library and the content
+    of the config file).
+    Use it with :py:meth:`Model.solve` to skip identical resolutions."""
+
+    suffix = ".json"
+
+    def __init__(self, directory=None, max_size=256 * 2**20):
+        if directory is None:
+            directory = cache_directory("results")
+        super().__init__(directory, max_size)
+
+    @staticmethod
+    def key(payload, context=bytes()):
+        """Return the key of the json given to the solver in context"""
+        digest = hashlib.sha256(payload)
+        digest.update(b"\0" + context)
+        return digest.hexdigest()
+
+    def get(self, payload, context=bytes()):
+        """Return the output stored for payload, or None"""
+        return self.read(self.key(payload, context))
+
+    def put(self, payload, output, context=bytes()):
+        """Store the output of the solver for payload"""
+        self.write(self.key(payload, context), output)
+
+    def discard(self, payload, context=bytes()):
+        """Delete the output stored for payload"""
+        self.remove(self.key(payload, context))
+
+
+class MatrixCache(DiskCache):
+    """Matrices of distances computed by :py:mod:`VRPSolverEasy.src.geometry`,
+    stored as .npy files by the sha256 of the coordinates, the metric and
+    the rounding. The matrices are read with a memory map: they are not
+    copied in memory, several processes share the same pages, and they
+    can be given as they are to :py:meth:`Model.add_links_from_matrix`.
+    The matrices returned are read only."""
+
+    suffix = ".npy"
+
+    def __init__(self, directory=None, max_size=2**30):
+        if directory is None:
+            directory = cache_directory("matrices")
+        super().__init__(directory, max_size)
+
+    @staticmethod
+    def key(coordinates, kind, *parameters):
+        """Return the key of the matrix of kind ("square" or "packed")
+        of coordinates, computed with parameters"""
+        coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+        digest = hashlib.sha256()
+        digest.update(str((kind, coordinates.shape) +
+                          parameters).encode('UTF-8'))
+        digest.update(coordinates.tobytes())
+        return digest.hexdigest()
+
+    def load(self, key):
+        """Return the memory mapped matrix of key, or None"""
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            # deleted or being replaced by another process
+            return None
+
+    def store(self, key, matrix):
+        """Store matrix and return it memory mapped"""
+        path = self.write_with(key, lambda file: np.save(file, matrix))
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            # evicted at once, the cache is too small
+            matrix.flags.writeable = False
+            return matrix
+
+    def distance_matrix(self, coordinates, metric="euclidean",
+                        rounding="none", number_digit=3, dtype=None):
+        """Return the square matrix of distances of coordinates, as
+        :py:func:`geometry.distance_matrix`, computed at the first call"""
+        from VRPSolverEasy.src import geometry
+        dtype = np.dtype(np.float64 if dtype is None else dtype)
+        key = self.key(coordinates, "square", metric, rounding,
+                       number_digit, dtype.str)
+        matrix = self.load(key)
+        if matrix is None:
+            matrix = self.store(key, geometry.distance_matrix(
+                coordinates, metric=metric, rounding=rounding,
+                number_digit=number_digit, dtype=dtype))
+        return matrix
+
+    def packed_distances(self, coordinates, metric="euclidean",
+                         rounding="none", number_digit=3, dtype=None):
+        """Return the upper triangular part of the matrix of distances of
+        coordinates, as :py:func:`geometry.packed_distances`, computed at
+        the first call"""
+        from VRPSolverEasy.src import geometry
+        dtype = np.dtype(np.float64 if dtype is None else dtype)
+        key = self.key(coordinates, "packed", metric, rounding,
+                       number_digit, dtype.str)
+        matrix = self.load(key)
+        if matrix is None:
+            matrix = self.store(key, geometry.packed_distances(
+                coordinates, metric=metric, rounding=rounding,
+                number_digit=number_digit, dtype=dtype))
+        return matrix
+
+
+class InstanceCache(DiskCache):
+    """Archives of numpy arrays, such as the instances of a library read
+    by :py:class:`VRPSolverEasy.io.library.InstanceLibrary`, stored as
+    uncompressed .npz files. The arrays of an archive are read at once."""
+
+    suffix = ".npz"
+
+    def __init__(self, directory=None, max_size=256 * 2**20):
+        if directory is None:
+            directory = cache_directory("instances")
+        super().__init__(directory, max_size)
+
+    @staticmethod
+    def key(name):
+        """Return the key of the archive of name"""
+        return hashlib.sha256(name.encode('UTF-8')).hexdigest()
+
+    def load(self, key):
+        """Return the dictionary of the arrays of key, or None"""
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            with np.load(path) as archive:
+                return {name: archive[name] for name in archive.files}
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # deleted or being replaced by another process
+            return None
+
+    def store(self, key, arrays):
+        """Store the dictionary of arrays"""
+        self.write_with(key, lambda file: np.savez(file, **arrays))
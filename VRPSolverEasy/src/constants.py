@@ -17,6 +17,11 @@ PATH_SYSTEM = {"Linux": "LD_LIBRARY_PATH", "Darwin": "PATH", "Windows": "PATH"}
 SOLVERS = ["CLP", "CPLEX"]
 PRINT_LEVEL_LIST = [-2, -1, 0, 1, 2]
 ACTIONS = ["enumAllFeasibleRoutes", "solve"]
+VALIDATION_MODES = ["immediate", "deferred"]
+CLUSTERING_METHODS = ["sweep", "kmeans", "kmedoids"]
+METRICS = ["euclidean", "manhattan", "haversine"]
+ROUNDINGS = ["none", "round", "floor"]
+INSTANCE_FORMATS = ["cvrplib", "solomon", "golden", "cordeau", "richvrp"]
 
 # property status
 INVALID_PROPERTY = 0
@@ -36,6 +41,8 @@ ENUM_STR_PROPERTY = 13
 ENUM_INT_PROPERTY = 14
 TUPLE_PROPERTY = 15
 LESS_MAX_POINTS_ID_PROPERTY = 16
+MATRIX_PROPERTY = 17
+FINITE_PROPERTY = 18
 ERRORS_PROPERTY = {
     INVALID_PROPERTY: " is an invalid property",
     INTEGER_PROPERTY: " must be an integer",
@@ -53,7 +60,10 @@ ERRORS_PROPERTY = {
     LINK_PROPERTY: "The value must be a Link",
     ENUM_STR_PROPERTY: " must be a string in the following list: ",
     ENUM_INT_PROPERTY: " must be an integer in the following list: ",
-    TUPLE_PROPERTY: " must be a tuple of lenght 2 "}
+    TUPLE_PROPERTY: " must be a tuple of lenght 2 ",
+    MATRIX_PROPERTY: " must be a square matrix or the upper triangular"
+                     " part of a square matrix",
+    FINITE_PROPERTY: " must be a finite number"}
 
 # model errors
 CUSTOMERS_ERROR = -6
@@ -74,6 +84,10 @@ PLATFORM_ERROR = -20
 LOAD_LIB_ERROR = -21
 BAPCOD_ERROR = -22
 MODEL_NOT_SOLVED = -23
+VALIDATION_ERROR = -24
+CAPACITY_ERROR = -25
+TIME_WINDOWS_ERROR = -26
+FLEET_ERROR = -27
 
 ERRORS_MODEL = {
     CUSTOMERS_ERROR: "CUSTOMERS ERROR",
@@ -103,11 +117,19 @@ ERRORS_MODEL = {
                if the error persists please contact our support
               for more information""",
    MODEL_NOT_SOLVED: """ The model is not yet solved. 
-              You can solve it by using the function solve()""" }
+              You can solve it by using the function solve()""",
+   VALIDATION_ERROR: "The following properties of the model are not valid :",
+   CAPACITY_ERROR: "The demand of the following customers exceeds the"
+                   " capacity of all vehicle types able to visit them :",
+   TIME_WINDOWS_ERROR: "The time windows of the following customers cannot"
+                       " be respected by any vehicle type :",
+   FLEET_ERROR: "The vehicles available cannot serve all customers :"}
 
 # solution status
 INFEASIBLE = -2
 INTERRUPTED_BY_ERROR = -1
+DEADLINE_EXCEEDED_MESSAGE = """The resolution exceeded its time limit
+              and the worker solving it was stopped"""
 OPTIMAL_SOL_FOUND = 0
 BETTER_SOL_FOUND = 1
 BETTER_SOL_DOES_NOT_EXISTS = 2
@@ -133,6 +155,11 @@ ENUMERATION_STATUS = {ENUMERATION_INFEASIBLE: "ENUMERATION_INFEASIBLE",
 # Dictionary
 KEY_STR = "key"
 ID_STR = "id"
+VALIDATE_STR = "validate"
+METHOD_STR = "method"
+METRIC_STR = "metric"
+ROUNDING_STR = "rounding"
+FORMAT_STR = "format"
 NB_POINTS_STR = "The number of points"
 STATUS = "status"
 MESSAGE = "message"
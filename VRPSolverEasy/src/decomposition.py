@@ -0,0 +1,738 @@
+"""This module solves models with more points than the solver accepts by a
+cluster-first, route-second decomposition: the customers are partitioned in
+clusters, the model of each cluster is solved in a worker process and the
+routes of all clusters are stitched in one solution"""
+
+import copy
+import math
+import os
+import time
+import numpy as np
+from VRPSolverEasy.src import constants, geometry, parallel
+from VRPSolverEasy.src.presolve import _capacity_numbers
+from VRPSolverEasy.src.solver import (Depot, Model, ModelError, Parameters,
+                                      Point, PropertyError, Solution,
+                                      VehicleType)
+
+# number of points accepted by the solver in one model
+MAX_POINTS = 1022
+
+# a new solution of routes must decrease their cost by more than this value
+EPSILON = 1e-6
+
+
+def _split(total, weights):
+    """Split the integer total in proportion to weights,
+    the units left are given to the largest remainders"""
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.sum() <= 0:
+        weights = np.ones(len(weights))
+    shares = total * weights / weights.sum()
+    counts = np.floor(shares).astype(np.int64)
+    order = np.argsort(counts - shares, kind="stable")
+    counts[order[:total - int(counts.sum())]] += 1
+    return counts
+
+
+def _kmeans(coordinates, nb_clusters, rng, iterations=100):
+    """Return the label of each point given by the algorithm of Lloyd,
+    started from centers chosen by k-means++"""
+    centers = coordinates[[rng.integers(len(coordinates))]]
+    nearest = ((coordinates - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, nb_clusters):
+        total = nearest.sum()
+        if total <= 0:
+            break
+        center = coordinates[rng.choice(len(coordinates), p=nearest / total)]
+        centers = np.vstack((centers, center))
+        np.minimum(nearest, ((coordinates - center) ** 2).sum(axis=1),
+                   out=nearest)
+    labels = None
+    for _ in range(iterations):
+        distances = ((coordinates ** 2).sum(axis=1)[:, None]
+                     - 2 * coordinates @ centers.T
+                     + (centers ** 2).sum(axis=1)[None, :])
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        sizes = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, coordinates)
+        used = sizes > 0
+        centers[used] = sums[used] / sizes[used, None]
+    return labels
+
+
+def _kmedoids(distance, size, nb_clusters, rng, iterations=100):
+    """Return the label of each point given by alternating the assignment
+    of the points to their nearest medoid and the choice of the medoid of
+    each cluster, started from medoids chosen as in k-means++.
+    distance(rows, columns) gives the matrix of distances between the
+    size points"""
+    medoids = [int(rng.integers(size))]
+    nearest = distance(np.arange(size), medoids)[:, 0] ** 2
+    for _ in range(1, nb_clusters):
+        total = nearest.sum()
+        if total <= 0:
+            break
+        medoids.append(int(rng.choice(size, p=nearest / total)))
+        np.minimum(nearest, distance(np.arange(size),
+                                     medoids[-1:])[:, 0] ** 2, out=nearest)
+    labels = None
+    for _ in range(iterations):
+        new_labels = distance(np.arange(size), medoids).argmin(axis=1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for label in range(len(medoids)):
+            rows = np.flatnonzero(labels == label)
+            if len(rows) > 0:
+                medoids[label] = int(
+                    rows[distance(rows, rows).sum(axis=1).argmin()])
+    return labels
+
+
+class _Route:
+    """Route of the stitched solution, with the rows of its customers"""
+
+    __slots__ = ("cluster", "rows", "output", "cost")
+
+    def __init__(self, cluster, rows, output, cost):
+        self.cluster = cluster
+        self.rows = rows
+        self.output = output
+        self.cost = cost
+
+
+class DecomposedModel:
+    """Routing model with more points than the solver accepts, solved by
+    decomposition.
+
+    Vehicle types, depots and customers are added as in :py:class:`Model`,
+    each customer is a single point. The links are not given one by one:
+    the distances are computed from the coordinates of the points with
+    the metric given (see :py:mod:`VRPSolverEasy.src.geometry`), or are
+    given by a square matrix of distances. The times
+    are given by a square matrix of times, or are the distances divided by
+    speed, or are 0. Coordinates and matrices have one row for each point,
+    in the order in which the points are added. With a
+    :py:class:`cache.MatrixCache`, the matrix of distances of all the
+    coordinates is read from the cache, memory mapped, instead of being
+    computed by blocks for each cluster.
+
+    Each cluster is solved with all depots and vehicle types, the vehicles
+    of each type and the maximum total number of vehicles are shared among
+    the clusters in proportion to their demand.
+    """
+
+    def __init__(self, coordinates=None, distance=None, time=None,
+                 speed=None, metric="euclidean", cache=None):
+        if metric not in constants.METRICS:
+            raise PropertyError(constants.METRIC_STR,
+                                constants.ENUM_STR_PROPERTY,
+                                str(constants.METRICS))
+        self.coordinates = coordinates
+        self.metric = metric
+        self.distance = distance
+        self.time = time
+        self.speed = speed
+        self.cache = cache
+        self.vehicle_types = {}
+        self.depots = {}
+        self.customers = {}
+        self.max_total_vehicles_number = 10000
+        self.parameters = Parameters()
+        self.solution = Solution()
+        self.status = int(constants.MODEL_NOT_SOLVED)
+        self.message = str()
+        self.clusters = []
+        self.results = []
+        self.__ids = []
+        self.__row = {}
+        self.__symmetric = True
+        self.__cached = None
+        self.__solution_routes = []
+
+    def add_vehicle_type(
+            self,
+            id: int,
+            start_point_id=-1,
+            end_point_id=-1,
+            name=str(),
+            capacity=0,
+            fixed_cost=0.0,
+            var_cost_dist=0.0,
+            var_cost_time=0.0,
+            max_number=1,
+            tw_begin=0.0,
+            tw_end=0.0):
+        """Add VehicleType in dictionary :py:attr:`vehicle_types`"""
+        if id in self.vehicle_types:
+            raise ModelError(constants.ADD_VEHICLE_TYPE_ERROR)
+        self.vehicle_types[id] = VehicleType(
+            id, start_point_id, end_point_id, name, capacity, fixed_cost,
+            var_cost_dist, var_cost_time, max_number, tw_begin, tw_end)
+
+    def add_depot(
+            self,
+            id,
+            name=str(),
+            service_time=0.0,
+            cost=0.0,
+            tw_begin=0.0,
+            tw_end=0.0,
+            incompatible_vehicles=[]):
+        """Add depot in dictionary :py:attr:`depots`"""
+        if id in self.depots or id in self.customers:
+            raise ModelError(constants.ADD_POINT_ERROR)
+        self.depots[id] = Depot(id, name, cost, service_time, tw_begin,
+                                tw_end, incompatible_vehicles)
+        self.__ids.append(id)
+
+    def add_customer(
+            self,
+            id,
+            name=str(),
+            service_time=0.0,
+            penalty=0.0,
+            tw_begin=0.0,
+            tw_end=0.0,
+            demand=0,
+            incompatible_vehicles=[]):
+        """Add customer in dictionary :py:attr:`customers`"""
+        if id in self.depots or id in self.customers:
+            raise ModelError(constants.ADD_POINT_ERROR)
+        if id < 1:
+            raise PropertyError(constants.POINT.ID.value,
+                                constants.GREATER_ONE_PROPERTY)
+        self.customers[id] = Point(id, name, 0, penalty, service_time,
+                                   tw_begin, tw_end, demand,
+                                   incompatible_vehicles)
+        self.__ids.append(id)
+
+    def set_parameters(self, time_limit=300, upper_bound=1000000,
+                       heuristic_used=False, time_limit_heuristic=20,
+                       config_file=str(), solver_name="CLP",
+                       print_level=-1, action="solve", cplex_path=""):
+        """Set the parameters of the model of each cluster"""
+        self.parameters = Parameters(
+            time_limit,
+            upper_bound,
+            heuristic_used,
+            time_limit_heuristic,
+            config_file,
+            solver_name,
+            print_level,
+            action,
+            cplex_path)
+
+    def set_max_total_vehicles_number(self, number=10000):
+        self.max_total_vehicles_number = number
+
+    def __check(self):
+        """Check the model before it is solved"""
+        if len(self.depots) == 0:
+            raise ModelError(constants.DEPOTS_ERROR)
+        if len(self.customers) == 0:
+            raise ModelError(constants.CUSTOMERS_ERROR)
+        if len(self.vehicle_types) == 0:
+            raise ModelError(constants.MIN_VEHICLE_TYPES_ERROR)
+        nb_points = len(self.__ids)
+        if self.coordinates is None and self.distance is None:
+            raise ModelError(constants.LINKS_ERROR,
+                             " : coordinates or distances are needed")
+        if self.coordinates is not None and \
+                np.shape(self.coordinates) != (nb_points, 2):
+            raise ModelError(constants.LINKS_ERROR,
+                             " : one row of coordinates x, y is needed"
+                             " for each point")
+        for name, matrix in ((constants.LINK.DISTANCE.value, self.distance),
+                             (constants.LINK.TIME.value, self.time)):
+            if matrix is not None and \
+                    np.shape(matrix) != (nb_points, nb_points):
+                raise PropertyError(name, constants.MATRIX_PROPERTY)
+        self.__row = {point_id: i for i, point_id in enumerate(self.__ids)}
+        self.__symmetric = self.__is_symmetric()
+        self.__cached = None
+        if self.distance is None and self.cache is not None:
+            self.__cached = self.cache.distance_matrix(self.coordinates,
+                                                       self.metric)
+
+    def __check_clusters(self, method, max_cluster_size):
+        """Check the parameters of the clusters"""
+        if method not in constants.CLUSTERING_METHODS:
+            raise PropertyError(constants.METHOD_STR,
+                                constants.ENUM_STR_PROPERTY,
+                                str(constants.CLUSTERING_METHODS))
+        if not isinstance(max_cluster_size, int) or max_cluster_size < 1:
+            raise PropertyError("max_cluster_size",
+                                constants.GREATER_ONE_PROPERTY)
+        if max_cluster_size + len(self.depots) > MAX_POINTS:
+            raise PropertyError(constants.NB_POINTS_STR,
+                                constants.LESS_MAX_POINTS_PROPERTY)
+        self.__check()
+        if (method == "sweep" or method == "kmeans") and \
+                self.coordinates is None:
+            raise ModelError(constants.LINKS_ERROR,
+                             " : coordinates are needed by " + method)
+
+    def __distances(self, rows, columns):
+        """Return the matrix of distances between points given by rows"""
+        if self.distance is not None:
+            return np.asarray(self.distance)[np.ix_(rows, columns)]
+        if self.__cached is not None:
+            return self.__cached[np.ix_(rows, columns)]
+        coordinates = np.asarray(self.coordinates, dtype=np.float64)
+        return geometry.distance_matrix(coordinates[rows],
+                                        coordinates[columns], self.metric)
+
+    def __times(self, rows, distance):
+        """Return the matrix of times between points given by rows"""
+        if self.time is not None:
+            return np.asarray(self.time)[np.ix_(rows, rows)]
+        if self.speed is not None:
+            return distance / self.speed
+        return None
+
+    def __is_symmetric(self):
+        if self.distance is None:
+            return self.time is None or np.array_equal(
+                np.asarray(self.time), np.asarray(self.time).T)
+        return all(matrix is None or np.array_equal(
+            np.asarray(matrix), np.asarray(matrix).T)
+            for matrix in (self.distance, self.time))
+
+    def __partition(self, customers, method, nb_clusters, rng):
+        """Return the clusters of the rows of customers"""
+        if nb_clusters <= 1:
+            return [customers]
+        if method == "sweep":
+            coordinates = np.asarray(self.coordinates, dtype=np.float64)
+            center = coordinates[[i for i, point_id in enumerate(self.__ids)
+                                  if point_id in self.depots]].mean(axis=0)
+            vectors = coordinates[customers] - center
+            angles = np.arctan2(vectors[:, 1], vectors[:, 0])
+            order = np.argsort(angles, kind="stable")
+            # the sweep starts after the largest angle between customers
+            gaps = np.diff(np.append(angles[order],
+                                     angles[order[0]] + 2 * math.pi))
+            order = np.roll(order, -(int(gaps.argmax()) + 1))
+            return [customers[part]
+                    for part in np.array_split(order, nb_clusters)]
+        if method == "kmeans":
+            labels = _kmeans(np.asarray(self.coordinates,
+                                        dtype=np.float64)[customers],
+                             nb_clusters, rng)
+        else:
+            def distance(rows, columns):
+                return self.__distances(customers[rows], customers[columns])
+            labels = _kmedoids(distance, len(customers), nb_clusters, rng)
+        return [customers[labels == label]
+                for label in np.unique(labels)]
+
+    def __clusters(self, method, max_cluster_size, nb_clusters, seed):
+        """Partition the customers in clusters of at most max_cluster_size
+        customers, clusters too large are partitioned again"""
+        rng = np.random.default_rng(seed)
+        customers = np.array([i for i, point_id in enumerate(self.__ids)
+                              if point_id in self.customers],
+                             dtype=np.int64)
+        if nb_clusters is None:
+            nb_clusters = math.ceil(len(customers) / max_cluster_size)
+        clusters = []
+        pending = self.__partition(customers, method, nb_clusters, rng)
+        while pending:
+            cluster = pending.pop()
+            if len(cluster) <= max_cluster_size:
+                clusters.append(cluster)
+                continue
+            parts = self.__partition(
+                cluster, method, math.ceil(len(cluster) / max_cluster_size),
+                rng)
+            if len(parts) <= 1:
+                # identical points cannot be separated by distances
+                parts = np.array_split(
+                    cluster, math.ceil(len(cluster) / max_cluster_size))
+            pending.extend(parts)
+        return sorted(clusters, key=lambda cluster: cluster.min())
+
+    def __sub_model(self, rows, max_numbers, max_total, upper_bound=None,
+                    time_limit=None):
+        """Build the model of the customers given by rows, return it with
+        the row of each of its customers. The vehicle types without vehicle
+        in max_numbers are left out: the solver reads a maximum number of 0
+        as no limit."""
+        model = Model()
+        vehicle_types = [vehicle for vehicle in self.vehicle_types.values()
+                         if max_numbers.get(vehicle.id, 0) > 0]
+        if len(vehicle_types) == 0 or max_total < 1:
+            raise ModelError(constants.FLEET_ERROR,
+                             " no vehicle is left for a part of the model")
+        type_ids = {vehicle.id for vehicle in vehicle_types}
+        for vehicle in vehicle_types:
+            model.add_vehicle_type(
+                vehicle.id, vehicle.start_point_id, vehicle.end_point_id,
+                vehicle.name, vehicle.capacity, vehicle.fixed_cost,
+                vehicle.var_cost_dist, vehicle.var_cost_time,
+                int(max_numbers[vehicle.id]), vehicle.tw_begin,
+                vehicle.tw_end)
+        point_ids = []
+        point_rows = []
+        for point_id, depot in self.depots.items():
+            model.add_depot(depot.id, depot.name, depot.service_time,
+                            depot.penalty_or_cost, depot.tw_begin,
+                            depot.tw_end,
+                            [type_id for type_id in
+                             depot.incompatible_vehicles
+                             if type_id in type_ids])
+            point_ids.append(point_id)
+            point_rows.append(self.__row[point_id])
+        to_row = {}
+        local_id = 0
+        for row in rows:
+            local_id += 1
+            while local_id in self.depots:
+                local_id += 1
+            customer = self.customers[self.__ids[row]]
+            model.add_customer(local_id, customer.name,
+                               service_time=customer.service_time,
+                               penalty=customer.penalty_or_cost,
+                               tw_begin=customer.tw_begin,
+                               tw_end=customer.tw_end,
+                               demand=customer.demand,
+                               incompatible_vehicles=[
+                                   type_id for type_id in
+                                   customer.incompatible_vehicles
+                                   if type_id in type_ids])
+            to_row[local_id] = int(row)
+            point_ids.append(local_id)
+            point_rows.append(row)
+        distance = self.__distances(point_rows, point_rows)
+        model.add_links_from_matrix(distance,
+                                    self.__times(point_rows, distance),
+                                    point_ids=point_ids,
+                                    symmetric=self.__symmetric)
+        model.max_total_vehicles_number = int(max_total)
+        model.parameters = copy.copy(self.parameters)
+        if upper_bound is not None:
+            model.parameters.upper_bound = upper_bound
+        if time_limit is not None:
+            model.parameters.time_limit = time_limit
+        return model, to_row
+
+    def __routes(self, solution, to_row, cluster):
+        """Return the routes of the solution of a cluster, with the ids of
+        the points of this model"""
+        routes = []
+        point_id = constants.ROUTE.POINT_ID.value
+        for route in solution.routes:
+            output = dict(route.route)
+            output[constants.ROUTE.VISITED_POINTS.value] = [
+                dict(visited, **{point_id: self.__ids[to_row[
+                    visited[point_id]]]})
+                if visited[point_id] in to_row else dict(visited)
+                for visited in route.route[
+                    constants.ROUTE.VISITED_POINTS.value]]
+            routes.append(_Route(
+                cluster, [to_row[i] for i in route.point_ids if i in to_row],
+                output, route.route_cost))
+        return routes
+
+    def __routes_model(self, routes, time_limit):
+        """Build the model of the customers of routes, with only the
+        vehicles of the routes and their cost as upper bound, return it with
+        the row of each of its customers and the upper bound"""
+        max_numbers = {}
+        for route in routes:
+            type_id = route.output[constants.ROUTE.VEHICLE_TYPE_ID.value]
+            max_numbers[type_id] = max_numbers.get(type_id, 0) + 1
+        bound = sum(route.cost for route in routes)
+        model, to_row = self.__sub_model(
+            [row for route in routes for row in route.rows], max_numbers,
+            len(routes), bound, time_limit)
+        return model, to_row, bound
+
+    def __fleet(self, clusters):
+        """Give each cluster the fewest vehicles whose capacities cover its
+        demand, then share the other vehicles among the clusters in
+        proportion to their demand. Return the numbers of each type and
+        the total numbers, raise a ModelError if the vehicles are not
+        enough"""
+        vehicle_types = list(self.vehicle_types.values())
+        capacities = [vehicle.capacity for vehicle in vehicle_types]
+        available = [vehicle.max_number for vehicle in vehicle_types]
+        demands = [sum(self.customers[self.__ids[row]].demand
+                       for row in cluster) for cluster in clusters]
+        minimums = [None] * len(clusters)
+        for c in sorted(range(len(clusters)), key=demands.__getitem__,
+                        reverse=True):
+            minimums[c] = _capacity_numbers(demands[c], capacities,
+                                            available)
+            if minimums[c] is None:
+                raise ModelError(constants.FLEET_ERROR,
+                                 f" the demand {demands[c]} of cluster {c}"
+                                 " exceeds the capacity of the vehicles"
+                                 " left")
+            available = [number - needed for number, needed
+                         in zip(available, minimums[c])]
+        minimums = np.array(minimums, dtype=np.int64).reshape(
+            len(clusters), len(vehicle_types))
+        min_totals = minimums.sum(axis=1)
+        if min_totals.sum() > self.max_total_vehicles_number:
+            raise ModelError(constants.FLEET_ERROR,
+                             f" at least {min_totals.sum()} vehicles are"
+                             f" needed but {self.max_total_vehicles_number}"
+                             " are available")
+
+        weights = demands
+        if sum(weights) <= 0:
+            weights = [len(cluster) for cluster in clusters]
+        max_numbers = {vehicle.id: minimums[:, k] + _split(available[k],
+                                                           weights)
+                       for k, vehicle in enumerate(vehicle_types)}
+        max_total = np.minimum(
+            min_totals + _split(self.max_total_vehicles_number -
+                                int(min_totals.sum()), weights),
+            sum(max_numbers.values()))
+        if max_total.min() < 1:
+            raise ModelError(constants.FLEET_ERROR,
+                             f" {len(clusters)} clusters need at least one"
+                             " vehicle each but "
+                             f"{int((max_total > 0).sum())} get one")
+        return ([{type_id: numbers[c]
+                  for type_id, numbers in max_numbers.items()}
+                 for c in range(len(clusters))], max_total)
+
+    def __refine(self, routes, clusters, border_routes, time_limit,
+                 workers, backend_factory):
+        """Solve again the border_routes routes of each cluster nearest to
+        its nearest cluster together with those of the nearest cluster,
+        keep the new routes if they are cheaper. Return the change of the
+        value of the solution"""
+        medoids = []
+        for cluster in clusters:
+            medoids.append(int(cluster[self.__distances(
+                cluster, cluster).sum(axis=1).argmin()]))
+        distance = self.__distances(medoids, medoids)
+        np.fill_diagonal(distance, np.inf)
+        pairs = sorted({(min(c, d), max(c, d)) for c, d in
+                        enumerate(distance.argmin(axis=1).tolist())},
+                       key=lambda pair: distance[pair])
+        taken = set()
+        selections = []
+        models = []
+        for pair in pairs:
+            selected = []
+            for own, other in (pair, pair[::-1]):
+                candidates = [r for r, route in enumerate(routes)
+                              if route.cluster == own and route.rows and
+                              r not in taken]
+                candidates.sort(key=lambda r: self.__distances(
+                    routes[r].rows, [medoids[other]]).min())
+                selected.extend(candidates[:border_routes])
+            if len(selected) < 2:
+                continue
+            taken.update(selected)
+            model, to_row, bound = self.__routes_model(
+                [routes[r] for r in selected], time_limit)
+            selections.append((selected, to_row, bound))
+            models.append(model)
+        change = 0
+        replaced = set()
+        new_routes = []
+        for result in parallel.solve_many(models, workers, backend_factory):
+            selected, to_row, bound = selections[result.index]
+            if result.solution is None or \
+                    not result.solution.is_defined() or \
+                    result.solution.value >= bound - EPSILON:
+                continue
+            change += result.solution.value - bound
+            replaced.update(selected)
+            new_routes.extend(self.__routes(result.solution, to_row,
+                                            routes[selected[0]].cluster))
+        routes[:] = [route for r, route in enumerate(routes)
+                     if r not in replaced] + new_routes
+        return change
+
+    def solve(self, method="sweep", max_cluster_size=100, nb_clusters=None,
+              workers=None, refine=False, border_routes=2,
+              refine_time_limit=None, seed=0, backend_factory=None):
+        """
+        Partition the customers in clusters of at most max_cluster_size
+        customers, solve the model of each cluster in a pool of worker
+        processes (see :py:func:`parallel.solve_many`) and stitch their
+        routes in :py:attr:`solution`.
+
+        The clusters are given by method:
+            - "sweep": consecutive customers by angle around the depots
+            - "kmeans": k-means of the coordinates
+            - "kmedoids": k-medoids of the distances
+        With refine, the border_routes routes of each cluster nearest to
+        its nearest cluster are solved again together with those of the
+        nearest cluster, within refine_time_limit seconds (by default the
+        time limit of the parameters), and replaced if they are improved.
+
+        The status is FEASIBLE_SOL_FOUND if every cluster is solved,
+        otherwise it is the status of the first cluster without solution.
+        The result of each cluster is kept in :py:attr:`results`.
+        """
+        self.__check_clusters(method, max_cluster_size)
+        clusters = self.__clusters(method, max_cluster_size, nb_clusters,
+                                   seed)
+        self.clusters = [[self.__ids[row] for row in cluster]
+                         for cluster in clusters]
+        max_numbers, max_total = self.__fleet(clusters)
+        models = []
+        to_rows = []
+        for c, cluster in enumerate(clusters):
+            model, to_row = self.__sub_model(cluster, max_numbers[c],
+                                             max_total[c])
+            models.append(model)
+            to_rows.append(to_row)
+
+        self.results = sorted(
+            parallel.solve_many(models, workers, backend_factory),
+            key=lambda result: result.index)
+        self.solution = Solution()
+        for result in self.results:
+            if result.solution is None or not result.solution.is_defined():
+                self.status = result.status
+                self.message = ("cluster " + str(result.index) + " : " +
+                                result.message)
+                return
+        routes = []
+        value = 0
+        for result in self.results:
+            routes.extend(self.__routes(result.solution,
+                                        to_rows[result.index],
+                                        result.index))
+            value += result.solution.value
+        if refine and len(clusters) > 1:
+            value += self.__refine(routes, clusters, border_routes,
+                                   refine_time_limit, workers,
+                                   backend_factory)
+        self.__stitch(routes, value)
+
+    def __stitch(self, routes, value):
+        """Set the solution of the routes"""
+        self.__solution_routes = routes
+        self.status = constants.FEASIBLE_SOL_FOUND
+        self.message = "FEASIBLE_SOL_FOUND"
+        output = {"Status": {"code": self.status, "message": self.message},
+                  "Solution": {"bestSolutionValue": value,
+                               "Routes": [route.output
+                                          for route in routes]}}
+        self.solution = Solution(output, self.status)
+
+    def __read_solution(self, solution):
+        """Return the routes of a solution given with the ids of this
+        model"""
+        routes = []
+        for route in solution.routes:
+            if route.vehicle_type_id not in self.vehicle_types:
+                raise ModelError(constants.VEHICLES_ERROR,
+                                 " : unknown vehicle type " +
+                                 str(route.vehicle_type_id))
+            routes.append(_Route(
+                -1, [self.__row[i] for i in route.point_ids
+                     if i in self.customers],
+                route.route, route.route_cost))
+        return routes
+
+    def improve(self, solution=None, routes_per_subproblem=4,
+                time_limit=60, subproblem_time_limit=10,
+                max_subproblems=None, workers=None, seed=0,
+                backend_factory=None):
+        """
+        Improve :py:attr:`solution`, or the solution given with the ids of
+        this model, by POPMUSIC: a seed route and its
+        routes_per_subproblem - 1 nearest routes are solved again together
+        within subproblem_time_limit seconds, with their cost as upper
+        bound and their vehicles, and are replaced by the new routes if
+        they are cheaper. Each route is a seed once, the new routes become
+        seeds again, until no seed is left or time_limit seconds or
+        max_subproblems subproblems are spent.
+
+        Subproblems without common routes are solved concurrently in a
+        :py:class:`parallel.SolverPool` of workers processes.
+        Return the number of subproblems which improved the solution.
+        """
+        start = time.perf_counter()
+        self.__check()
+        if solution is not None:
+            routes = self.__read_solution(solution)
+            value = solution.value
+        elif self.solution.is_defined():
+            routes = list(self.__solution_routes)
+            value = self.solution.value
+        else:
+            raise ModelError(constants.MODEL_NOT_SOLVED)
+        # routes without customers are removed
+        value -= sum(route.cost for route in routes if not route.rows)
+        routes = [route for route in routes if route.rows]
+        rng = np.random.default_rng(seed)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        seeds = set(routes)
+        nb_subproblems = 0
+        nb_improvements = 0
+        with parallel.SolverPool(
+                workers, cplex_path=self.parameters.cplex_path,
+                backend_factory=backend_factory) as pool:
+            while seeds and len(routes) >= 2 and \
+                    time.perf_counter() - start < time_limit and \
+                    (max_subproblems is None or
+                     nb_subproblems < max_subproblems):
+                centers = [route.rows[self.__distances(
+                    route.rows, route.rows).sum(axis=1).argmin()]
+                    for route in routes]
+                position = {route: r for r, route in enumerate(routes)}
+                taken = set()
+                subproblems = []
+                for route in rng.permutation(
+                        sorted(seeds, key=position.get)).tolist():
+                    if max_subproblems is not None and \
+                            nb_subproblems + len(subproblems) >= \
+                            max_subproblems:
+                        break
+                    if len(subproblems) >= workers:
+                        break
+                    nearest = np.argsort(self.__distances(
+                        [centers[position[route]]], centers)[0],
+                        kind="stable")[:routes_per_subproblem]
+                    selected = [routes[r] for r in nearest.tolist()]
+                    if route not in selected:
+                        selected[-1] = route
+                    if taken.intersection(selected):
+                        continue
+                    taken.update(selected)
+                    subproblems.append((route, selected) +
+                                       self.__routes_model(
+                                           selected, subproblem_time_limit))
+                if not subproblems:
+                    break
+                nb_subproblems += len(subproblems)
+                replaced = set()
+                for result in pool.solve_many(
+                        [subproblem[2] for subproblem in subproblems]):
+                    route, selected, _, to_row, bound = \
+                        subproblems[result.index]
+                    seeds.discard(route)
+                    if result.solution is None or \
+                            not result.solution.is_defined() or \
+                            result.solution.value >= bound - EPSILON:
+                        continue
+                    nb_improvements += 1
+                    value += result.solution.value - bound
+                    replaced.update(selected)
+                    new_routes = [new_route for new_route in self.__routes(
+                        result.solution, to_row, route.cluster)
+                        if new_route.rows]
+                    routes.extend(new_routes)
+                    seeds.update(new_routes)
+                routes = [route for route in routes
+                          if route not in replaced]
+                seeds.difference_update(replaced)
+        self.__stitch(routes, value)
+        return nb_improvements
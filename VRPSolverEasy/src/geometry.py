@@ -0,0 +1,131 @@
+"""This module computes the matrices of distances between points with numpy.
+
+The distances are computed by blocks of rows, so that the blocks stay in the
+cache of the processor. The matrices can be given to
+:py:meth:`Model.add_links_from_matrix`, square or as the upper triangular
+part given row by row (pairs (0,1), (0,2), ..., (1,2), ...).
+
+The metrics are:
+    - "euclidean": coordinates x, y
+    - "manhattan": coordinates x, y
+    - "haversine": coordinates latitude, longitude in degrees,
+      distances on a sphere of the radius given (in km by default)
+The roundings are:
+    - "none": exact distances
+    - "round": distances rounded to number_digit digits, as with round
+    - "floor": distances rounded down to number_digit digits
+"""
+
+import numpy as np
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.solver import PropertyError
+
+# mean radius of the earth in km
+EARTH_RADIUS = 6371.0
+
+# number of distances computed in one block
+BLOCK_SIZE = 1 << 14
+
+
+def _coordinates(coordinates):
+    """Return the two columns of the coordinates of shape (n, 2)
+    in an array of shape (2, n)"""
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    if coordinates.ndim != 2 or coordinates.shape[1] != 2:
+        raise PropertyError("coordinates", constants.MATRIX_PROPERTY)
+    return np.ascontiguousarray(coordinates.T)
+
+
+def _check(metric, rounding):
+    if metric not in constants.METRICS:
+        raise PropertyError(constants.METRIC_STR,
+                            constants.ENUM_STR_PROPERTY,
+                            str(constants.METRICS))
+    if rounding not in constants.ROUNDINGS:
+        raise PropertyError(constants.ROUNDING_STR,
+                            constants.ENUM_STR_PROPERTY,
+                            str(constants.ROUNDINGS))
+
+
+def _block(first, second, metric, rounding, number_digit, radius, out):
+    """Compute in out the distances between the points of first (rows)
+    and of second (columns), given by their columns of coordinates"""
+    if metric == "haversine":
+        latitude, longitude = np.radians(first)
+        other_latitude, other_longitude = np.radians(second)
+        value = np.sin((latitude[:, None] - other_latitude) / 2) ** 2
+        value += (np.cos(latitude)[:, None] * np.cos(other_latitude) *
+                  np.sin((longitude[:, None] - other_longitude) / 2) ** 2)
+        np.minimum(value, 1, out=value)
+        value = 2 * radius * np.arcsin(np.sqrt(value, out=value), out=value)
+    else:
+        value = first[0][:, None] - second[0]
+        dy = first[1][:, None] - second[1]
+        if metric == "euclidean":
+            np.multiply(value, value, out=value)
+            np.multiply(dy, dy, out=dy)
+            value += dy
+            np.sqrt(value, out=value)
+        else:
+            np.abs(value, out=value)
+            value += np.abs(dy, out=dy)
+    if rounding == "round":
+        value = np.round(value, number_digit, out=value)
+    elif rounding == "floor":
+        scale = 10.0 ** number_digit
+        value *= scale
+        np.floor(value, out=value)
+        value /= scale
+    out[...] = value
+
+
+def distance_matrix(coordinates, other=None, metric="euclidean",
+                    rounding="none", number_digit=3, dtype=np.float64,
+                    radius=EARTH_RADIUS):
+    """Return the matrix of the distances from each point of coordinates
+    (rows) to each point of other (columns), by default of coordinates"""
+    _check(metric, rounding)
+    coordinates = _coordinates(coordinates)
+    other = coordinates if other is None else _coordinates(other)
+    matrix = np.empty((coordinates.shape[1], other.shape[1]), dtype=dtype)
+    step = max(1, BLOCK_SIZE // max(1, other.shape[1]))
+    for start in range(0, coordinates.shape[1], step):
+        _block(coordinates[:, start:start + step], other, metric, rounding,
+               number_digit, radius, matrix[start:start + step])
+    return matrix
+
+
+def packed_distances(coordinates, metric="euclidean", rounding="none",
+                     number_digit=3, dtype=np.float64, radius=EARTH_RADIUS):
+    """Return the upper triangular part of the matrix of distances of
+    coordinates, row by row (pairs (0,1), (0,2), ..., (1,2), ...),
+    without building the square matrix"""
+    _check(metric, rounding)
+    coordinates = _coordinates(coordinates)
+    size = coordinates.shape[1]
+    packed = np.empty(size * (size - 1) // 2, dtype=dtype)
+    position = 0
+    start = 0
+    while start < size - 1:
+        # rows start..end-1 have about BLOCK_SIZE distances
+        end = start + 1
+        length = size - end
+        while end < size - 1 and length + size - end - 1 <= BLOCK_SIZE:
+            end += 1
+            length += size - end
+        block = np.empty((end - start, size - start - 1))
+        _block(coordinates[:, start:end], coordinates[:, start + 1:],
+               metric, rounding, number_digit, radius, block)
+        for i in range(start, end):
+            packed[position:position + size - i - 1] = \
+                block[i - start, i - start:]
+            position += size - i - 1
+        start = end
+    return packed
+
+
+def upper_triangle(matrix):
+    """Return the upper triangular part of a square matrix, row by row,
+    without its diagonal"""
+    matrix = np.asarray(matrix)
+    return matrix[np.triu_indices(len(matrix), 1)]
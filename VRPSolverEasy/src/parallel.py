@@ -0,0 +1,306 @@
+"""This module solves many independent models in parallel processes"""
+
+import os
+import time
+import queue
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.solver import ModelError, get_backend, set_backend
+
+
+class SolveResult:
+    """Result of one model solved in a worker process.
+
+    Attributes:
+        index -- position of the model in the models given
+        model -- the model, updated as with :py:meth:`Model.solve`
+        status -- status of the resolution or code of the error
+        message -- message of the resolution or of the error
+        solution -- solution of the model (None after an error)
+        statistics -- statistics of the model (None after an error)
+        wall_time -- time spent in the worker to solve the model
+    """
+
+    __slots__ = ("index", "model", "status", "message", "solution",
+                 "statistics", "wall_time")
+
+    def __init__(self, index, model, status, message, wall_time=0):
+        self.index = index
+        self.model = model
+        self.status = status
+        self.message = message
+        self.solution = None
+        self.statistics = None
+        self.wall_time = wall_time
+
+    def __repr__(self):
+        return (f"SolveResult(index={self.index}, status={self.status}, "
+                f"wall_time={self.wall_time})")
+
+
+def _init_worker(cplex_path, backend_factory):
+    """Load the backend once in a worker process"""
+    if backend_factory is not None:
+        set_backend(backend_factory())
+        return
+    try:
+        get_backend(cplex_path)
+    except ModelError:
+        # the error is given back by each job of the worker
+        pass
+
+
+def _solve_job(payload, cplex_path):
+    """Solve an encoded model and return the output of the solver,
+    the code of the error if any and the wall time"""
+    start = time.perf_counter()
+    output = None
+    code = None
+    try:
+        output = get_backend(cplex_path).solve(payload)
+    except ModelError as error:
+        code = error.code
+    except BaseException:
+        code = constants.BAPCOD_ERROR
+    return output, code, time.perf_counter() - start
+
+
+def _worker_main(connection, cplex_path, backend_factory):
+    """Solve the jobs received on connection until None is received"""
+    _init_worker(cplex_path, backend_factory)
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        connection.send(_solve_job(*job))
+
+
+def _error_result(index, model, code, wall_time=0):
+    return SolveResult(index, model, code, constants.ERRORS_MODEL[code],
+                       wall_time)
+
+
+def _apply_result(index, model, output, code, wall_time):
+    """Update the model from the output of a worker and return its
+    :py:class:`SolveResult`, or None if the model must be solved again
+    with the links removed by :py:meth:`Model.sparsify_links`"""
+    if code is None:
+        try:
+            if model._apply(output):
+                return None
+        except BaseException:
+            code = constants.BAPCOD_ERROR
+    if code is not None:
+        return _error_result(index, model, code, wall_time)
+    result = SolveResult(index, model, model.status, model.message,
+                         wall_time)
+    result.solution = model.solution
+    result.statistics = model.statistics
+    return result
+
+
+def solve_many(models, workers=None, backend_factory=None):
+    """Solve independent models in a pool of worker processes and yield a
+    :py:class:`SolveResult` for each model as soon as it is solved.
+
+    Each worker loads the library bapcod once, or calls backend_factory
+    once to get its backend. By default, there is one worker per core.
+
+    If a worker process dies (for example on a crash of bapcod), the pool
+    is broken: the model it was solving and all the models not solved yet
+    get a result with the status BAPCOD_ERROR, they are not solved
+    again."""
+    models = list(models)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    cplex_path = (models[0].parameters.cplex_path if models
+                  else str())
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(models))),
+        initializer=_init_worker, initargs=(cplex_path, backend_factory))
+    futures = {}
+
+    def submit(index):
+        """Submit the job of the model index, return its error if any"""
+        model = models[index]
+        try:
+            payload = model._prepare()
+            futures[executor.submit(_solve_job, payload,
+                                    model.parameters.cplex_path)] = index
+        except ModelError as error:
+            return _error_result(index, model, error.code)
+        except BrokenProcessPool:
+            return _error_result(index, model, constants.BAPCOD_ERROR)
+        return None
+
+    try:
+        # all jobs are submitted before the first result is yielded
+        errors = [submit(index) for index in range(len(models))]
+        yield from (error for error in errors if error is not None)
+        while futures:
+            done, _ = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                model = models[index]
+                try:
+                    output, code, wall_time = future.result()
+                except BaseException:
+                    # a worker died, the jobs of the pool are lost
+                    yield _error_result(index, model, constants.BAPCOD_ERROR)
+                    continue
+                result = _apply_result(index, model, output, code, wall_time)
+                if result is None:
+                    result = submit(index)
+                if result is not None:
+                    yield result
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+
+
+class _Worker:
+    """Long-lived process solving the jobs sent through a pipe"""
+
+    def __init__(self, cplex_path, backend_factory):
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_connection, cplex_path, backend_factory),
+            daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def stop(self, timeout=None):
+        """Ask the worker to stop, it is killed after timeout"""
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        """Kill the worker immediately"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+# seconds between two checks of the closing of a pool by waiting threads
+_POLL_INTERVAL = 0.1
+
+
+class SolverPool:
+    """Pool of long-lived worker processes, each keeping bapcod loaded.
+
+    A worker still solving a model after parameters.time_limit + grace
+    seconds is killed and replaced, and the result of the model has the
+    status INTERRUPTED_BY_ERROR. The pool can be used by several threads.
+    """
+
+    def __init__(self, workers=None, grace=5, cplex_path=str(),
+                 backend_factory=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.grace = grace
+        self.__cplex_path = cplex_path
+        self.__backend_factory = backend_factory
+        self.__nb_workers = max(1, workers)
+        self.__idle = queue.Queue()
+        for _ in range(self.__nb_workers):
+            self.__idle.put(self.__spawn())
+        self.__closed = False
+        self.__lock = threading.Lock()
+
+    def __spawn(self):
+        return _Worker(self.__cplex_path, self.__backend_factory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def solve(self, model, index=0):
+        """Solve the model in a worker and return its
+        :py:class:`SolveResult`, the model is updated as with
+        :py:meth:`Model.solve`"""
+        while True:
+            try:
+                payload = model._prepare()
+            except ModelError as error:
+                return _error_result(index, model, error.code)
+            result = self.__solve_payload(model, index, payload)
+            if result is not None:
+                return result
+
+    def __solve_payload(self, model, index, payload):
+        """Solve the json of the model in a worker, return None if the
+        model must be solved again"""
+        deadline = model.parameters.time_limit + self.grace
+        worker = self.__acquire()
+        start = time.perf_counter()
+        code = None
+        try:
+            worker.connection.send((payload, model.parameters.cplex_path))
+            if worker.connection.poll(deadline):
+                output, code, wall_time = worker.connection.recv()
+            else:
+                worker.kill()
+                worker = self.__spawn()
+                model.status = constants.INTERRUPTED_BY_ERROR
+                model.message = constants.DEADLINE_EXCEEDED_MESSAGE
+                return SolveResult(index, model, model.status, model.message,
+                                   time.perf_counter() - start)
+        except (EOFError, OSError):
+            # the worker died during the resolution
+            worker.kill()
+            worker = self.__spawn()
+            return _error_result(index, model, constants.BAPCOD_ERROR,
+                                 time.perf_counter() - start)
+        finally:
+            self.__idle.put(worker)
+        return _apply_result(index, model, output, code, wall_time)
+
+    def __acquire(self):
+        """Wait for an idle worker, raise a ValueError if the pool is
+        closed meanwhile"""
+        while True:
+            if self.__closed:
+                raise ValueError("the pool is closed")
+            try:
+                return self.__idle.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+
+    def solve_many(self, models):
+        """Solve models in the workers and yield a :py:class:`SolveResult`
+        for each model as soon as it is solved"""
+        with concurrent.futures.ThreadPoolExecutor(
+                self.__nb_workers) as executor:
+            futures = [executor.submit(self.solve, model, index)
+                       for index, model in enumerate(models)]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def close(self, timeout=5):
+        """Stop all workers once their current resolution is finished"""
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+        for _ in range(self.__nb_workers):
+            self.__idle.get().stop(timeout)
@@ -0,0 +1,590 @@
+"""This module reduces the links of a model before it is solved"""
+
+import time
+import numpy as np
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.solver import ModelError
+
+# bounds are compared with this tolerance
+TOLERANCE = 1e-6
+
+
+class PresolveReport:
+    """Reduction made by a presolve step of a model.
+
+    Attributes:
+        name -- name of the step
+        nb_links -- number of links before the step
+        nb_removed_links -- number of links removed by the step
+        time -- time spent in the step in seconds
+        details -- other numbers given by the step
+    """
+
+    def __init__(self, name, nb_links):
+        self.name = name
+        self.nb_links = nb_links
+        self.nb_removed_links = 0
+        self.time = 0
+        self.details = {}
+
+    def __repr__(self):
+        return (f"PresolveReport(name={self.name!r}, "
+                f"nb_links={self.nb_links}, "
+                f"nb_removed_links={self.nb_removed_links}, "
+                f"time={self.time:.4f}, details={self.details})")
+
+
+def _link_rows(columns):
+    """Return numpy views of the columns of the links"""
+    return {"alive": np.frombuffer(columns.alive, dtype=np.int8) != 0,
+            "start": np.frombuffer(columns.start_point_id, dtype=np.int32),
+            "end": np.frombuffer(columns.end_point_id, dtype=np.int32),
+            "distance": np.frombuffer(columns.distance),
+            "time": np.frombuffer(columns.time),
+            "fixed_cost": np.frombuffer(columns.fixed_cost),
+            "directed": np.frombuffer(columns.is_directed,
+                                      dtype=np.int8) != 0}
+
+
+def _link_costs(model, rows):
+    """Return the cost of each link for its cheapest vehicle type"""
+    costs = {(vehicle.var_cost_dist, vehicle.var_cost_time)
+             for vehicle in dict.values(model.vehicle_types)} or {(1, 0)}
+    cost = np.full(len(rows["start"]), np.inf)
+    for var_cost_dist, var_cost_time in costs:
+        np.minimum(cost, rows["fixed_cost"] + var_cost_dist * rows["distance"]
+                   + var_cost_time * rows["time"], out=cost)
+    return cost
+
+
+def _point_index(points, point_ids):
+    """Return the index in points of each id, or -1 for unknown ids"""
+    ids = np.array([point.id for point in points], dtype=np.int64)
+    size = max(int(ids.max(initial=0)), int(point_ids.max(initial=0))) + 1
+    index = np.full(size, -1, dtype=np.int64)
+    index[ids] = np.arange(len(ids))
+    return index[point_ids]
+
+
+def _allowed(points, vehicle_types):
+    """Return a boolean matrix giving for each point the vehicle types
+    able to visit it"""
+    type_index = {vehicle.id: k for k, vehicle in enumerate(vehicle_types)}
+    allowed = np.ones((len(points), len(vehicle_types)), dtype=bool)
+    for i, point in enumerate(points):
+        for type_id in point.incompatible_vehicles:
+            if type_id in type_index:
+                allowed[i, type_index[type_id]] = False
+    return allowed
+
+
+def _depot_ids(model):
+    return np.array([point.id for point in dict.values(model.points)
+                     if point.id_customer == 0], dtype=np.int32)
+
+
+def _finish(model, report, keep, start, restorable=False):
+    """Remove the links not kept and record the report"""
+    report.nb_removed_links = model.links.remove_rows(keep.tolist(),
+                                                      restorable)
+    report.time = time.perf_counter() - start
+    model.presolve_reports.append(report)
+    return report
+
+
+def sparsify_links(model, nb_nearest=10):
+    """Keep for each point the links to its nb_nearest cheapest neighbors
+    and all links of the depots, the other links are removed but can be
+    restored. Return a :py:class:`PresolveReport`."""
+    start = time.perf_counter()
+    rows = _link_rows(model.links.columns())
+    report = PresolveReport("sparsify_links", int(rows["alive"].sum()))
+    report.details["nb_nearest"] = nb_nearest
+    depots = _depot_ids(model)
+    depot_link = np.isin(rows["start"], depots) | \
+        np.isin(rows["end"], depots)
+    candidates = np.flatnonzero(rows["alive"] & ~depot_link)
+
+    # rank the links of each point by cost, then by distance
+    cost = _link_costs(model, rows)[candidates]
+    distance = rows["distance"][candidates]
+    points = np.concatenate((rows["start"][candidates],
+                             rows["end"][candidates]))
+    order = np.lexsort((np.tile(distance, 2), np.tile(cost, 2), points))
+    points = points[order]
+    first = np.ones(len(points), dtype=bool)
+    first[1:] = points[1:] != points[:-1]
+    group_start = np.maximum.accumulate(
+        np.where(first, np.arange(len(points)), 0))
+    rank = np.arange(len(points)) - group_start
+    nearest = np.tile(candidates, 2)[order][rank < nb_nearest]
+
+    keep = ~rows["alive"] | depot_link
+    keep[nearest] = True
+    return _finish(model, report, keep, start, restorable=True)
+
+
+def _unservable_points(points, unservable, code):
+    """Return the ids of the points that cannot be served and can be
+    deleted because their customer has another alternative point, and
+    the customers that cannot be served but have a penalty. Raise a
+    ModelError with code if a customer without penalty cannot be served."""
+    served = {point.id_customer for point, bad
+              in zip(points, unservable.tolist())
+              if point.id_customer != 0 and not bad}
+    penalty = {}
+    for point in points:
+        penalty[point.id_customer] = max(penalty.get(point.id_customer, 0),
+                                         point.penalty_or_cost)
+    deleted = []
+    unserved = set()
+    errors = []
+    for point, bad in zip(points, unservable.tolist()):
+        if not bad:
+            continue
+        if point.id_customer in served:
+            deleted.append(point.id)
+        elif penalty[point.id_customer] > 0:
+            unserved.add(point.id_customer)
+        else:
+            errors.append(str(point.id))
+    if errors:
+        raise ModelError(code, " " + ", ".join(errors))
+    return deleted, sorted(unserved)
+
+
+def eliminate_capacity_links(model):
+    """Remove the links between two customers whose demands exceed the
+    capacity of every vehicle type able to visit both, and the customer
+    points whose demand exceeds the capacity of every vehicle type able
+    to visit them. Such a point is deleted if its customer has another
+    alternative point, else only its links are removed when it has a
+    penalty. Raise a ModelError if a customer without penalty cannot be
+    served. Return a :py:class:`PresolveReport`."""
+    start = time.perf_counter()
+    rows = _link_rows(model.links.columns())
+    report = PresolveReport("eliminate_capacity_links",
+                            int(rows["alive"].sum()))
+    points = list(dict.values(model.points))
+    vehicle_types = list(dict.values(model.vehicle_types))
+    is_customer = np.array([point.id_customer != 0 for point in points],
+                           dtype=bool)
+    demand = np.array([point.demand for point in points], dtype=float)
+    capacity = np.array([vehicle.capacity for vehicle in vehicle_types],
+                        dtype=float)
+    allowed = _allowed(points, vehicle_types)
+
+    # customer points that no vehicle type can serve
+    largest = np.where(allowed, capacity, -np.inf).max(axis=1,
+                                                       initial=-np.inf)
+    unservable = is_customer & (demand > largest)
+    deleted, unserved = _unservable_points(points, unservable,
+                                           constants.CAPACITY_ERROR)
+
+    # links whose two customers exceed the capacity of the common types
+    first = _point_index(points, rows["start"])
+    second = _point_index(points, rows["end"])
+    known = (first >= 0) & (second >= 0)
+    first, second = first[known], second[known]
+    both = is_customer[first] & is_customer[second]
+    pair_capacity = np.full(len(first), -np.inf)
+    for k in range(len(vehicle_types)):
+        common = allowed[first, k] & allowed[second, k]
+        pair_capacity[common] = np.maximum(pair_capacity[common],
+                                           capacity[k])
+    drop = np.zeros(len(rows["start"]), dtype=bool)
+    drop[known] = (both & (demand[first] + demand[second] > pair_capacity)
+                   | unservable[first] | unservable[second])
+
+    report.details["nb_removed_points"] = len(deleted)
+    report.details["unserved_customers"] = unserved
+    _finish(model, report, ~(rows["alive"] & drop), start)
+    for point_id in deleted:
+        model.delete_customer(point_id)
+    report.time = time.perf_counter() - start
+    return report
+
+
+def _window_ends(values):
+    """Return the ends of time windows, a time window ending at 0
+    is not bounded"""
+    values = np.array(values, dtype=float)
+    values[values == 0] = np.inf
+    return values
+
+
+def tighten_time_windows(model, max_iterations=None):
+    """Tighten the time windows of the customers with the earliest time a
+    vehicle can reach them from its start depot and the latest time it can
+    leave them to reach its end depot, then remove the links which cannot
+    be used within the time windows. The times are the ends of services,
+    as described in :py:mod:`VRPSolverEasy.heuristics.routing`.
+    The bounds are propagated along the links at most max_iterations
+    times (by default the number of points).
+    A customer point whose time window becomes empty is handled as in
+    :py:func:`eliminate_capacity_links`.
+    Return a :py:class:`PresolveReport`."""
+    start = time.perf_counter()
+    rows = _link_rows(model.links.columns())
+    report = PresolveReport("tighten_time_windows", int(rows["alive"].sum()))
+    points = list(dict.values(model.points))
+    vehicle_types = list(dict.values(model.vehicle_types))
+    nb_points = len(points)
+    index = {point.id: i for i, point in enumerate(points)}
+    is_customer = np.array([point.id_customer != 0 for point in points],
+                           dtype=bool)
+    service = np.array([point.service_time for point in points], dtype=float)
+    begin = np.array([point.tw_begin for point in points], dtype=float)
+    end = _window_ends([point.tw_end for point in points])
+    allowed = _allowed(points, vehicle_types)
+
+    # arcs of the links, undirected links are given in both directions
+    first = _point_index(points, rows["start"])
+    second = _point_index(points, rows["end"])
+    valid = rows["alive"] & (first >= 0) & (second >= 0)
+    reverse = valid & ~rows["directed"]
+    arc_row = np.concatenate((np.flatnonzero(valid),
+                              np.flatnonzero(reverse)))
+    tail = np.concatenate((first[valid], second[reverse]))
+    head = np.concatenate((second[valid], first[reverse]))
+    travel = rows["time"][arc_row]
+
+    # bounds given by the start and end depots of each vehicle type
+    first_arrival = np.full(nb_points, np.inf)
+    last_departure = np.full(nb_points, -np.inf)
+    leave = np.full(nb_points, np.inf)
+    arrive = np.full(nb_points, -np.inf)
+    for k, vehicle in enumerate(vehicle_types):
+        start_point = index.get(vehicle.start_point_id, -1)
+        end_point = index.get(vehicle.end_point_id, -1)
+        if start_point < 0 and vehicle.start_point_id != -1 or \
+                end_point < 0 and vehicle.end_point_id != -1:
+            continue
+        served = is_customer & allowed[:, k]
+        type_end = vehicle.tw_end if vehicle.tw_end != 0 else np.inf
+        if start_point >= 0:
+            departure = max(vehicle.tw_begin, begin[start_point])
+            leave[start_point] = min(leave[start_point], departure)
+            arcs = (tail == start_point) & served[head]
+            np.minimum.at(first_arrival, head[arcs],
+                          departure + travel[arcs] + service[head[arcs]])
+        else:
+            first_arrival[served] = np.minimum(first_arrival[served],
+                                               vehicle.tw_begin +
+                                               service[served])
+        if end_point >= 0:
+            limit = min(type_end, end[end_point])
+            arrive[end_point] = max(arrive[end_point], limit)
+            arcs = (head == end_point) & served[tail]
+            np.maximum.at(last_departure, tail[arcs],
+                          limit - travel[arcs] - service[end_point])
+        else:
+            last_departure[served] = np.maximum(last_departure[served],
+                                                type_end)
+
+    # propagate the bounds along the links between customers
+    if max_iterations is None:
+        max_iterations = nb_points
+    between = is_customer[tail] & is_customer[head]
+    between_tail, between_head = tail[between], head[between]
+    between_travel = travel[between]
+    earliest = np.where(is_customer, begin, leave)
+    latest = np.where(is_customer, end, arrive)
+    nb_iterations = 0
+    while nb_iterations < max_iterations:
+        nb_iterations += 1
+        reach = first_arrival.copy()
+        np.minimum.at(reach, between_head, earliest[between_tail] +
+                      between_travel + service[between_head])
+        leave_to = last_departure.copy()
+        np.maximum.at(leave_to, between_tail, latest[between_head] -
+                      between_travel - service[between_head])
+        new_earliest = np.where(is_customer, np.maximum(begin, reach),
+                                leave)
+        new_latest = np.where(is_customer, np.minimum(end, leave_to),
+                              arrive)
+        if np.array_equal(new_earliest, earliest) and \
+                np.array_equal(new_latest, latest):
+            break
+        earliest, latest = new_earliest, new_latest
+
+    unservable = is_customer & (earliest > latest + TOLERANCE)
+    deleted, unserved = _unservable_points(points, unservable,
+                                           constants.TIME_WINDOWS_ERROR)
+
+    # a link is kept if it can be used in one of its directions
+    usable = (earliest[tail] + travel + service[head] <=
+              latest[head] + TOLERANCE) & ~unservable[tail] & \
+        ~unservable[head]
+    usable |= ~is_customer[tail] & ~is_customer[head]
+    keep = ~valid
+    keep[arc_row[usable]] = True
+    # undirected links usable in one direction only become directed
+    nb_valid = int(valid.sum())
+    forward = np.zeros(len(valid), dtype=bool)
+    forward[arc_row[:nb_valid][usable[:nb_valid]]] = True
+    backward = np.zeros(len(valid), dtype=bool)
+    backward[arc_row[nb_valid:][usable[nb_valid:]]] = True
+    oriented = np.flatnonzero(reverse & (forward != backward))
+
+    tightened = 0
+    for i in np.flatnonzero(is_customer & ~unservable).tolist():
+        point = points[i]
+        tw_begin = point.tw_begin
+        tw_end = point.tw_end
+        if earliest[i] > begin[i] + TOLERANCE:
+            tw_begin = float(earliest[i])
+        if latest[i] < end[i] - TOLERANCE and latest[i] > 0:
+            tw_end = float(latest[i])
+        if (tw_begin, tw_end) != (point.tw_begin, point.tw_end):
+            point.time_windows = (tw_begin, tw_end)
+            tightened += 1
+
+    model.links.orient_rows(oriented.tolist(),
+                            backward[oriented].tolist())
+    report.details["nb_tightened_points"] = tightened
+    report.details["nb_directed_links"] = len(oriented)
+    report.details["nb_iterations"] = nb_iterations
+    report.details["nb_removed_points"] = len(deleted)
+    report.details["unserved_customers"] = unserved
+    _finish(model, report, keep, start)
+    for point_id in deleted:
+        model.delete_customer(point_id)
+    report.time = time.perf_counter() - start
+    return report
+
+
+def _groups(keys):
+    """Return the order sorting keys, and for each sorted position the
+    first position and the size of its group of equal keys"""
+    order = np.lexsort(keys[::-1])
+    sorted_keys = [key[order] for key in keys]
+    first = np.ones(len(order), dtype=bool)
+    for key in sorted_keys:
+        first[1:] &= key[1:] == key[:-1]
+    first = ~first
+    first[:1] = True
+    group_start = np.maximum.accumulate(
+        np.where(first, np.arange(len(order)), 0))
+    starts = np.flatnonzero(first)
+    sizes = np.diff(np.append(starts, len(order)))
+    return order, group_start, np.repeat(sizes, sizes)
+
+
+def prune_parallel_links(model):
+    """Remove the links dominated by a link between the same points, which
+    is used in all their directions with a distance, a time and a fixed
+    cost not greater (the first of identical links is kept). Then merge
+    the directed links of opposite directions with the same name,
+    distance, time and fixed cost into one undirected link.
+    Return a :py:class:`PresolveReport`."""
+    start = time.perf_counter()
+    rows = _link_rows(model.links.columns())
+    report = PresolveReport("prune_parallel_links", int(rows["alive"].sum()))
+    names = np.frombuffer(model.links.columns().name, dtype=np.int32)
+    alive = np.flatnonzero(rows["alive"])
+    low = np.minimum(rows["start"], rows["end"])[alive]
+    high = np.maximum(rows["start"], rows["end"])[alive]
+    directed = rows["directed"][alive]
+    forward = rows["start"][alive] == low
+    values = np.stack((rows["distance"][alive], rows["time"][alive],
+                       rows["fixed_cost"][alive]), axis=1)
+
+    # compare each link to the links between the same points
+    order, group_start, size = _groups((low, high))
+    dominated = np.zeros(len(alive), dtype=bool)
+    several = size > 1
+    link = np.repeat(order[several], size[several])
+    offset = np.arange(len(link)) - np.repeat(
+        np.cumsum(size[several]) - size[several], size[several])
+    other = order[np.repeat(group_start[several], size[several]) + offset]
+    covers = ~directed[other] | directed[link] & \
+        (forward[other] == forward[link])
+    not_worse = (values[other] <= values[link]).all(axis=1)
+    better = (values[other] < values[link]).any(axis=1) | \
+        ~directed[other] & directed[link] | (other < link)
+    dominated[link[covers & not_worse & better & (other != link)]] = True
+
+    # directed links of opposite directions with the same attributes
+    remaining = np.flatnonzero(~dominated & directed)
+    order, group_start, size = _groups(
+        (low[remaining], high[remaining], values[remaining, 0],
+         values[remaining, 1], values[remaining, 2],
+         names[alive[remaining]]))
+    # after the pruning, such a group has one link in each direction
+    pairs = np.flatnonzero((size[:-1] == 2) & (np.arange(len(order) - 1) ==
+                                               group_start[:-1]))
+    first = remaining[order[pairs]]
+    second = remaining[order[pairs + 1]]
+    model.links.orient_rows(alive[first].tolist(),
+                            [False] * len(first), False)
+    dominated[second] = True
+
+    keep = np.ones(len(rows["alive"]), dtype=bool)
+    keep[alive[dominated]] = False
+    report.details["nb_dominated_links"] = int(dominated.sum()) - len(first)
+    report.details["nb_merged_links"] = len(first)
+    return _finish(model, report, keep, start)
+
+
+def _capacity_numbers(demand, capacities, max_numbers):
+    """Return the number of vehicles of each type, taken from the largest
+    capacities, whose capacities sum to demand, or None if all vehicles
+    are not enough"""
+    numbers = [0] * len(capacities)
+    for k in sorted(range(len(capacities)), reverse=True,
+                    key=lambda k: (capacities[k], max_numbers[k])):
+        if demand <= 0:
+            break
+        if capacities[k] <= 0 or max_numbers[k] <= 0:
+            continue
+        numbers[k] = min(max_numbers[k], int(np.ceil(demand / capacities[k])))
+        demand -= numbers[k] * capacities[k]
+    return numbers if demand <= TOLERANCE else None
+
+
+def _capacity_bound(demand, capacities, max_numbers):
+    """Return the smallest number of vehicles whose capacities sum to
+    demand, or None if all vehicles are not enough"""
+    numbers = _capacity_numbers(demand, capacities, max_numbers)
+    return None if numbers is None else sum(numbers)
+
+
+def _shortest_times(nb_points, tail, head, travel):
+    """Return the matrix of the shortest travel times between points"""
+    times = np.full((nb_points, nb_points), np.inf)
+    np.minimum.at(times, (tail, head), travel)
+    np.fill_diagonal(times, 0)
+    for k in range(nb_points):
+        np.minimum(times, times[:, k, None] + times[None, k, :], out=times)
+    return times
+
+
+def _time_windows_bound(points, rows):
+    """Return the size of a set of mandatory customers which pairwise
+    cannot be visited by the same vehicle because of their time windows"""
+    is_customer = np.array([point.id_customer != 0 for point in points],
+                           dtype=bool)
+    end = _window_ends([point.tw_end for point in points])
+    if not np.isfinite(end[is_customer]).any():
+        return 0
+    begin = np.array([point.tw_begin for point in points], dtype=float)
+    service = np.array([point.service_time for point in points], dtype=float)
+    first = _point_index(points, rows["start"])
+    second = _point_index(points, rows["end"])
+    valid = rows["alive"] & (first >= 0) & (second >= 0)
+    reverse = valid & ~rows["directed"]
+    tail = np.concatenate((first[valid], second[reverse]))
+    head = np.concatenate((second[valid], first[reverse]))
+    travel = np.concatenate((rows["time"][valid], rows["time"][reverse]))
+    times = _shortest_times(len(points), tail, head, travel)
+
+    # customers with one point and no penalty
+    counts = {}
+    for point in points:
+        counts[point.id_customer] = counts.get(point.id_customer, 0) + 1
+    mandatory = np.flatnonzero(is_customer & np.array(
+        [counts[point.id_customer] == 1 and point.penalty_or_cost <= 0
+         for point in points], dtype=bool))
+    # j cannot follow i if the earliest time at j exceeds its window end
+    follows = begin[mandatory, None] + times[np.ix_(mandatory, mandatory)] + \
+        service[None, mandatory] <= end[None, mandatory] + TOLERANCE
+    conflict = ~follows & ~follows.T
+    np.fill_diagonal(conflict, False)
+
+    # greedy clique of the conflict graph
+    candidates = np.ones(len(mandatory), dtype=bool)
+    size = 0
+    while candidates.any():
+        degree = np.where(candidates,
+                          (conflict & candidates[None, :]).sum(axis=1), -1)
+        vertex = int(np.argmax(degree))
+        size += 1
+        candidates &= conflict[vertex]
+    return size
+
+
+def bound_fleet(model):
+    """Lower max_number of each vehicle type to the number of customers it
+    can visit, and the maximum total number of vehicles to the number of
+    customers, as an optimal solution has no route without customer.
+    The number of vehicles needed is bounded below by the capacities
+    (the smallest set of vehicles whose capacities cover the demand of the
+    mandatory customers) and by the time windows (customers which pairwise
+    cannot be on the same route, the time windows as given are used so
+    :py:func:`tighten_time_windows` makes this bound stronger).
+    The vehicle types which can visit no customer are removed (a maximum
+    number of 0 is not given to the solver, which reads it as no limit).
+    Raise a ModelError if the vehicles available are not enough.
+    Return a :py:class:`PresolveReport`, its details give the bounds and
+    the removed vehicle types."""
+    start = time.perf_counter()
+    rows = _link_rows(model.links.columns())
+    report = PresolveReport("bound_fleet", int(rows["alive"].sum()))
+    points = list(dict.values(model.points))
+    vehicle_types = list(dict.values(model.vehicle_types))
+    allowed = _allowed(points, vehicle_types)
+
+    # customers each vehicle type can visit, counting alternative points
+    # of a customer once
+    customers = {point.id_customer for point in points
+                 if point.id_customer != 0}
+    visited = [set() for _ in vehicle_types]
+    penalty = {}
+    demand = {}
+    for i, point in enumerate(points):
+        if point.id_customer == 0:
+            continue
+        for k in np.flatnonzero(allowed[i]).tolist():
+            visited[k].add(point.id_customer)
+        penalty[point.id_customer] = max(penalty.get(point.id_customer, 0),
+                                         point.penalty_or_cost)
+        demand[point.id_customer] = min(demand.get(point.id_customer,
+                                                   np.inf), point.demand)
+    mandatory_demand = sum(demand[id_customer] for id_customer in customers
+                           if penalty[id_customer] <= 0)
+
+    max_numbers = [min(vehicle.max_number, len(visited[k]))
+                   for k, vehicle in enumerate(vehicle_types)]
+    max_total = max(1, min(model.max_total_vehicles_number,
+                           len(customers), sum(max_numbers)))
+    capacity_bound = _capacity_bound(
+        mandatory_demand, [vehicle.capacity for vehicle in vehicle_types],
+        max_numbers)
+    if capacity_bound is None:
+        raise ModelError(constants.FLEET_ERROR,
+                         f" the demand {mandatory_demand} exceeds the"
+                         " capacity of all vehicles")
+    time_windows_bound = _time_windows_bound(points, rows)
+    min_nb_vehicles = max(capacity_bound, time_windows_bound)
+    if min_nb_vehicles > max_total:
+        raise ModelError(constants.FLEET_ERROR,
+                         f" at least {min_nb_vehicles} vehicles are needed"
+                         f" but {max_total} are available")
+
+    removed = [vehicle.id for k, vehicle in enumerate(vehicle_types)
+               if len(visited[k]) == 0]
+    if len(removed) == len(vehicle_types):
+        raise ModelError(constants.FLEET_ERROR,
+                         " no vehicle type can visit a customer")
+    for vehicle, max_number in zip(vehicle_types, max_numbers):
+        if vehicle.id in removed:
+            model.delete_vehicle_type(vehicle.id)
+        else:
+            vehicle.max_number = max_number
+    if removed:
+        for point in points:
+            if any(type_id in removed
+                   for type_id in point.incompatible_vehicles):
+                point.incompatible_vehicles = [
+                    type_id for type_id in point.incompatible_vehicles
+                    if type_id not in removed]
+    model.max_total_vehicles_number = max_total
+    report.details["capacity_bound"] = capacity_bound
+    report.details["time_windows_bound"] = time_windows_bound
+    report.details["min_nb_vehicles"] = min_nb_vehicles
+    report.details["max_nb_vehicles"] = max_total
+    report.details["removed_vehicle_types"] = removed
+    report.time = time.perf_counter() - start
+    model.presolve_reports.append(report)
+    return report
@@ -1,10 +1,18 @@
 """This module solves vehicle routing problems using branch&cut&price methods"""
 
+import asyncio
+import concurrent.futures
 import ctypes as _c
+import hashlib
+import itertools
 import json
+import math
+import operator
 import platform
 import os
 import sys
+import time
+from array import array
 from VRPSolverEasy.src import constants
 if sys.version_info > (3, 7):
     import collections.abc as collections
@@ -17,6 +25,31 @@ __author__ = "Najib ERRAMI Ruslan SADYKOV Eduardo UCHOA Eduardo QUEIROGA"
 __copyright__ = "Copyright VRPYSolver, all rights reserved"
 __email__ = "najib.errami@inria.fr"
 
+# versions of the dictionaries of links, unique among all dictionaries
+_VERSIONS = itertools.count(1)
+
+# compact json keys used to encode the links, built once
+_LINK_JSON_START = ('{"' + constants.LINK.START_POINT_ID.value + '":%d,"' +
+                    constants.LINK.END_POINT_ID.value + '":%d')
+_LINK_JSON_NAME = ',"' + constants.LINK.NAME.value + '":'
+_LINK_JSON_IS_DIRECTED = ',"' + constants.LINK.IS_DIRECTED.value + '":true'
+_LINK_JSON_DISTANCE = ',"' + constants.LINK.DISTANCE.value + '":'
+_LINK_JSON_TIME = ',"' + constants.LINK.TIME.value + '":'
+_LINK_JSON_FIXED_COST = ',"' + constants.LINK.FIXED_COST.value + '":'
+_JSON_SEPARATORS = (",", ":")
+
+
+# floats whose absolute value is lower are exact integers
+_INT_LIMIT = 2.0 ** 53
+
+
+def _number(value):
+    """Return a float of the columns of links as an int if it is integral,
+    as given to add_link"""
+    if value.is_integer() and -_INT_LIMIT < value < _INT_LIMIT:
+        return int(value)
+    return value
+
 
 class PropertyError(Exception):
     """Exception raised for errors in the input property.
@@ -37,11 +70,87 @@ class ModelError(Exception):
         message -- explanation of the error
    """
 
-    def __init__(self, code=0):
-        self.message = constants.ERRORS_MODEL[code]
+    def __init__(self, code=0, str_list=""):
+        self.code = code
+        self.message = constants.ERRORS_MODEL[code] + str_list
         super().__init__(self.message)
 
 
+def _property_violations(value, properties, prefix):
+    """Check the given properties of an object by setting them again
+    and return the messages of all errors"""
+    violations = []
+    for name in properties:
+        try:
+            setattr(value, name, getattr(value, name))
+        except PropertyError as error:
+            violations.append(prefix + error.message)
+    return violations
+
+
+def _matrix_to_column(matrix, symmetric, name):
+    """Flatten a square or upper triangular matrix in a typed array,
+    the diagonal is ignored"""
+    if matrix is None:
+        return None
+    if hasattr(matrix, "dtype") and hasattr(matrix, "ndim"):
+        return _array_to_column(matrix, symmetric, name)
+    if hasattr(matrix, "tolist"):
+        matrix = matrix.tolist()
+    try:
+        if len(matrix) > 0 and hasattr(matrix[0], "__len__"):
+            column = array('d')
+            for i, row in enumerate(matrix):
+                if hasattr(row, "tolist"):
+                    row = row.tolist()
+                if len(row) != len(matrix):
+                    raise PropertyError(name, constants.MATRIX_PROPERTY)
+                if symmetric:
+                    column.extend(row[i + 1:])
+                else:
+                    column.extend(row[:i])
+                    column.extend(row[i + 1:])
+            return column
+        if not symmetric:
+            raise PropertyError(name, constants.MATRIX_PROPERTY)
+        return array('d', matrix)
+    except TypeError:
+        raise PropertyError(name, constants.NUMBER_PROPERTY)
+
+
+def _array_to_column(matrix, symmetric, name):
+    """Flatten a numpy matrix as _matrix_to_column, without converting
+    its values one by one"""
+    import numpy as np
+    if not np.issubdtype(matrix.dtype, np.number):
+        raise PropertyError(name, constants.NUMBER_PROPERTY)
+    if matrix.ndim == 2 and matrix.shape[0] == matrix.shape[1]:
+        if symmetric:
+            values = matrix[np.triu_indices(len(matrix), 1)]
+        else:
+            values = matrix[~np.eye(len(matrix), dtype=bool)]
+    elif matrix.ndim == 1 and symmetric:
+        values = matrix
+    else:
+        raise PropertyError(name, constants.MATRIX_PROPERTY)
+    column = array('d')
+    column.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return column
+
+
+def _encode_json(value):
+    """Encode a value in compact json as bytes"""
+    return json.dumps(value, separators=_JSON_SEPARATORS).encode('UTF-8')
+
+
+def _snapshot(values):
+    """Return an immutable copy of a list of dictionaries, their lists
+    (such as incompatible vehicles) are copied in tuples"""
+    return tuple(tuple((name, tuple(value) if isinstance(value, list)
+                        else value) for name, value in element.items())
+                 for element in values)
+
+
 class VehicleTypesDict(dict,collections.MutableMapping):
     """Dictionary of vehicle types
 
@@ -124,16 +233,375 @@ class PointsDict(dict,collections.MutableMapping):
         return list(value.get_point(debug) for value in dict.values(self))
 
 
+class LinkColumns:
+    """Links stored column by column in typed arrays.
+
+    Each link is a row, the names are interned in a table shared by all rows.
+    Removed rows are only marked as not alive until the next compaction.
+    """
+
+    def __init__(self):
+        self.start_point_id = array('i')
+        self.end_point_id = array('i')
+        self.distance = array('d')
+        self.time = array('d')
+        self.fixed_cost = array('d')
+        self.is_directed = array('b')
+        self.name = array('i')
+        self.alive = array('b')
+        self.names = [str()]
+        self.nb_alive = 0
+        self.__name_ids = {str(): 0}
+        self.__index = None
+
+    def __len__(self):
+        return len(self.alive)
+
+    def name_id(self, name):
+        """Id of a name in the table of names"""
+        name_id = self.__name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.__name_ids[name] = name_id
+        return name_id
+
+    def append(self, link):
+        """Append a row from a Link object"""
+        self.append_values(link.start_point_id, link.end_point_id, link.name,
+                           link.is_directed, link.distance, link.time,
+                           link.fixed_cost)
+
+    def append_values(self, start_point_id, end_point_id, name, is_directed,
+                      distance, time, fixed_cost):
+        """Append a row from the values of a link, only their types are
+        checked by the typed arrays"""
+        row = len(self.alive)
+        if isinstance(is_directed, int) and \
+                not isinstance(is_directed, bool):
+            # not valid, kept to be reported by violations
+            is_directed = -1
+        try:
+            self.start_point_id.append(start_point_id)
+            self.end_point_id.append(end_point_id)
+            self.distance.append(distance)
+            self.time.append(time)
+            self.fixed_cost.append(fixed_cost)
+            self.is_directed.append(is_directed)
+            self.name.append(self.name_id(name))
+        except (TypeError, OverflowError):
+            for column in (self.start_point_id, self.end_point_id,
+                           self.distance, self.time, self.fixed_cost,
+                           self.is_directed, self.name):
+                del column[row:]
+            # the Link constructor gives the property which is not valid
+            Link(start_point_id, end_point_id, name, is_directed, distance,
+                 time, fixed_cost)
+            raise
+        self.alive.append(1)
+        self.nb_alive += 1
+        if self.__index is not None:
+            key = (start_point_id, end_point_id)
+            self.__index.setdefault(key, []).append(row)
+
+    def extend(self, start_point_ids, end_point_ids, distances, times,
+               fixed_costs, is_directed):
+        """Append rows without name, all arguments must be typed arrays
+        of same length"""
+        self.start_point_id.extend(start_point_ids)
+        self.end_point_id.extend(end_point_ids)
+        self.distance.extend(distances)
+        self.time.extend(times)
+        self.fixed_cost.extend(fixed_costs)
+        self.is_directed.extend(is_directed)
+        self.name.extend(array('i', [0]) * len(start_point_ids))
+        self.alive.extend(array('b', [1]) * len(start_point_ids))
+        self.nb_alive += len(start_point_ids)
+        self.__index = None
+
+    def index(self):
+        """Rows of each key (start point id, end point id), built on demand"""
+        if self.__index is None:
+            self.__index = {}
+            for row, key in enumerate(zip(self.start_point_id,
+                                          self.end_point_id)):
+                if self.alive[row]:
+                    self.__index.setdefault(key, []).append(row)
+        return self.__index
+
+    def remove(self, key):
+        """Remove all rows of a key and return their number"""
+        rows = self.index().pop(key, [])
+        for row in rows:
+            self.alive[row] = 0
+        self.nb_alive -= len(rows)
+        if len(self.alive) > 1024 and self.nb_alive < len(self.alive) // 2:
+            self.compact()
+        return len(rows)
+
+    def replace(self, key, links):
+        """Write the Link objects in the rows of key, in place so that
+        the key keeps its position, the additional links are appended"""
+        rows = self.index().get(key, [])
+        for row, link in zip(rows, links):
+            self.start_point_id[row] = link.start_point_id
+            self.end_point_id[row] = link.end_point_id
+            self.distance[row] = link.distance
+            self.time[row] = link.time
+            self.fixed_cost[row] = link.fixed_cost
+            self.is_directed[row] = link.is_directed
+            self.name[row] = self.name_id(link.name)
+        for row in rows[len(links):]:
+            self.alive[row] = 0
+        self.nb_alive -= max(0, len(rows) - len(links))
+        del rows[len(links):]
+        if len(links) == 0:
+            self.index().pop(key, None)
+        for link in links[len(rows):]:
+            self.append(link)
+        if any((link.start_point_id, link.end_point_id) != key
+               for link in links):
+            self.__index = None
+
+    def compact(self, keep=None):
+        """Remove the rows which are not alive or whose value in keep
+        (a sequence of booleans) is false"""
+        if keep is None:
+            keep = self.alive
+        else:
+            keep = array('b', map(operator.and_, self.alive, keep))
+        for column in ("start_point_id", "end_point_id", "distance", "time",
+                       "fixed_cost", "is_directed", "name"):
+            values = getattr(self, column)
+            setattr(self, column, array(values.typecode,
+                                        itertools.compress(values, keep)))
+        self.nb_alive = len(self.start_point_id)
+        self.alive = array('b', [1]) * self.nb_alive
+        self.__index = None
+
+    def split(self, keep):
+        """Remove the alive rows whose value in keep (a sequence of
+        booleans) is false and return them in new columns sharing the
+        table of names"""
+        removed = LinkColumns()
+        removed.names = self.names
+        removed.__name_ids = self.__name_ids
+        drop = array('b', map(operator.gt, self.alive, keep))
+        for column in ("start_point_id", "end_point_id", "distance", "time",
+                       "fixed_cost", "is_directed", "name"):
+            values = getattr(self, column)
+            setattr(removed, column, array(values.typecode,
+                                           itertools.compress(values, drop)))
+        removed.nb_alive = len(removed.start_point_id)
+        removed.alive = array('b', [1]) * removed.nb_alive
+        self.compact(keep)
+        return removed
+
+    def merge(self, other):
+        """Append the alive rows of columns sharing the table of names"""
+        other.compact()
+        for column in ("start_point_id", "end_point_id", "distance", "time",
+                       "fixed_cost", "is_directed", "name", "alive"):
+            getattr(self, column).extend(getattr(other, column))
+        self.nb_alive += other.nb_alive
+        self.__index = None
+
+    def orient(self, rows, reverse, is_directed=True):
+        """Set the direction of the links of rows, their start and end
+        points are swapped where reverse is true"""
+        for row, swap in zip(rows, reverse):
+            self.is_directed[row] = is_directed
+            if swap:
+                self.start_point_id[row], self.end_point_id[row] = \
+                    self.end_point_id[row], self.start_point_id[row]
+        self.__index = None
+
+    def link(self, row):
+        """Build the Link object of a row"""
+        return Link(self.start_point_id[row],
+                    self.end_point_id[row],
+                    name=self.names[self.name[row]],
+                    is_directed=bool(self.is_directed[row]),
+                    distance=_number(self.distance[row]),
+                    time=_number(self.time[row]),
+                    fixed_cost=_number(self.fixed_cost[row]))
+
+    def violations(self):
+        """Return the messages of all rows whose ids, distance or time
+        are negative, whose values are not finite, whose is_directed is not a boolean or whose name
+        is not a string"""
+        violations = []
+        wrong_names = {name_id for name_id, name in enumerate(self.names)
+                       if not isinstance(name, str)}
+        for row in range(len(self.alive)):
+            if not self.alive[row]:
+                continue
+            if self.is_directed[row] not in (0, 1):
+                violations.append(self.__violation(
+                    row, constants.LINK.IS_DIRECTED,
+                    constants.BOOLEAN_PROPERTY))
+            if self.name[row] in wrong_names:
+                violations.append(self.__violation(
+                    row, constants.LINK.NAME, constants.STRING_PROPERTY))
+        for column, prop in ((self.start_point_id,
+                              constants.LINK.START_POINT_ID),
+                             (self.end_point_id, constants.LINK.END_POINT_ID),
+                             (self.distance, constants.LINK.DISTANCE),
+                             (self.time, constants.LINK.TIME)):
+            if min(column, default=0) >= 0:
+                continue
+            for row, value in enumerate(column):
+                if value < 0 and self.alive[row]:
+                    violations.append(self.__violation(
+                        row, prop, constants.GREATER_ZERO_PROPERTY))
+        for column, prop in ((self.distance, constants.LINK.DISTANCE),
+                             (self.time, constants.LINK.TIME),
+                             (self.fixed_cost, constants.LINK.FIXED_COST)):
+            if all(map(math.isfinite, column)):
+                continue
+            for row, value in enumerate(column):
+                if not math.isfinite(value) and self.alive[row]:
+                    violations.append(self.__violation(
+                        row, prop, constants.FINITE_PROPERTY))
+        return violations
+
+    def __violation(self, row, prop, error):
+        """Message of a property of a row which is not valid"""
+        return ("link (" + str(self.start_point_id[row]) + ", " +
+                str(self.end_point_id[row]) + ") : " + prop.value +
+                constants.ERRORS_PROPERTY[error])
+
+    def encode(self):
+        """Encode the alive rows in compact json with the same elements
+        as Link.get_link, rows are separated by commas"""
+        names = [json.dumps(name) for name in self.names]
+        optional = ((self.name, _LINK_JSON_NAME + "%s"),
+                    (self.is_directed, _LINK_JSON_IS_DIRECTED),
+                    (self.distance, _LINK_JSON_DISTANCE),
+                    (self.time, _LINK_JSON_TIME),
+                    (self.fixed_cost, _LINK_JSON_FIXED_COST))
+        used = [any(column) for column, _ in optional]
+
+        if self.nb_alive == len(self.alive) and all(
+                0 not in column
+                for (column, _), is_used in zip(optional, used) if is_used):
+            # all rows have the same elements, they share one format
+            link_format = _LINK_JSON_START
+            columns = [self.start_point_id, self.end_point_id]
+            for (column, key), is_used in zip(optional, used):
+                if not is_used:
+                    continue
+                link_format += key
+                if column is self.name:
+                    link_format += "%s"
+                    columns.append(map(names.__getitem__, column))
+                elif column is self.is_directed:
+                    continue
+                elif all(map(float.is_integer, column)) and \
+                        -_INT_LIMIT < min(column) and \
+                        max(column) < _INT_LIMIT:
+                    # integral values are written as integers
+                    link_format += "%d"
+                    columns.append(column)
+                else:
+                    link_format += "%s"
+                    columns.append(map(repr, map(_number, column)))
+            return ",".join(map((link_format + "}").__mod__, zip(*columns)))
+
+        links = []
+        for (start_point_id, end_point_id, name, is_directed, distance, time,
+             fixed_cost, alive) in zip(self.start_point_id,
+                                       self.end_point_id, self.name,
+                                       self.is_directed, self.distance,
+                                       self.time, self.fixed_cost,
+                                       self.alive):
+            if not alive:
+                continue
+            link = _LINK_JSON_START % (start_point_id, end_point_id)
+            if name != 0:
+                link += _LINK_JSON_NAME + names[name]
+            if is_directed:
+                link += _LINK_JSON_IS_DIRECTED
+            if distance != 0:
+                link += _LINK_JSON_DISTANCE + repr(_number(distance))
+            if time != 0:
+                link += _LINK_JSON_TIME + repr(_number(time))
+            if fixed_cost != 0:
+                link += _LINK_JSON_FIXED_COST + repr(_number(fixed_cost))
+            links.append(link + "}")
+        return ",".join(links)
+
+    def equals(self, row, link):
+        """Return True if the row has the same values as the Link object"""
+        return (self.start_point_id[row] == link.start_point_id and
+                self.end_point_id[row] == link.end_point_id and
+                self.names[self.name[row]] == link.name and
+                bool(self.is_directed[row]) == link.is_directed and
+                self.distance[row] == link.distance and
+                self.time[row] == link.time and
+                self.fixed_cost[row] == link.fixed_cost)
+
+    def get_links(self, debug=False):
+        """Get all alive rows in the format of Link.get_link, grouped by
+        key in the order in which the keys were added"""
+        names = self.names
+        for rows in self.index().values():
+            for row in rows:
+                link = {}
+                link[constants.LINK.START_POINT_ID.value] = \
+                    self.start_point_id[row]
+                link[constants.LINK.END_POINT_ID.value] = \
+                    self.end_point_id[row]
+                name = self.name[row]
+                if name != 0 or debug:
+                    link[constants.LINK.NAME.value] = names[name]
+                if self.is_directed[row] or debug:
+                    link[constants.LINK.IS_DIRECTED.value] = \
+                        bool(self.is_directed[row])
+                for prop, column in ((constants.LINK.DISTANCE,
+                                      self.distance),
+                                     (constants.LINK.TIME, self.time),
+                                     (constants.LINK.FIXED_COST,
+                                      self.fixed_cost)):
+                    if column[row] != 0 or debug:
+                        link[prop.value] = _number(column[row])
+                yield link
+
+
 class LinksDict(dict,collections.MutableMapping):
     """Dictionary of links
 
-    key (str): name of link
-    value: class Customer or Depot
-
+    key (tuple): start point id and end point id
+    value: list of class Link
+
+    Links are stored column by column in typed arrays
+    (see :py:class:`LinkColumns`). The lists of Link objects are built
+    when a key is accessed, changes made to them are written back
+    in the columns before the links are read. As in a dict, a key whose
+    list is emptied stays in the dictionary, and a list which gets links
+    of other points stays with its key.
+    A list of links can also be set with a free key, it is then kept
+    as it is.
+    The version of the links changes each time they are modified,
+    it is used to know if they must be serialized again.
     """
 
+    def __init__(self):
+        self.__columns = LinkColumns()
+        self.__accessed = {}
+        self.__free_keys = {}
+        self.__free_links = []
+        self.__removed = None
+        self.__version = next(_VERSIONS)
+
     def __getitem__(self, key):
-        return dict.__getitem__(self, key)
+        if key in self.__free_keys:
+            return self.__free_keys[key]
+        if key not in self.__accessed:
+            rows = self.__columns.index()[key]
+            self.__accessed[key] = [self.__columns.link(row)
+                                    for row in rows]
+        return self.__accessed[key]
 
     def __setitem__(self, key, value):
         if not isinstance(value, list):
@@ -141,30 +609,232 @@ class LinksDict(dict,collections.MutableMapping):
         for i in value:
             if not isinstance(i,Link):
                 raise PropertyError(str(), 12)
-        dict.__setitem__(self, key, value)
+        self.__remove(key)
+        if all((link.start_point_id, link.end_point_id) == key
+               for link in value):
+            for link in value:
+                self.__columns.append(link)
+            self.__accessed[key] = value
+        else:
+            self.__free_keys[key] = value
+        self.__version = next(_VERSIONS)
 
     def __delitem__(self, key):
-        dict.__delitem__(self, key)
+        if not self.__remove(key):
+            raise KeyError(key)
+
+    def __remove(self, key):
+        """Remove the links of a key and return True if there were some"""
+        found = self.__free_keys.pop(key, None) is not None
+        self.__accessed.pop(key, None)
+        if self.__columns.nb_alive > 0 and self.__columns.remove(key) > 0:
+            found = True
+        if found:
+            self.__version = next(_VERSIONS)
+        return found
 
     def __iter__(self):
-        return dict.__iter__(self)
+        index = self.columns().index()
+        yield from index
+        # the keys whose list was emptied are only in the accessed lists
+        for key in self.__accessed:
+            if key not in index:
+                yield key
+        yield from self.__free_keys
 
     def __len__(self):
-        return dict.__len__(self)
+        index = self.columns().index()
+        return (len(index) + len(self.__free_keys) +
+                sum(1 for key in self.__accessed if key not in index))
 
     def __contains__(self, x):
-        return dict.__contains__(self, x)
+        return (x in self.__free_keys or x in self.__accessed or
+                x in self.__columns.index())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    # dict methods do not know the links stored in columns
+    keys = collections.MutableMapping.keys
+    items = collections.MutableMapping.items
+    get = collections.MutableMapping.get
+    pop = collections.MutableMapping.pop
+    popitem = collections.MutableMapping.popitem
+    setdefault = collections.MutableMapping.setdefault
+    update = collections.MutableMapping.update
+    __eq__ = collections.MutableMapping.__eq__
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __reduce__(self):
+        # the links are not in the dict, they are restored with the state
+        return (self.__class__, (), self.__dict__)
+
+    def copy(self):
+        """Return a dict of the lists of links"""
+        return dict(self.items())
+
+    def clear(self):
+        self.__columns = LinkColumns()
+        self.__accessed = {}
+        self.__free_keys = {}
+        self.__removed = None
+        self.__version = next(_VERSIONS)
+
+    def version(self):
+        """Return the version of the links after writing back the changes
+        made on the accessed lists of links"""
+        self.columns()
+        if len(self.__free_keys) > 0 or len(self.__free_links) > 0:
+            free_links = [value.get_link(True)
+                          for list_ in self.__free_keys.values()
+                          for value in list_]
+            if free_links != self.__free_links:
+                self.__free_links = free_links
+                self.__version = next(_VERSIONS)
+        return self.__version
+
+    def append(self, link):
+        """Add a Link object to the list of its key"""
+        key = (link.start_point_id, link.end_point_id)
+        if key in self.__free_keys:
+            self.__free_keys[key].append(link)
+        else:
+            self.__columns.append(link)
+            if key in self.__accessed:
+                self.__accessed[key].append(link)
+        self.__version = next(_VERSIONS)
+
+    def add(self, start_point_id, end_point_id, name=str(),
+            is_directed=False, distance=0.0, time=0.0, fixed_cost=0.0):
+        """Add a link from its values without building a Link object,
+        the values are not checked"""
+        key = (start_point_id, end_point_id)
+        if key in self.__free_keys or key in self.__accessed:
+            self.append(Link(start_point_id, end_point_id, name, is_directed,
+                             distance, time, fixed_cost))
+        else:
+            self.__columns.append_values(start_point_id, end_point_id, name,
+                                         is_directed, distance, time,
+                                         fixed_cost)
+            self.__version = next(_VERSIONS)
+
+    def add_columns(self, start_point_ids, end_point_ids, distances, times,
+                    fixed_costs, is_directed):
+        """Add links given column by column as typed arrays"""
+        self.__columns.extend(start_point_ids, end_point_ids, distances,
+                              times, fixed_costs, is_directed)
+        self.__version = next(_VERSIONS)
+
+    def columns(self):
+        """Return the LinkColumns after writing back the changes made
+        on the accessed lists of links"""
+        for key, links in list(self.__accessed.items()):
+            rows = self.__columns.index().get(key, [])
+            if len(rows) == len(links) and all(
+                    self.__columns.equals(row, link)
+                    for row, link in zip(rows, links)):
+                continue
+            self.__version = next(_VERSIONS)
+            if any((link.start_point_id, link.end_point_id) != key
+                   for link in links):
+                # the list is kept with its key, as when it is set
+                self.__columns.remove(key)
+                self.__free_keys[key] = links
+                del self.__accessed[key]
+            else:
+                self.__columns.replace(key, links)
+        return self.__columns
+
+    def remove_rows(self, keep, restorable=False):
+        """Remove the links of the rows of :py:meth:`columns` whose value
+        in keep is false and return their number. Restorable links can be
+        added back by :py:meth:`restore`."""
+        columns = self.columns()
+        removed = columns.split(keep)
+        if restorable and removed.nb_alive > 0:
+            if self.__removed is None:
+                self.__removed = removed
+            else:
+                self.__removed.merge(removed)
+        self.__forget_accessed()
+        self.__version = next(_VERSIONS)
+        return removed.nb_alive
+
+    def orient_rows(self, rows, reverse, is_directed=True):
+        """Set the direction of the links of the rows of :py:meth:`columns`,
+        their start and end points are swapped where reverse is true"""
+        self.columns().orient(rows, reverse, is_directed)
+        self.__forget_accessed()
+        self.__version = next(_VERSIONS)
+
+    def __forget_accessed(self):
+        """Drop the accessed lists once rows of the columns have changed,
+        the emptied lists are kept as their keys have no rows"""
+        index = self.__columns.index()
+        self.__accessed = {key: links
+                           for key, links in self.__accessed.items()
+                           if len(links) == 0 and key not in index}
+
+    def nb_restorable(self):
+        """Return the number of links which can be restored"""
+        return 0 if self.__removed is None else self.__removed.nb_alive
+
+    def restore(self):
+        """Add back the restorable removed links and return their number"""
+        if self.__removed is None:
+            return 0
+        columns = self.columns()
+        if columns.names is not self.__removed.names:
+            # the columns were replaced since the links were removed
+            self.__removed = None
+            return 0
+        nb_restored = self.__removed.nb_alive
+        columns.merge(self.__removed)
+        self.__removed = None
+        self.__version = next(_VERSIONS)
+        return nb_restored
+
+    def free_links(self):
+        """Return the Link objects set with a free key"""
+        return [link for list_ in self.__free_keys.values()
+                for link in list_]
+
+    def violations(self):
+        """Return the messages of all links which are not valid"""
+        return self.columns().violations()
+
+    def encode(self):
+        """Return the list of links in compact json as bytes"""
+        columns = self.columns()
+        if columns.nb_alive == 0 and len(self.__free_keys) == 0:
+            raise ModelError(constants.MIN_LINKS_ERROR)
+        links = [json.dumps(value.get_link(), separators=_JSON_SEPARATORS)
+                 for list_ in self.__free_keys.values() for value in list_]
+        if columns.nb_alive > 0:
+            links.insert(0, columns.encode())
+        return ("[" + ",".join(links) + "]").encode('UTF-8')
 
     def values(self, debug=False):
-        if len(dict.values(self)) == 0:
+        columns = self.columns()
+        if columns.nb_alive == 0 and len(self.__free_keys) == 0:
             raise ModelError(constants.MIN_LINKS_ERROR)
-        return list(value.get_link(debug) for list_ in dict.values(self) for value in list_ )
+        links = list(columns.get_links(debug))
+        links.extend(value.get_link(debug)
+                     for list_ in self.__free_keys.values()
+                     for value in list_)
+        return links
 
 
 class VehicleType:
     """Define a vehicle type with different attributes.
     """
 
+    __slots__ = ("_id", "_name", "_capacity", "_fixed_cost", "_var_cost_dist",
+                 "_var_cost_time", "_max_number", "_start_point_id",
+                 "_end_point_id", "_tw_begin", "_tw_end")
+
     def __init__(
             self,
             id: int,
@@ -353,6 +1023,33 @@ class VehicleType:
                 constants.NUMBER_PROPERTY)
         self._tw_end = tw_end
 
+    @classmethod
+    def _trusted(cls, id, start_point_id=-1, end_point_id=-1, name=str(),
+                 capacity=0, fixed_cost=0.0, var_cost_dist=0.0,
+                 var_cost_time=0.0, max_number=1, tw_begin=0, tw_end=0):
+        """Build a vehicle type without checking its properties"""
+        vehicle_type = cls.__new__(cls)
+        vehicle_type._id = id
+        vehicle_type._start_point_id = start_point_id
+        vehicle_type._end_point_id = end_point_id
+        vehicle_type._name = name
+        vehicle_type._capacity = capacity
+        vehicle_type._fixed_cost = fixed_cost
+        vehicle_type._var_cost_dist = var_cost_dist
+        vehicle_type._var_cost_time = var_cost_time
+        vehicle_type._max_number = max_number
+        vehicle_type._tw_begin = tw_begin
+        vehicle_type._tw_end = tw_end
+        return vehicle_type
+
+    def violations(self):
+        """Return the messages of all properties which are not valid"""
+        return _property_violations(
+            self, ("id", "start_point_id", "end_point_id", "name", "capacity",
+                   "fixed_cost", "var_cost_dist", "var_cost_time",
+                   "max_number", "tw_begin", "tw_end"),
+            "vehicle type " + str(self._id) + " : ")
+
     def get_vehicle_type(self, debug=False):
         """Get all components of a vehicle type which are differents of
         default value"""
@@ -404,6 +1101,10 @@ class Point:
              the customer or are not accepted in a depot.
     """
 
+    __slots__ = ("_id", "_name", "_id_customer", "_penalty_or_cost",
+                 "_service_time", "_tw_begin", "_tw_end", "_time_windows",
+                 "_demand", "_incompatible_vehicles")
+
     def __init__(self, id, name=str(), id_customer=0, penalty_or_cost=0.0,
                  service_time=0, tw_begin=0, tw_end=0, demand=0,
                  incompatible_vehicles=[]):
@@ -471,6 +1172,19 @@ class Point:
                                 constants.LESS_MAX_POINTS_PROPERTY)
         self._id_customer = id_customer
 
+    @property
+    def penalty_or_cost(self):
+        """getter function of penalty_or_cost"""
+        return self._penalty_or_cost
+
+    @penalty_or_cost.setter
+    def penalty_or_cost(self, penalty_or_cost):
+        """setter function of penalty_or_cost"""
+        if not isinstance(penalty_or_cost, (int, float)):
+            raise PropertyError(constants.POINT.PENALTY_OR_COST.value,
+                                constants.NUMBER_PROPERTY)
+        self._penalty_or_cost = penalty_or_cost
+
     @property
     def penalty(self):
         """getter function of penalty"""
@@ -596,7 +1310,36 @@ class Point:
                 raise PropertyError(
                     constants.POINT.INCOMPATIBLE_VEHICLES.value,
                     constants.LIST_INTEGER_PROPERTY)
-        self._incompatible_vehicles = incompatible_vehicles_in
+        # copied, so that points never share the list given
+        self._incompatible_vehicles = list(incompatible_vehicles_in)
+
+    @classmethod
+    def _trusted(cls, id, name=str(), id_customer=0, penalty_or_cost=0.0,
+                 service_time=0, tw_begin=0, tw_end=0, demand=0,
+                 incompatible_vehicles=[]):
+        """Build a point without checking its properties"""
+        point = Point.__new__(cls)
+        point._id = id
+        point._name = name
+        point._id_customer = id_customer
+        point._penalty_or_cost = penalty_or_cost
+        point._service_time = service_time
+        point._tw_begin = tw_begin
+        point._tw_end = tw_end
+        point._time_windows = (tw_begin, tw_end)
+        point._demand = demand
+        point._incompatible_vehicles = list(incompatible_vehicles) \
+            if isinstance(incompatible_vehicles, list) \
+            else incompatible_vehicles
+        return point
+
+    def violations(self):
+        """Return the messages of all properties which are not valid"""
+        return _property_violations(
+            self, ("id", "name", "id_customer", "penalty_or_cost",
+                   "service_time", "tw_begin", "tw_end", "demand",
+                   "incompatible_vehicles"),
+            "point " + str(self._id) + " : ")
 
     def get_point(self, debug=False):
         """Get all components of a Point which are
@@ -638,6 +1381,8 @@ class Customer(Point):
        - demand(int): must be an integer
     """
 
+    __slots__ = ()
+
     def __init__(
             self,
             id,
@@ -676,6 +1421,8 @@ class Depot(Point):
         capacity: must be an integer
     """
 
+    __slots__ = ()
+
     def __init__(
             self,
             id,
@@ -697,6 +1444,9 @@ class Link:
         start point with the same time and distance
     """
 
+    __slots__ = ("_name", "_is_directed", "_start_point_id", "_end_point_id",
+                 "_distance", "_time", "_fixed_cost")
+
     def __init__(self, start_point_id, end_point_id, name=str(), is_directed=False,
                  distance=0.0, time=0.0, fixed_cost=0.0):
         self.name = name
@@ -776,6 +1526,9 @@ class Link:
         if not isinstance(distance, (int, float)):
             raise PropertyError(constants.LINK.DISTANCE.value,
                                 constants.NUMBER_PROPERTY)
+        if not math.isfinite(distance):
+            raise PropertyError(constants.LINK.DISTANCE.value,
+                                constants.FINITE_PROPERTY)
         if distance < 0:
             raise PropertyError(constants.LINK.DISTANCE.value,
                                 constants.GREATER_ZERO_PROPERTY)
@@ -792,6 +1545,9 @@ class Link:
         if not isinstance(time, (int, float)):
             raise PropertyError(constants.LINK.TIME.value,
                                 constants.NUMBER_PROPERTY)
+        if not math.isfinite(time):
+            raise PropertyError(constants.LINK.TIME.value,
+                                constants.FINITE_PROPERTY)
         if time < 0:
             raise PropertyError(constants.LINK.TIME.value,
                                 constants.GREATER_ZERO_PROPERTY)
@@ -808,6 +1564,9 @@ class Link:
         if not isinstance(fixed_cost, (int, float)):
             raise PropertyError(constants.LINK.FIXED_COST.value,
                                 constants.NUMBER_PROPERTY)
+        if not math.isfinite(fixed_cost):
+            raise PropertyError(constants.LINK.FIXED_COST.value,
+                                constants.FINITE_PROPERTY)
         self._fixed_cost = fixed_cost
 
     def get_link(self, debug=False):
@@ -1039,6 +1798,8 @@ class Statistics:
         self.__root_lb = 0
         self.__root_time = 0
         self.__nb_branch_and_bound_nodes = 0
+        self.__quick_lb = None
+        self.__min_nb_vehicles = None
         if json_input != str():
             self.__json_input = json_input
             self.__solution_time = json_input[constants.STATISTICS.
@@ -1083,6 +1844,32 @@ class Statistics:
         """float : time computed to find the solution"""
         return self.__solution_time
 
+    @property
+    def quick_lb(self):
+        """float : lower bound computed without solving by
+        :py:meth:`Model.compute_lower_bounds` (None if not computed)"""
+        return self.__quick_lb
+
+    @property
+    def min_nb_vehicles(self):
+        """int : number of vehicles needed by the capacities, computed by
+        :py:meth:`Model.compute_lower_bounds` (None if not computed, inf
+        if the vehicles available are not enough)"""
+        return self.__min_nb_vehicles
+
+    def quick_gap(self, value):
+        """Return the relative gap between a solution value and quick_lb,
+        or None if quick_lb is not computed"""
+        if self.__quick_lb is None:
+            return None
+        if value == self.__quick_lb:
+            return 0.0
+        return (value - self.__quick_lb) / max(abs(value), 1e-9)
+
+    def _set_quick_bounds(self, quick_lb, min_nb_vehicles):
+        self.__quick_lb = quick_lb
+        self.__min_nb_vehicles = min_nb_vehicles
+
     def __repr__(self):
         return repr(self.__json_input)
 
@@ -1196,7 +1983,7 @@ class Solution:
 
         if json_input != None:
             self.__json = json_input
-            if (status > -1 and status < 4) or status == 8:
+            if (status > -1 and status < 5) or status == 8:
                 self.__value = self.__json["Solution"][
                                         "bestSolutionValue"]
                 if len(self.__json["Solution"]["Routes"]) > 0:
@@ -1239,11 +2026,138 @@ class Solution:
             outfile.write(json.dumps(self.json, indent=1))
 
 
+class NativeBackend:
+    """Shared library bapcod loaded once, with the typed functions
+    solveModel and freeMemory. Its version identifies the file of the
+    library by its path, size and modification time.
+
+    Any object with a method solve(payload) taking the json bytes given by
+    :py:meth:`Model.get_json` and returning the json output of the solver
+    can replace it with :py:func:`set_backend`."""
+
+    def __init__(self, cplex_path=str()):
+        start = time.perf_counter()
+        self.__cplex_paths = set()
+        if cplex_path != str():
+            self.load_cplex(cplex_path)
+
+        if platform.system() == constants.WINDOWS_PLATFORM:
+            lib_name = constants.LIBRARY_WINDOWS
+        elif platform.system() == constants.LINUX_PLATFORM:
+            lib_name = constants.LIBRARY_LINUX
+        elif platform.system() == constants.MAC_PLATFORM:
+            if platform.machine() == 'arm64':
+                lib_name = constants.LIBRARY_ARM_MAC
+            else:
+                lib_name = constants.LIBRARY_MAC
+        else:
+            raise ModelError(constants.PLATFORM_ERROR)
+
+        # Try three different locations to load the native library:
+        # 1. The current folder
+        # 2. The platform folder (lib/Windows for example)
+        # 3. The system folders (delegates the loading behavior to the system)
+        lib_candidates = [
+            os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                         lib_name),
+            os.path.join(os.path.join(os.path.realpath(__file__ +
+                                                       "/../../lib/"),
+                                      platform.system()), lib_name),
+            lib_name]
+
+        self.path = None
+        for candidate in lib_candidates:
+            try:
+                # Python 3.8 has changed the behavior of CDLL on Windows.
+                if hasattr(os, 'add_dll_directory'):
+                    lib_bapcod = _c.CDLL(candidate, winmode=0)
+                else:
+                    lib_bapcod = _c.CDLL(candidate)
+                self.path = candidate
+                break
+            except BaseException:
+                pass
+        if self.path is None:
+            raise ModelError(constants.LOAD_LIB_ERROR)
+        try:
+            stat = os.stat(self.path)
+            self.version = "%s %d %d" % (self.path, stat.st_size,
+                                         stat.st_mtime_ns)
+        except OSError:
+            # found in the system folders
+            self.version = self.path
+
+        self.__solve = lib_bapcod.solveModel
+        self.__solve.argtypes = [_c.c_char_p]
+        self.__solve.restype = _c.POINTER(_c.c_char_p)
+        self.__free_memory = lib_bapcod.freeMemory
+        self.__free_memory.argtypes = [_c.POINTER(_c.c_char_p)]
+        self.__free_memory.restype = _c.c_void_p
+        self.load_time = time.perf_counter() - start
+
+    def load_cplex(self, cplex_path):
+        """Load the library cplex, only the first time a path is given"""
+        if cplex_path in self.__cplex_paths:
+            return
+        try:
+            _c.cdll.LoadLibrary(os.path.realpath(cplex_path))
+        except BaseException:
+            raise ModelError(constants.BAPCOD_ERROR)
+        self.__cplex_paths.add(cplex_path)
+
+    def solve(self, payload):
+        """Solve the model encoded in payload and return the output of
+        bapcod (the GIL is released during the call)"""
+        output = self.__solve(payload)
+        try:
+            return _c.c_char_p.from_buffer(output).value
+        finally:
+            self.__free_memory(output)
+
+
+_BACKEND = None
+
+
+def get_backend(cplex_path=str()):
+    """Return the backend used by :py:meth:`Model.solve`,
+    the native library is loaded at the first call only"""
+    global _BACKEND
+    if _BACKEND is None:
+        _BACKEND = NativeBackend(cplex_path)
+    elif cplex_path != str() and isinstance(_BACKEND, NativeBackend):
+        _BACKEND.load_cplex(cplex_path)
+    return _BACKEND
+
+
+def _solve_payload(payload, cplex_path=str()):
+    """Solve a model encoded by :py:meth:`Model.get_json` with the
+    backend of the current thread or process"""
+    return get_backend(cplex_path).solve(payload)
+
+
+def set_backend(backend=None):
+    """Replace the backend used by :py:meth:`Model.solve`, for example
+    by a stand-in to benchmark the python side without bapcod.
+    With None, the native library is loaded again at the next solve"""
+    global _BACKEND
+    _BACKEND = backend
+
+
 class Model:
-    """Define a routing model."""
+    """Define a routing model.
 
-    def __init__(self):
-        self.__json = {}
+    With validate="deferred", the properties of vehicle types, points and
+    links added with the add functions are not checked one by one,
+    they are all checked by :py:meth:`validate` before solving."""
+
+    def __init__(self, validate="immediate"):
+        if validate not in constants.VALIDATION_MODES:
+            raise PropertyError(constants.VALIDATE_STR,
+                                constants.ENUM_STR_PROPERTY,
+                                str(constants.VALIDATION_MODES))
+        self.__deferred_validation = validate == "deferred"
+        self.__json = bytes()
+        self.__json_sections = {}
         self.vehicle_types = VehicleTypesDict()
         self.points = PointsDict()
         self.__customers = dict()
@@ -1255,6 +2169,8 @@ class Model:
         self.statistics = Statistics()
         self.status = int(constants.MODEL_NOT_SOLVED)
         self.message = constants.ERRORS_MODEL[self.status]
+        self.presolve_reports = []
+        self.__quick_bounds = None
 
     @property
     def vehicle_types(self):
@@ -1387,6 +2303,11 @@ class Model:
         """Add VehicleType in dictionary :py:attr:`vehicle_types`"""
         if id in self.vehicle_types:
             raise ModelError(constants.ADD_VEHICLE_TYPE_ERROR)
+        if self.__deferred_validation:
+            dict.__setitem__(self.vehicle_types, id, VehicleType._trusted(
+                id, start_point_id, end_point_id, name, capacity, fixed_cost,
+                var_cost_dist, var_cost_time, max_number, tw_begin, tw_end))
+            return
         self.vehicle_types[id] = VehicleType(
             id,
             start_point_id,
@@ -1416,25 +2337,98 @@ class Model:
             time=0.0,
             fixed_cost=0.0):
         """Add Link in dictionary :py:attr:`links`"""
-        if (start_point_id,end_point_id) in self.links : 
-            self.links[(start_point_id,end_point_id)].append(Link(
-                start_point_id,
-                end_point_id,
-                name,
-                is_directed,
-                distance,
-                time,
-                fixed_cost))
-        else :
-            self.links[(start_point_id,end_point_id)] = [Link(
-                start_point_id,
-                end_point_id,  
-                name,
-                is_directed,
-                distance,
-                time,
-                fixed_cost)]
-                
+        if self.__deferred_validation:
+            self.links.add(start_point_id, end_point_id, name, is_directed,
+                           distance, time, fixed_cost)
+            return
+        self.links.append(Link(
+            start_point_id,
+            end_point_id,
+            name,
+            is_directed,
+            distance,
+            time,
+            fixed_cost))
+
+    def add_links_from_matrix(
+            self,
+            distance,
+            time=None,
+            fixed_cost=None,
+            point_ids=None,
+            symmetric=True):
+        """Add in :py:attr:`links` one link for each pair of points
+        from matrices of distances, times and fixed costs.
+
+        Matrices can be square (list of rows or numpy array) or,
+        only if symmetric is True, the upper triangular part given row by row
+        in a flat list (pairs (0,1), (0,2), ..., (1,2), ...).
+        If symmetric is True, one link is added for each pair i < j,
+        otherwise one directed link is added for each pair i != j.
+        point_ids gives the id of the point of each row, by default
+        it is 0,1,...,n-1.
+        Links are stored in typed arrays without creating Link objects,
+        their values are stored as floats and integral values are given
+        to the solver as integers."""
+
+        columns = [_matrix_to_column(matrix, symmetric, prop.value)
+                   for matrix, prop in ((distance, constants.LINK.DISTANCE),
+                                        (time, constants.LINK.TIME),
+                                        (fixed_cost,
+                                         constants.LINK.FIXED_COST))]
+        nb_links = len(columns[0])
+        if symmetric:
+            nb_points = int(round((1 + (1 + 8 * nb_links) ** 0.5) / 2))
+            if nb_points * (nb_points - 1) // 2 != nb_links:
+                raise PropertyError(constants.LINK.DISTANCE.value,
+                                    constants.MATRIX_PROPERTY)
+        else:
+            nb_points = int(round((1 + (1 + 4 * nb_links) ** 0.5) / 2))
+        for i, column in enumerate(columns):
+            if column is None:
+                columns[i] = array('d', bytes(8 * nb_links))
+            elif len(column) != nb_links:
+                raise PropertyError(constants.LINK.DISTANCE.value,
+                                    constants.MATRIX_PROPERTY)
+        for column, prop in zip(columns, (constants.LINK.DISTANCE,
+                                          constants.LINK.TIME,
+                                          constants.LINK.FIXED_COST)):
+            if not all(map(math.isfinite, column)):
+                raise PropertyError(prop.value, constants.FINITE_PROPERTY)
+        if min(columns[0], default=0) < 0:
+            raise PropertyError(constants.LINK.DISTANCE.value,
+                                constants.GREATER_ZERO_PROPERTY)
+        if time is not None and min(columns[1], default=0) < 0:
+            raise PropertyError(constants.LINK.TIME.value,
+                                constants.GREATER_ZERO_PROPERTY)
+
+        if point_ids is None:
+            point_ids = range(nb_points)
+        point_ids = list(point_ids)
+        if len(point_ids) != nb_points:
+            raise PropertyError(constants.LINK.DISTANCE.value,
+                                constants.MATRIX_PROPERTY)
+        for point_id in point_ids:
+            if not isinstance(point_id, int):
+                raise PropertyError(constants.LINK.START_POINT_ID.value,
+                                    constants.INTEGER_PROPERTY)
+            if point_id < 0:
+                raise PropertyError(constants.LINK.START_POINT_ID.value,
+                                    constants.GREATER_ZERO_PROPERTY)
+
+        start_point_ids = array('i')
+        end_point_ids = array('i')
+        for i, point_id in enumerate(point_ids):
+            if symmetric:
+                ends = point_ids[i + 1:]
+            else:
+                ends = point_ids[:i] + point_ids[i + 1:]
+            start_point_ids.extend(array('i', [point_id]) * len(ends))
+            end_point_ids.extend(array('i', ends))
+        is_directed = array('b', [0 if symmetric else 1]) * nb_links
+
+        self.links.add_columns(start_point_ids, end_point_ids, columns[0],
+                               columns[1], columns[2], is_directed)
 
     def delete_link(self, start_point_id : int,end_point_id : int):
         """ Delete a link by giving start point id and end point id """
@@ -1477,16 +2471,21 @@ class Model:
         if id in self.points:
             raise ModelError(constants.ADD_POINT_ERROR)
 
-        self.points[id] = Point(
-            id,
-            name,
-            id_customer,
-            penalty_or_cost,
-            service_time,
-            tw_begin,
-            tw_end,
-            demand,
-            incompatible_vehicles)
+        if self.__deferred_validation:
+            dict.__setitem__(self.points, id, Point._trusted(
+                id, name, id_customer, penalty_or_cost, service_time,
+                tw_begin, tw_end, demand, incompatible_vehicles))
+        else:
+            self.points[id] = Point(
+                id,
+                name,
+                id_customer,
+                penalty_or_cost,
+                service_time,
+                tw_begin,
+                tw_end,
+                demand,
+                incompatible_vehicles)
 
         if id_customer>0:
             self.__propagate_penalties(id_customer,id,penalty_or_cost)
@@ -1573,6 +2572,105 @@ class Model:
         self.max_total_vehicles_number = number
 
 
+    def sparsify_links(self, nb_nearest=10):
+        """Keep for each point only the links to its nb_nearest cheapest
+        neighbors, and all links of the depots. If the model is infeasible
+        without the removed links, :py:meth:`solve` (as well as
+        :py:meth:`submit`, :py:meth:`solve_async` and the functions of
+        :py:mod:`VRPSolverEasy.src.parallel`) adds them back and solves it
+        again. Return a :py:class:`PresolveReport`."""
+        from VRPSolverEasy.src import presolve
+        return presolve.sparsify_links(self, nb_nearest)
+
+    def eliminate_capacity_links(self):
+        """Remove the links between customers whose total demand exceeds
+        the capacity of every vehicle type able to visit both, and the
+        customer points that no vehicle type can serve.
+        Raise a ModelError if a customer without penalty cannot be served.
+        Return a :py:class:`PresolveReport`."""
+        from VRPSolverEasy.src import presolve
+        return presolve.eliminate_capacity_links(self)
+
+    def tighten_time_windows(self):
+        """Tighten the time windows of the customers with the earliest
+        arrival from the start depots and the latest departure to the end
+        depots of the vehicle types, and remove the links which cannot be
+        used within the time windows.
+        Raise a ModelError if a customer without penalty cannot be served.
+        Return a :py:class:`PresolveReport`."""
+        from VRPSolverEasy.src import presolve
+        return presolve.tighten_time_windows(self)
+
+    def prune_parallel_links(self):
+        """Remove the parallel links which are dominated by another link
+        between the same points (not better on distance, time and fixed
+        cost), and merge the directed links of opposite directions with
+        the same name, distance, time and fixed cost into one undirected
+        link. Return a :py:class:`PresolveReport`."""
+        from VRPSolverEasy.src import presolve
+        return presolve.prune_parallel_links(self)
+
+    def bound_fleet(self):
+        """Lower max_number of each vehicle type and the maximum total
+        number of vehicles to the number of customers they can visit,
+        and compute a lower bound on the number of vehicles needed from
+        the capacities and the time windows.
+        Raise a ModelError if the vehicles available cannot serve all
+        customers. Return a :py:class:`PresolveReport`."""
+        from VRPSolverEasy.src import presolve
+        return presolve.bound_fleet(self)
+
+    def compute_lower_bounds(self):
+        """Compute quick lower bounds without solving the model: the number
+        of vehicles needed by the capacities and a K-tree bound of the cost
+        (see :py:mod:`VRPSolverEasy.src.bounds`). They are given by
+        statistics.quick_lb and statistics.min_nb_vehicles, also after the
+        resolution: they are computed again before the resolution if the
+        points, the links or the vehicle types changed. Return quick_lb,
+        which is None if the bound does not apply to the model (open routes,
+        optional or alternative customers) and inf, as min_nb_vehicles,
+        if the model is infeasible."""
+        from VRPSolverEasy.src import bounds
+        min_nb_vehicles = bounds.vehicles_bound(self)
+        if min_nb_vehicles is None:
+            min_nb_vehicles = float("inf")
+            quick_lb = float("inf")
+        else:
+            quick_lb = bounds.routing_bound(self, min_nb_vehicles)
+        self.__quick_bounds = (quick_lb, min_nb_vehicles,
+                               self.__bounds_key())
+        self.statistics._set_quick_bounds(quick_lb, min_nb_vehicles)
+        return quick_lb
+
+    def __bounds_key(self):
+        """Return a snapshot of the elements of the model the quick bounds
+        depend on"""
+        return (self.max_total_vehicles_number, self.links.version(),
+                _snapshot(point.get_point()
+                          for point in dict.values(self.points)),
+                _snapshot(vehicle_type.get_vehicle_type()
+                          for vehicle_type in
+                          dict.values(self.vehicle_types)))
+
+    def validate(self):
+        """Check all properties of vehicle types, points and links
+        and raise a ModelError giving all properties which are not valid.
+        It is called by :py:meth:`solve` when the model is built with
+        validate="deferred"."""
+        violations = []
+        for vehicle_type in dict.values(self.vehicle_types):
+            violations.extend(vehicle_type.violations())
+        if len(self.points) > 1022:
+            violations.append(constants.NB_POINTS_STR +
+                              constants.ERRORS_PROPERTY[
+                                  constants.LESS_MAX_POINTS_PROPERTY])
+        for point in dict.values(self.points):
+            violations.extend(point.violations())
+        violations.extend(self.links.violations())
+        if len(violations) > 0:
+            raise ModelError(constants.VALIDATION_ERROR,
+                             "\n - " + "\n - ".join(violations))
+
     def check_depots(self):
         """Update the model if there are defined intermediate 
         depots not used by vehicles"""
@@ -1595,26 +2693,69 @@ class Model:
         
 
 
-    def set_json(self):
-        """Set model in json format with all elements of model"""
-        self.__json = json.dumps({constants.JSON_OBJECT.MAXNUMBER.value:
-                                  self.max_total_vehicles_number,
-                                  constants.JSON_OBJECT.POINTS.value:
-                                  list(self.points.values()),
-                                  constants.JSON_OBJECT.
-                                  VEHICLE_TYPES.value:
-                                  list(self.vehicle_types.values()),
-                                  constants.JSON_OBJECT.LINKS.value:
-                                  list(self.links.values()),
-                                  constants.JSON_OBJECT.
-                                  PARAMETERS.value:
-                                  self.parameters.get_parameters()},
-                                 indent=1)
+    def __json_section(self, name, key, encode):
+        """Return a section of the model in compact json, it is encoded
+        again only if its key changed since the last call. The key must not
+        share mutable objects with the model."""
+        section = self.__json_sections.get(name)
+        if section is None or section[0] != key:
+            section = (key, encode())
+            self.__json_sections[name] = section
+        return section[1]
 
-    def __str__(self):
+    def set_json(self):
+        """Set model in compact json format with all elements of model,
+        as it is given to the solver.
+        Each section is cached: links are encoded again only if their
+        version changed, points, vehicle types and parameters only if their
+        values changed."""
+        points = list(self.points.values())
+        vehicle_types = list(self.vehicle_types.values())
+        parameters = self.parameters.get_parameters()
+        sections = [
+            (constants.JSON_OBJECT.MAXNUMBER.value,
+             str(self.max_total_vehicles_number).encode('UTF-8')),
+            (constants.JSON_OBJECT.POINTS.value,
+             self.__json_section(constants.JSON_OBJECT.POINTS.value,
+                                 _snapshot(points),
+                                 lambda: _encode_json(points))),
+            (constants.JSON_OBJECT.VEHICLE_TYPES.value,
+             self.__json_section(constants.JSON_OBJECT.VEHICLE_TYPES.value,
+                                 _snapshot(vehicle_types),
+                                 lambda: _encode_json(vehicle_types))),
+            (constants.JSON_OBJECT.LINKS.value,
+             self.__json_section(constants.JSON_OBJECT.LINKS.value,
+                                 self.links.version(), self.links.encode)),
+            (constants.JSON_OBJECT.PARAMETERS.value,
+             self.__json_section(constants.JSON_OBJECT.PARAMETERS.value,
+                                 _snapshot([parameters]),
+                                 lambda: _encode_json(parameters)))]
+        self.__json = b"{" + b",".join(
+            b'"' + name.encode('UTF-8') + b'":' + section
+            for name, section in sections) + b"}"
+
+    def get_json(self):
+        """Return the model in compact json format (bytes),
+        as it is given to the solver"""
         self.set_json()
         return self.__json
 
+    def __get_model(self, debug=False):
+        """Get all elements of model in a dictionary"""
+        return {constants.JSON_OBJECT.MAXNUMBER.value:
+                self.max_total_vehicles_number,
+                constants.JSON_OBJECT.POINTS.value:
+                list(self.points.values(debug)),
+                constants.JSON_OBJECT.VEHICLE_TYPES.value:
+                list(self.vehicle_types.values(debug)),
+                constants.JSON_OBJECT.LINKS.value:
+                list(self.links.values(debug)),
+                constants.JSON_OBJECT.PARAMETERS.value:
+                self.parameters.get_parameters(debug)}
+
+    def __str__(self):
+        return json.dumps(self.__get_model(), indent=1)
+
     def __repr__(self):
         return self.__str__()
 
@@ -1628,108 +2769,175 @@ class Model:
         if all_elements:
             self.check_depots()
 
-        model = json.dumps({constants.JSON_OBJECT.MAXNUMBER.value:
-                            self.max_total_vehicles_number,
-                            constants.JSON_OBJECT.POINTS.
-                            value: list(self.points.values(True)),
-                            constants.JSON_OBJECT.VEHICLE_TYPES.value:
-                           list(self.vehicle_types.values(True)),
-                            constants.JSON_OBJECT.LINKS.value:
-                           list(self.links.values(True)),
-                            constants.JSON_OBJECT.PARAMETERS.value:
-                           self.parameters.get_parameters(True)},
-                           indent=1)
+        model = json.dumps(self.__get_model(True), indent=1)
         # Writing to sample.json
         with open(name + ".json", "w") as outfile:
             outfile.write(model)
    
-    def solve(self):
+    def solve(self, cache=None, auto_upper_bound=False):
         """
         Solve the routing problem by using the shared library bapcod.
-           
+        With a :py:class:`ResultCache` given in cache, a model already
+        solved with the same parameters gets its stored solution.
+        With auto_upper_bound, the upper bound is given by the savings
+        heuristic improved by a local search (see
+        :py:mod:`VRPSolverEasy.heuristics.local_search`) during the
+        resolution, and its solution is kept if the solver does not
+        find a better one.
 
         Additional informations:
             VRPSolverEasy is compatible with Windows 64x,  Linux and macOS only
         """
-        _lib_bapcod = None
-        _lib_name = None
-        _lib_candidates = []
-
-
-        if platform.system() == constants.WINDOWS_PLATFORM:
-            _lib_name = constants.LIBRARY_WINDOWS
-        elif platform.system() == constants.LINUX_PLATFORM:
-            _lib_name = constants.LIBRARY_LINUX
-        elif platform.system() == constants.MAC_PLATFORM:
-            if platform.machine() == 'arm64':
-                _lib_name = constants.LIBRARY_ARM_MAC
-            else:
-                _lib_name = constants.LIBRARY_MAC
-
+        if not auto_upper_bound:
+            self.__solve(cache)
+            return
+        from VRPSolverEasy.heuristics.local_search import local_search
+        if self.__deferred_validation:
+            self.validate()
+        self.check_depots()
+        upper_bound = self.parameters.upper_bound
+        heuristic_solution = local_search(self)
+        if heuristic_solution is not None and \
+                heuristic_solution.value < upper_bound:
+            self.parameters.upper_bound = heuristic_solution.value
         else:
-            raise ModelError(constants.PLATFORM_ERROR)
+            heuristic_solution = None
+        try:
+            self.__solve(cache)
+        finally:
+            self.parameters.upper_bound = upper_bound
+        if heuristic_solution is not None and \
+                not self.solution.is_defined() and \
+                self.status in (constants.BETTER_SOL_DOES_NOT_EXISTS,
+                                constants.BETTER_SOL_NOT_FOUND):
+            self.solution = heuristic_solution
+
+    def __solve(self, cache):
+        """Solve the model, again with the links removed by
+        :py:meth:`sparsify_links` if it is infeasible without them"""
+        while self.__solve_once(cache):
+            pass
+
+    def __solve_once(self, cache):
+        """Solve the model with the backend or get it from the cache,
+        return True if it must be solved again (see :py:meth:`_apply`)"""
+        backend = get_backend(self.parameters.cplex_path)
+        payload = self._prepare()
+        if cache is not None:
+            context = self.__cache_context(backend)
+            output = cache.get(payload, context)
+            if output is not None:
+                try:
+                    return self._apply(output)
+                except BaseException:
+                    # not a valid output, the model is solved again
+                    cache.discard(payload, context)
+        try:
+            output = _solve_payload(payload, self.parameters.cplex_path)
+            retry = self._apply(output)
+        except BaseException:
+            raise ModelError(constants.BAPCOD_ERROR)
+        if cache is not None and \
+                self.status != constants.INTERRUPTED_BY_ERROR:
+            if isinstance(output, str):
+                output = output.encode('UTF-8')
+            cache.put(payload, output, context)
+        return retry
+
+    def __cache_context(self, backend):
+        """Return what the output of the solver depends on besides the
+        json given to it: the version of the backend and the content of
+        the config file"""
+        context = [getattr(backend, "version", type(backend).__qualname__)]
+        if self.parameters.config_file != str():
+            try:
+                with open(self.parameters.config_file, "rb") as file:
+                    context.append(hashlib.sha256(file.read()).hexdigest())
+            except OSError:
+                context.append(str())
+        return "\n".join(context).encode('UTF-8')
 
-        # Load solver
-        if self.parameters.cplex_path != str():
+    def submit(self, executor):
+        """
+        Solve the routing problem in an executor of concurrent.futures
+        and return a Future giving the solution, the model is updated
+        as with :py:meth:`solve` when the Future is done.
+        The GIL is released during the resolution by bapcod.
+        """
+        get_backend(self.parameters.cplex_path)
+        payload = self._prepare()
+        future = concurrent.futures.Future()
+
+        def apply(output):
+            if not future.running() and \
+                    not future.set_running_or_notify_cancel():
+                return
             try:
-                _c.cdll.LoadLibrary(
-                    os.path.realpath(
-                        self.parameters.cplex_path))
+                retry = self._apply(output.result())
+                if retry:
+                    executor.submit(
+                        _solve_payload, self._prepare(),
+                        self.parameters.cplex_path).add_done_callback(apply)
             except BaseException:
-                raise ModelError(constants.BAPCOD_ERROR)
-
-        # Try three different locations to load the native library:
-        # 1. The current folder
-        # 2. The platform folder (lib/Windows for example)
-        # 3. The system folders (delegates the loading behavior to the system)
-
-        _lib_candidates.append(os.path.join(os.path.dirname
-                                            (os.path.realpath(__file__)),
-                                            _lib_name))
-
-        _lib_candidates.append(os.path.join(
-            os.path.join(os.path.realpath(__file__ + "/../../lib/"),
-                         platform.system()), _lib_name))
+                future.set_exception(ModelError(constants.BAPCOD_ERROR))
+                return
+            if not retry:
+                future.set_result(self.solution)
 
-        _lib_candidates.append(_lib_name)
+        executor.submit(_solve_payload, payload,
+                        self.parameters.cplex_path).add_done_callback(apply)
+        return future
 
-        _loaded_library = None
-        for candidate in _lib_candidates:
+    async def solve_async(self, executor=None):
+        """
+        Solve the routing problem without blocking the event loop and
+        return the solution, the model is updated as with :py:meth:`solve`.
+        The resolution runs in executor, or in the default executor
+        of the event loop.
+        """
+        get_backend(self.parameters.cplex_path)
+        loop = asyncio.get_running_loop()
+        retry = True
+        while retry:
+            # checking the model and writing its json also take long on
+            # large models, they run in the executor as the resolution
+            payload = await loop.run_in_executor(executor, self._prepare)
             try:
-                # Python 3.8 has changed the behavior of CDLL on Windows.
-                if hasattr(os, 'add_dll_directory'):
-                    _lib_bapcod = _c.CDLL(candidate, winmode=0)
-                else:
-                    _lib_bapcod = _c.CDLL(candidate)
-                _loaded_library = candidate
-                break
+                output = await loop.run_in_executor(
+                    executor, _solve_payload, payload,
+                    self.parameters.cplex_path)
+                retry = self._apply(output)
+            except asyncio.CancelledError:
+                raise
             except BaseException:
-                pass
+                raise ModelError(constants.BAPCOD_ERROR)
+        return self.solution
 
-        if _loaded_library is None:
-            raise ModelError(constants.LOAD_LIB_ERROR)
+    def _prepare(self):
+        """Check the model and return its json"""
+        if self.__deferred_validation:
+            self.validate()
         self.check_depots()
         self.set_json()
+        if self.__quick_bounds is not None and \
+                self.__quick_bounds[2] != self.__bounds_key():
+            self.compute_lower_bounds()
+        return self.__json
 
-        input = _c.c_char_p(self.__json.encode('UTF-8'))
-        solve = _lib_bapcod.solveModel
-        solve.argtypes = [_c.c_char_p]
-        solve.restype = _c.POINTER(_c.c_char_p)
-        free_memory = _lib_bapcod.freeMemory
-        free_memory.argtypes = [_c.POINTER(_c.c_char_p)]
-        free_memory.restype = _c.c_void_p
-
-        try:
-            output = solve(input)
-            self.__output = json.loads((_c.c_char_p.from_buffer(output)).value)
-            self.status = self.__output["Status"]["code"]
-            self.message = self.__output["Status"]["message"]
-            self.solution = Solution(self.__output,self.status)
-
-            if self.status > -1 and self.status < 4 and self.parameters.action != "enumAllFeasibleRoutes":
-                self.statistics = Statistics(self.solution.json["Statistics"])
-                
-            free_memory(output)
-        except BaseException:
-            raise ModelError(constants.BAPCOD_ERROR)
+    def _apply(self, output):
+        """Set status, solution and statistics from the output of bapcod.
+        Return True if the model must be solved again: it is infeasible
+        and the links removed by :py:meth:`sparsify_links` were added
+        back"""
+        self.__output = json.loads(output)
+        self.status = self.__output["Status"]["code"]
+        self.message = self.__output["Status"]["message"]
+        self.solution = Solution(self.__output,self.status)
+
+        if self.status > -1 and self.status < 4 and self.parameters.action != "enumAllFeasibleRoutes":
+            self.statistics = Statistics(self.solution.json["Statistics"])
+            if self.__quick_bounds is not None:
+                self.statistics._set_quick_bounds(*self.__quick_bounds[:2])
+        return self.status == constants.INFEASIBLE and \
+            self.links.restore() > 0
 
@@ -1,9 +1,191 @@
+import asyncio
+import concurrent.futures
+import copy
+import json
 import random
+import tempfile
+import threading
+import time
 import unittest
 import os
-from VRPSolverEasy.src import solver, constants
+import math
+import numpy as np
+from VRPSolverEasy.src import (solver, constants, parallel, cache,
+                               decomposition, geometry)
+from VRPSolverEasy.heuristics import savings, local_search, routing
+from VRPSolverEasy.io import readers, library
 from VRPSolverEasy.demos import CVRPTW,CVRP,HFVRP,MDVRP
 
+class StandInBackend:
+    """ backend giving the route 0-1-0 without solving """
+    def __init__(self):
+        self.payloads = []
+
+    def solve(self, payload):
+        self.payloads.append(payload)
+        return json.dumps({
+            "Status": {"code": 0, "message": "OPTIMAL_SOL_FOUND"},
+            "Solution": {"bestSolutionValue": 8, "Routes": [
+                {"vehicleTypeId": 1, "routeCost": 8,
+                 "visitedPoints": [
+                     {"pointId": point_id, "pointName": "",
+                      "load": 0, "endTime": 0, "incomingArcName": ""}
+                     for point_id in (0, 1, 0)]}]},
+            "Statistics": {"solutionTime": 0, "solutionValue": 8,
+                           "bestLB": 8, "rootLB": 8, "rootTime": 0,
+                           "nbBranchAndBoundNodes": 1}})
+
+
+class SlowBackend(StandInBackend):
+    """ backend never ending the resolution of vehicles named "slow" """
+    def solve(self, payload):
+        if b'"slow"' in payload:
+            time.sleep(60)
+        return super().solve(payload)
+
+
+class CrashBackend(StandInBackend):
+    """ backend killing its process for vehicles named "crash" """
+    def solve(self, payload):
+        if b'"crash"' in payload:
+            os._exit(1)
+        return super().solve(payload)
+
+
+class SparseInfeasibleBackend(StandInBackend):
+    """ backend finding infeasible the models with less than 400 links """
+    def solve(self, payload):
+        if len(json.loads(payload)["Links"]) < 400:
+            self.payloads.append(payload)
+            return json.dumps({
+                "Status": {"code": constants.INFEASIBLE,
+                           "message": "INFEASIBLE"},
+                "Solution": {"bestSolutionValue": 0, "Routes": []},
+                "Statistics": {"solutionTime": 0, "solutionValue": 0,
+                               "bestLB": 0, "rootLB": 0, "rootTime": 0,
+                               "nbBranchAndBoundNodes": 1}})
+        return super().solve(payload)
+
+
+class LocalSearchBackend:
+    """ backend giving the solution of the local search, if it is better
+        than the upper bound """
+    def solve(self, payload):
+        data = json.loads(payload)
+        model = solver.Model()
+        for vehicle in data["VehicleTypes"]:
+            model.add_vehicle_type(
+                vehicle["id"], vehicle["startPointId"],
+                vehicle["endPointId"], capacity=vehicle.get("capacity", 0),
+                fixed_cost=vehicle.get("fixedCost", 0),
+                var_cost_dist=vehicle.get("varCostDist", 0),
+                var_cost_time=vehicle.get("varCostTime", 0),
+                max_number=vehicle.get("maxNumber", 0),
+                tw_begin=vehicle.get("twBegin", 0),
+                tw_end=vehicle.get("twEnd", 0))
+        for point in data["Points"]:
+            model.add_point(
+                point["id"], point.get("name", ""),
+                point.get("idCustomer", 0), point.get("serviceTime", 0),
+                point.get("penaltyOrCost", 0), point.get("twBegin", 0),
+                point.get("twEnd", 0), point.get("demandOrCapacity", 0),
+                point.get("incompatibleVehicles", []))
+        for link in data["Links"]:
+            model.add_link(link["startPointId"], link["endPointId"],
+                           is_directed=link.get("isDirected", False),
+                           distance=link.get("distance", 0),
+                           time=link.get("time", 0),
+                           fixed_cost=link.get("fixedCost", 0))
+        model.max_total_vehicles_number = data["MaxTotalVehiclesNumber"]
+        solution = local_search.local_search(model)
+        upper_bound = data["Parameters"].get("upperBound", 1000000)
+        if solution is None or solution.value >= upper_bound:
+            status, value, routes = (constants.BETTER_SOL_DOES_NOT_EXISTS,
+                                     upper_bound, [])
+        else:
+            status, value, routes = (constants.BETTER_SOL_FOUND,
+                                     solution.value,
+                                     solution.json["Solution"]["Routes"])
+        return json.dumps({
+            "Status": {"code": status, "message": ""},
+            "Solution": {"bestSolutionValue": value, "Routes": routes},
+            "Statistics": {"solutionTime": 0, "solutionValue": value,
+                           "bestLB": 0, "rootLB": 0, "rootTime": 0,
+                           "nbBranchAndBoundNodes": 1}})
+
+
+def random_decomposed_model(nb_customers, seed, capacity=30):
+    """ decomposed cvrp model with random points around one depot """
+    rand = random.Random(seed)
+    coordinates = [(rand.uniform(0, 100), rand.uniform(0, 100))
+                   for _ in range(nb_customers + 1)]
+    model = decomposition.DecomposedModel(coordinates=coordinates)
+    model.add_vehicle_type(1, 0, 0, capacity=capacity,
+                           max_number=nb_customers, var_cost_dist=1)
+    model.add_depot(0)
+    for i in range(1, nb_customers + 1):
+        model.add_customer(i, demand=rand.randint(1, 10))
+    return model
+
+
+def small_model():
+    """ model with one depot and one customer """
+    model = solver.Model()
+    model.add_vehicle_type(1, 0, 0, capacity=10)
+    model.add_depot(0)
+    model.add_customer(1, demand=5)
+    model.add_link(0, 1, distance=4)
+    return model
+
+
+def random_model(nb_customers, seed, capacity=30, time_windows=False):
+    """ cvrp model with random points, with time windows if asked """
+    rand = random.Random(seed)
+    coordinates = [(rand.uniform(0, 100), rand.uniform(0, 100))
+                   for _ in range(nb_customers + 1)]
+    model = solver.Model()
+    model.add_vehicle_type(1, 0, 0, capacity=capacity,
+                           max_number=nb_customers, var_cost_dist=1,
+                           tw_end=1000 if time_windows else 0)
+    model.add_depot(0, tw_end=1000 if time_windows else 0)
+    for i in range(1, nb_customers + 1):
+        tw_begin = rand.uniform(0, 400) if time_windows else 0
+        model.add_customer(i, demand=rand.randint(1, 10),
+                           service_time=10 if time_windows else 0,
+                           tw_begin=tw_begin,
+                           tw_end=tw_begin + 200 if time_windows else 0)
+    model.add_links_from_matrix(
+        [[((x_i - x_j)**2 + (y_i - y_j)**2)**0.5 for x_j, y_j in coordinates]
+         for x_i, y_i in coordinates],
+        time=[[((x_i - x_j)**2 + (y_i - y_j)**2)**0.5
+               for x_j, y_j in coordinates] for x_i, y_i in coordinates])
+    return model
+
+
+def check_routes(test, model, solution):
+    """ check that each customer is visited once by routes respecting
+        capacities and time windows """
+    visited = []
+    value = 0
+    for route in solution.routes:
+        vehicle_type = model.vehicle_types[route.vehicle_type_id]
+        test.assertEqual(route.point_ids[0], vehicle_type.start_point_id)
+        test.assertEqual(route.point_ids[-1], vehicle_type.end_point_id)
+        customers = route.point_ids[1:-1]
+        test.assertLessEqual(sum(model.points[i].demand for i in customers),
+                             vehicle_type.capacity)
+        for point_id, time in zip(route.point_ids, route.time_consumption):
+            point = model.points[point_id]
+            if point.tw_end != 0:
+                test.assertLessEqual(time, point.tw_end + 1e-6)
+            test.assertNotIn(vehicle_type.id, point.incompatible_vehicles)
+        visited.extend(customers)
+        value += route.route_cost
+    test.assertEqual(sorted(visited), sorted(
+        id for id, point in model.points.items() if point.id_customer != 0))
+    test.assertAlmostEqual(value, solution.value)
+
+
 class TestAllVariants(unittest.TestCase):
 
     def test_cvrp(self):
@@ -582,6 +764,1057 @@ class TestAllClass(unittest.TestCase):
         self.assertEqual(0, model.points[5].id_customer)
         self.assertEqual(0, model.points[9999].id_customer)
 
+    def test_compact_classes(self):
+        """ points, links and vehicle types must not have a __dict__ """
+        model = solver.Model()
+        model.add_vehicle_type(1, 0, 0)
+        model.add_depot(0)
+        model.add_customer(1, penalty=5.5)
+        for value in (model.vehicle_types[1], model.points[0],
+                      model.points[1], solver.Link(0, 1)):
+            self.assertFalse(hasattr(value, "__dict__"))
+        self.assertEqual(model.points[1].penalty, 5.5)
+        with self.assertRaises(AttributeError):
+            model.points[1].x_coordinate = 5
+
+    def test_deferred_validation(self):
+        """ with deferred validation, all properties which are not valid
+            must be reported by validate """
+        model = solver.Model(validate="deferred")
+        model.add_vehicle_type(1, 0, 0, capacity=-5)
+        model.add_depot(0)
+        model.add_customer(1, demand=3.5)
+        model.add_customer(2, demand=10)
+        model.add_link(0, 1, distance=-1)
+        model.add_link(1, 2, distance=1)
+        model.add_link(2, 0, is_directed=2)
+        model.add_link(1, 0, is_directed=1, name=5)
+        with self.assertRaises(solver.ModelError) as context:
+            model.validate()
+        message = context.exception.message
+        self.assertIn("vehicle type 1 : capacity", message)
+        self.assertIn("point 1 : demand", message)
+        self.assertIn("link (0, 1) : distance", message)
+        self.assertIn("link (2, 0) : isDirected", message)
+        self.assertIn("link (1, 0) : isDirected", message)
+        self.assertIn("link (1, 0) : name", message)
+        self.assertNotIn("point 2", message)
+        self.assertNotIn("link (1, 2)", message)
+
+        # types which cannot be stored in links are reported immediately
+        with self.assertRaises(solver.PropertyError):
+            model.add_link(0, "C2")
+        self.assertEqual(len(model.links.values()), 4)
+
+        with self.assertRaises(solver.PropertyError):
+            solver.Model(validate="never")
+
+    def test_json_sections_cache(self):
+        """ links must be encoded again only if they changed """
+        model = solver.Model()
+        model.add_vehicle_type(1, 0, 0, capacity=10)
+        model.add_depot(0)
+        model.add_customer(1, demand=5)
+        model.add_link(0, 1, distance=4)
+        model.set_json()
+        version = model.links.version()
+        model.parameters.time_limit = 10
+        model.points[1].demand = 6
+        self.assertEqual(version, model.links.version())
+        self.assertIn(b'"timeLimit":10', model.get_json())
+        self.assertIn(b'"demandOrCapacity":6', model.get_json())
+
+        # lists changed in place must be encoded again
+        model.add_vehicle_type(2, 0, 0, capacity=10)
+        model.points[1].incompatible_vehicles.append(2)
+        self.assertIn(b'"incompatibleVehicles":[2]', model.get_json())
+        model.points[1].incompatible_vehicles.append(1)
+        self.assertIn(b'"incompatibleVehicles":[2,1]', model.get_json())
+        model.add_customer(2, demand=5)
+        self.assertEqual(model.points[2].incompatible_vehicles, [])
+
+        model.links[(0, 1)][0].distance = 8
+        self.assertNotEqual(version, model.links.version())
+        self.assertIn(b'"distance":8', model.get_json())
+        self.assertEqual(json.loads(model.get_json())["Links"],
+                         model.links.values())
+        self.assertEqual(json.loads(model.get_json()),
+                         json.loads(str(model)))
+
+    def test_add_links_from_matrix(self):
+        """ links added from a matrix must give the same links as
+            links added one by one """
+        distances = [[0, 5, 7.5, 3],
+                     [5, 0, 2, 4],
+                     [7.5, 2, 0, 6],
+                     [3, 4, 6, 0]]
+        model_links = solver.Model()
+        for i in range(4):
+            for j in range(i + 1, 4):
+                model_links.add_link(start_point_id=i, end_point_id=j,
+                                     distance=float(distances[i][j]),
+                                     time=float(distances[i][j]))
+        model_matrix = solver.Model()
+        model_matrix.add_links_from_matrix(distances, time=distances)
+        self.assertEqual(model_links.links.values(),
+                         model_matrix.links.values())
+        self.assertIn((1, 3), model_matrix.links)
+        self.assertEqual(len(model_matrix.links), 6)
+        self.assertEqual(model_matrix.links[(1, 3)][0].distance, 4)
+
+        # upper triangular part with given ids and directed links
+        model_matrix = solver.Model()
+        model_matrix.add_links_from_matrix([5, 7.5, 2], point_ids=[0, 3, 8])
+        self.assertEqual(list(model_matrix.links), [(0, 3), (0, 8), (3, 8)])
+        model_matrix.add_links_from_matrix([[0, 1], [2, 0]], symmetric=False)
+        self.assertTrue(model_matrix.links[(1, 0)][0].is_directed)
+
+        # integral values are given to the solver as integers
+        model_matrix = solver.Model()
+        model_matrix.add_links_from_matrix([3, 2.5, 1e20])
+        encoded = model_matrix.links.encode()
+        self.assertIn(b'"distance":3}', encoded)
+        self.assertIn(b'"distance":2.5}', encoded)
+        self.assertIn(b'"distance":1e+20}', encoded)
+        self.assertIsInstance(model_matrix.links[(0, 1)][0].distance, int)
+
+        # values which are not finite are not valid
+        for value in (float("nan"), float("inf")):
+            with self.assertRaises(solver.PropertyError):
+                solver.Model().add_links_from_matrix([1, value, 2])
+            with self.assertRaises(solver.PropertyError):
+                solver.Model().add_links_from_matrix(
+                    [1, 1, 2], fixed_cost=[0, 0, value])
+            with self.assertRaises(solver.PropertyError):
+                model_matrix.add_link(0, 5, time=value)
+            with self.assertRaises(solver.PropertyError):
+                model_matrix.links[(0, 1)][0].distance = value
+        model_deferred = solver.Model(validate="deferred")
+        model_deferred.add_link(0, 1, distance=float("nan"))
+        self.assertIn("link (0, 1) : distance must be a finite number",
+                      model_deferred.links.violations())
+
+    def test_geometry(self):
+        """ the matrices of distances must give the distances computed
+            one by one """
+        rand = random.Random(9)
+        coordinates = [(rand.uniform(0, 100), rand.uniform(0, 100))
+                       for _ in range(40)]
+        rounded = geometry.distance_matrix(coordinates, rounding="round")
+        floor = geometry.distance_matrix(coordinates, rounding="floor",
+                                         number_digit=1)
+        manhattan = geometry.distance_matrix(coordinates, metric="manhattan")
+        for i, (x_i, y_i) in enumerate(coordinates):
+            for j, (x_j, y_j) in enumerate(coordinates):
+                distance = math.sqrt((x_i - x_j)**2 + (y_i - y_j)**2)
+                self.assertEqual(rounded[i, j], round(distance, 3))
+                self.assertEqual(floor[i, j], math.floor(distance * 10) / 10)
+                self.assertAlmostEqual(manhattan[i, j],
+                                       abs(x_i - x_j) + abs(y_i - y_j))
+        self.assertTrue(np.array_equal(
+            geometry.packed_distances(coordinates, rounding="round"),
+            geometry.upper_triangle(rounded)))
+        self.assertEqual(geometry.distance_matrix(
+            coordinates, dtype=np.float32).dtype, np.float32)
+        paris_london = geometry.distance_matrix(
+            [(48.8566, 2.3522)], [(51.5074, -0.1278)], metric="haversine")
+        self.assertAlmostEqual(paris_london[0, 0], 343.6, places=1)
+        with self.assertRaises(solver.PropertyError):
+            geometry.distance_matrix(coordinates, metric="chebyshev")
+
+        # numpy matrices must give the same links as lists
+        model_lists = solver.Model()
+        model_lists.add_links_from_matrix(rounded.tolist())
+        model_lists.add_links_from_matrix(manhattan.tolist(),
+                                          symmetric=False)
+        model_arrays = solver.Model()
+        model_arrays.add_links_from_matrix(rounded)
+        model_arrays.add_links_from_matrix(manhattan, symmetric=False)
+        self.assertEqual(model_lists.links.values(),
+                         model_arrays.links.values())
+        with self.assertRaises(solver.PropertyError):
+            model_arrays.add_links_from_matrix(rounded[:3], symmetric=False)
+
+    def test_readers(self):
+        """ the instances must be read in columns and give their models """
+        path_data = os.path.join(os.path.dirname(
+            os.path.realpath(__file__ + "/../")), "demos", "data")
+        instance = readers.read_cvrplib(
+            os.path.join(path_data, "CVRP", "A-n32-k5.vrp"))
+        self.assertEqual(instance.nb_customers, 31)
+        self.assertEqual(instance.vehicle_capacities.tolist(), [100])
+        self.assertEqual(instance.depot_coordinates.tolist(), [[82, 76]])
+        self.assertEqual(instance.demands[:3].tolist(), [19, 21, 6])
+        model = instance.to_model()
+        self.assertEqual(len(model.points), 32)
+        self.assertEqual(len(model.links), 32 * 31 // 2)
+
+        instance = readers.read(
+            os.path.join(path_data, "CVRPTW", "C101.txt"), "solomon")
+        self.assertEqual(instance.nb_customers, 100)
+        self.assertEqual(instance.vehicle_max_numbers.tolist(), [25])
+        self.assertEqual(instance.tw_end[0], 967 + 90)
+        self.assertEqual(instance.depot_tw_end.tolist(), [1236])
+
+        instance = readers.read_golden(
+            os.path.join(path_data, "HFVRP", "c50_13fsmd.txt"))
+        self.assertEqual(instance.nb_vehicle_types, 6)
+        self.assertEqual(instance.vehicle_var_costs[-1], 3.2)
+        instance = readers.read_cvrplib(
+            os.path.join(path_data, "HFVRP", "X101-FSMFD.vrp"))
+        self.assertEqual(instance.nb_customers, 100)
+        self.assertEqual(instance.vehicle_fixed_costs.tolist(),
+                         [246, 305, 377, 466, 575])
+
+        # the rows of customers have 12 numbers in p03, 9 in p04
+        instance = readers.read_cordeau(
+            os.path.join(path_data, "MDVRP", "p03"))
+        self.assertEqual(instance.coordinates[-1].tolist(), [40, 37])
+        self.assertEqual(instance.demands[-1], 20)
+        self.assertEqual(instance.depot_ids.tolist(), [76, 77, 78, 79, 80])
+        instance = readers.read_cordeau(
+            os.path.join(path_data, "MDVRP", "p04"))
+        self.assertEqual((instance.nb_customers, instance.nb_depots),
+                         (100, 2))
+        self.assertEqual(len(instance.to_model().links), 100 * 99 // 2 +
+                         2 * 100)
+
+        instance = readers.read_richvrp(
+            os.path.join(path_data, "RichVRP", "toy.txt"))
+        self.assertEqual(instance.window_counts.tolist(), [1, 1, 1, 3, 1, 2])
+        self.assertEqual(instance.tw_begin[3:6].tolist(), [0, 200, 400])
+        model = instance.to_model()
+        self.assertEqual(len(model.points), 2 + 9)
+        self.assertEqual(model.points[9].id_customer, 5)
+        self.assertNotIn((5, 8), model.links)
+        self.assertIn((2, 8), model.links)
+        self.assertEqual(model.points[3].incompatible_vehicles, [1, 3])
+
+        with self.assertRaises(solver.PropertyError):
+            readers.read(os.path.join(path_data, "MDVRP", "p01"), "tsplib")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bad.txt")
+            with open(path, "w", encoding="UTF-8") as file:
+                file.write("2\n0 40 40 0\n1 22 x 18\n")
+            with self.assertRaises(readers.InstanceError):
+                readers.read_golden(path)
+
+    def test_instance_library(self):
+        """ the instances must be parsed once, and again only when the
+            content of their file changes """
+        self.assertEqual(len(library.demo_files()), 327)
+        path_data = os.path.join(os.path.dirname(
+            os.path.realpath(__file__ + "/../")), "demos", "data")
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for folder, name, format in (("CVRP", "A-n32-k5.vrp", "cvrplib"),
+                                         ("CVRPTW", "C101.txt", "solomon"),
+                                         ("RichVRP", "toy.txt", "richvrp")):
+                path = os.path.join(directory, name)
+                with open(os.path.join(path_data, folder, name), "rb") as file:
+                    content = file.read()
+                with open(path, "wb") as file:
+                    file.write(content)
+                files.append((path, format))
+            instance_cache = cache.InstanceCache(
+                os.path.join(directory, "cache"))
+            instances = library.InstanceLibrary(files, instance_cache)
+            self.assertEqual(instances.nb_parsed, 3)
+
+            instances = library.InstanceLibrary(files, instance_cache)
+            self.assertEqual(instances.nb_parsed, 0)
+            self.assertEqual(len(instances), 3)
+            toy = instances[files[2][0]]
+            self.assertEqual(toy.window_counts.tolist(), [1, 1, 1, 3, 1, 2])
+            self.assertIsNone(toy.depot_service_times)
+            self.assertTrue(toy.open_routes)
+            c101 = instances[files[1][0]]
+            self.assertEqual(c101.name, "C101")
+            self.assertEqual(c101.demands.dtype, np.int64)
+            self.assertTrue(np.array_equal(
+                c101.tw_end, readers.read_solomon(files[1][0]).tw_end))
+            self.assertEqual(len(c101.to_model().points), 101)
+
+            # same content with another modification time
+            os.utime(files[0][0], ns=(0, 0))
+            instances = library.InstanceLibrary(files, instance_cache)
+            self.assertEqual(instances.nb_parsed, 0)
+            with open(files[0][0], "r+", encoding="UTF-8") as file:
+                content = file.read().replace("CAPACITY : 100",
+                                              "CAPACITY : 90")
+                file.seek(0)
+                file.write(content)
+            os.utime(files[0][0], ns=(1, 1))
+            instances = library.InstanceLibrary(files, instance_cache)
+            self.assertEqual(instances.nb_parsed, 1)
+            self.assertEqual(
+                instances[files[0][0]].vehicle_capacities.tolist(), [90])
+
+    def test_links_columns(self):
+        """ changes on the lists of links must be kept in the columns """
+        model = solver.Model()
+        model.add_link(0, 1, "arc1", distance=3)
+        model.add_link(0, 1, "arc2", distance=4)
+        model.add_link(1, 2, "arc1", distance=5)
+        self.assertEqual(len(model.links), 2)
+        self.assertEqual(model.links.columns().names, ["", "arc1", "arc2"])
+
+        model.links[(0, 1)][0].distance = 10
+        model.links[(0, 1)].append(solver.Link(0, 1, "arc3", distance=1))
+        self.assertEqual([link["distance"] for link in model.links.values()],
+                         [10, 4, 1, 5])
+
+        model.links["arc4"] = [solver.Link(2, 3)]
+        model.delete_link(0, 1)
+        self.assertEqual(list(model.links), [(1, 2), "arc4"])
+        self.assertEqual(len(model.links.values()), 2)
+
+        # the links behave as a dict of lists
+        self.assertIsInstance(model.links, dict)
+        self.assertEqual(dict(model.links), {(1, 2): model.links[(1, 2)],
+                                             "arc4": model.links["arc4"]})
+        self.assertEqual(model.links.copy(), dict(model.links.items()))
+        self.assertEqual(model.links, dict(model.links))
+        self.assertEqual(model.links.get((5, 6), []), [])
+        links = copy.deepcopy(model.links)
+        self.assertEqual(list(links), [(1, 2), "arc4"])
+        self.assertEqual(links.values(), model.links.values())
+
+        # a key whose list is emptied stays, before and after the links
+        # are written back
+        model.add_link(2, 3, distance=6)
+        model.links[(1, 2)].clear()
+        self.assertIn((1, 2), model.links)
+        self.assertEqual(list(model.links), [(2, 3), (1, 2), "arc4"])
+        self.assertEqual(len(model.links), 3)
+        self.assertEqual(len(model.links.values()), 2)
+        self.assertEqual(list(model.links), [(2, 3), (1, 2), "arc4"])
+        self.assertEqual(model.links[(1, 2)], [])
+        model.links.remove_rows(
+            [False] * len(model.links.columns().start_point_id))
+        self.assertEqual(list(model.links), [(1, 2), "arc4"])
+        model.links[(1, 2)].append(solver.Link(1, 2, distance=7))
+        self.assertEqual([link.get("distance", 0)
+                          for link in model.links.values()], [7, 0])
+
+        # a list which gets a link of other points stays with its key
+        model.links[(1, 2)][0].start_point_id = 0
+        self.assertCountEqual(list(model.links), [(1, 2), "arc4"])
+        self.assertEqual(model.links[(1, 2)][0].start_point_id, 0)
+        self.assertEqual(len(model.links.values()), 2)
+        self.assertCountEqual(list(model.links), [(1, 2), "arc4"])
+
+    def test_add_links_from_wrong_matrix(self):
+        """ raise an error if the matrix is not valid """
+        model = solver.Model()
+        with self.assertRaises(solver.PropertyError):
+            model.add_links_from_matrix([1, 2])
+        with self.assertRaises(solver.PropertyError):
+            model.add_links_from_matrix([[0, 1], [1, 0, 2]])
+        with self.assertRaises(solver.PropertyError):
+            model.add_links_from_matrix([[0, -1], [-1, 0]])
+        with self.assertRaises(solver.PropertyError):
+            model.add_links_from_matrix([1, 2, 3], point_ids=[0, 1])
+
+    def test_backend_stand_in(self):
+        """ a stand-in backend must receive the json of the model and
+            its output must give the solution of the model """
+        backend = StandInBackend()
+        solver.set_backend(backend)
+        try:
+            self.assertIs(solver.get_backend(), backend)
+            model = small_model()
+            model.solve()
+            self.assertEqual(backend.payloads, [model.get_json()])
+            self.assertEqual(model.status, constants.OPTIMAL_SOL_FOUND)
+            self.assertEqual(model.solution.value, 8)
+            self.assertEqual(model.solution.routes[0].point_ids, [0, 1, 0])
+            self.assertEqual(model.statistics.best_lb, 8)
+        finally:
+            solver.set_backend(None)
+
+    def test_solve_async_and_submit(self):
+        """ solutions of solve_async and submit must be set in the models """
+        solver.set_backend(StandInBackend())
+        try:
+            models = [small_model() for _ in range(4)]
+
+            async def solve_all():
+                return await asyncio.gather(
+                    *(model.solve_async() for model in models[:2]))
+            solutions = asyncio.run(solve_all())
+            with concurrent.futures.ThreadPoolExecutor(2) as executor:
+                futures = [model.submit(executor) for model in models[2:]]
+                solutions += [future.result() for future in futures]
+            for model, solution in zip(models, solutions):
+                self.assertIs(model.solution, solution)
+                self.assertEqual(model.status, constants.OPTIMAL_SOL_FOUND)
+                self.assertEqual(solution.value, 8)
+                self.assertEqual(model.statistics.best_lb, 8)
+
+            # the json of the model is not written on the event loop thread
+            model = small_model()
+            threads = []
+            prepare = model._prepare
+
+            def record_prepare():
+                threads.append(threading.get_ident())
+                return prepare()
+            model._prepare = record_prepare
+
+            async def solve_one():
+                await model.solve_async()
+                return threading.get_ident()
+            loop_thread = asyncio.run(solve_one())
+            self.assertEqual(len(threads), 1)
+            self.assertNotEqual(threads[0], loop_thread)
+            self.assertEqual(model.solution.value, 8)
+        finally:
+            solver.set_backend(None)
+
+    def test_solve_many(self):
+        """ solve_many must give one result for each model """
+        models = [small_model() for _ in range(5)]
+        models.append(solver.Model())
+        results = list(parallel.solve_many(
+            models, workers=2, backend_factory=StandInBackend))
+        self.assertEqual(sorted(result.index for result in results),
+                         list(range(6)))
+        for result in results:
+            self.assertIs(result.model, models[result.index])
+            if result.index == 5:
+                self.assertEqual(result.status, constants.MIN_POINTS_ERROR)
+                self.assertIsNone(result.solution)
+            else:
+                self.assertEqual(result.status, constants.OPTIMAL_SOL_FOUND)
+                self.assertIs(result.solution, result.model.solution)
+                self.assertEqual(result.statistics.best_lb, 8)
+                self.assertGreaterEqual(result.wall_time, 0)
+
+        # a worker which dies gives errors instead of an exception
+        models[0].vehicle_types[1].name = "crash"
+        results = list(parallel.solve_many(
+            models, workers=2, backend_factory=CrashBackend))
+        self.assertEqual(sorted(result.index for result in results),
+                         list(range(6)))
+        for result in results:
+            if result.index == 0:
+                self.assertEqual(result.status, constants.BAPCOD_ERROR)
+            elif result.index == 5:
+                self.assertEqual(result.status, constants.MIN_POINTS_ERROR)
+
+    def test_solver_pool_deadline(self):
+        """ a worker exceeding the time limit must be replaced and
+            its model interrupted """
+        slow_model = small_model()
+        slow_model.vehicle_types[1].name = "slow"
+        slow_model.parameters.time_limit = 0.1
+        with parallel.SolverPool(workers=1, grace=0.2,
+                                 backend_factory=SlowBackend) as pool:
+            start = time.perf_counter()
+            result = pool.solve(slow_model)
+            self.assertLess(time.perf_counter() - start, 30)
+            self.assertEqual(result.status, constants.INTERRUPTED_BY_ERROR)
+            self.assertIsNone(result.solution)
+            self.assertEqual(slow_model.status,
+                             constants.INTERRUPTED_BY_ERROR)
+            self.assertEqual(slow_model.message,
+                             constants.DEADLINE_EXCEEDED_MESSAGE)
+            results = list(pool.solve_many([small_model(), small_model()]))
+            self.assertEqual(sorted(result.index for result in results),
+                             [0, 1])
+            for result in results:
+                self.assertEqual(result.status, constants.OPTIMAL_SOL_FOUND)
+
+    def test_solver_pool_close(self):
+        """ closing a pool must not block the threads waiting for a
+            worker """
+        slow_model = small_model()
+        slow_model.vehicle_types[1].name = "slow"
+        slow_model.parameters.time_limit = 0.5
+        pool = parallel.SolverPool(workers=1, grace=0.2,
+                                   backend_factory=SlowBackend)
+        outcomes = []
+
+        def solve(model):
+            try:
+                outcomes.append(pool.solve(model).status)
+            except ValueError:
+                outcomes.append(None)
+
+        threads = [threading.Thread(target=solve, args=(model,))
+                   for model in (slow_model, small_model())]
+        threads[0].start()
+        time.sleep(0.2)
+        threads[1].start()
+        time.sleep(0.1)
+        pool.close()
+        for thread in threads:
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+        self.assertIn(constants.INTERRUPTED_BY_ERROR, outcomes)
+        self.assertEqual(len(outcomes), 2)
+
+    def test_result_cache(self):
+        """ an identical model must get the solution stored in the cache
+            and the least recently used outputs must be deleted """
+        backend = StandInBackend()
+        solver.set_backend(backend)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                result_cache = cache.ResultCache(directory)
+                small_model().solve(cache=result_cache)
+                model = small_model()
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 1)
+                self.assertEqual(result_cache.hits, 1)
+                self.assertEqual(model.status, constants.OPTIMAL_SOL_FOUND)
+                self.assertEqual(model.solution.routes[0].point_ids,
+                                 [0, 1, 0])
+                self.assertEqual(model.statistics.best_lb, 8)
+
+                model.parameters.time_limit = 10
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 2)
+                result_cache.max_size = result_cache.size() - 1
+                result_cache.evict()
+                self.assertEqual(len(result_cache.entries()), 1)
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 2)
+
+                # an output which is not valid is replaced
+                for _, path, _ in result_cache.entries():
+                    with open(path, "wb") as file:
+                        file.write(b"{")
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 3)
+                self.assertEqual(model.status, constants.OPTIMAL_SOL_FOUND)
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 3)
+
+                # the content of the config file is part of the key
+                config_file = os.path.join(directory, "config.cfg")
+                with open(config_file, "w") as file:
+                    file.write("a")
+                model.parameters.config_file = config_file
+                model.solve(cache=result_cache)
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 4)
+                with open(config_file, "w") as file:
+                    file.write("b")
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 5)
+
+                # and the version of the backend
+                backend.version = "2"
+                model.solve(cache=result_cache)
+                self.assertEqual(len(backend.payloads), 6)
+        finally:
+            solver.set_backend(None)
+
+    def test_disk_cache_shared(self):
+        """ the files written by other processes must count in the size
+            of the cache """
+        with tempfile.TemporaryDirectory() as directory:
+            caches = [cache.DiskCache(directory, 250) for _ in range(2)]
+            for i in range(3):
+                for c, disk_cache in enumerate(caches):
+                    disk_cache.write(str(c) + str(i), bytes(50))
+            self.assertLessEqual(caches[0].size(), 250)
+            self.assertEqual(len(caches[0].entries()), 5)
+
+    def test_matrix_cache(self):
+        """ the matrices must be computed once, memory mapped and read
+            only, and be given to the models without conversion """
+        rand = random.Random(8)
+        coordinates = [(rand.uniform(0, 100), rand.uniform(0, 100))
+                       for _ in range(31)]
+        with tempfile.TemporaryDirectory() as directory:
+            matrix_cache = cache.MatrixCache(directory)
+            matrix = matrix_cache.distance_matrix(coordinates,
+                                                  rounding="round")
+            self.assertEqual(matrix_cache.misses, 1)
+            self.assertIsInstance(matrix, np.memmap)
+            self.assertFalse(matrix.flags.writeable)
+            np.testing.assert_array_equal(matrix, geometry.distance_matrix(
+                coordinates, rounding="round"))
+            other_cache = cache.MatrixCache(directory)
+            other_cache.distance_matrix(np.array(coordinates),
+                                        rounding="round")
+            self.assertEqual(other_cache.hits, 1)
+            other_cache.distance_matrix(coordinates)
+            self.assertEqual(other_cache.misses, 1)
+            packed = matrix_cache.packed_distances(coordinates)
+            np.testing.assert_array_equal(
+                packed, geometry.upper_triangle(
+                    matrix_cache.distance_matrix(coordinates)))
+            self.assertEqual(len(matrix_cache.entries()), 3)
+
+            model = solver.Model()
+            model.add_links_from_matrix(distance=packed)
+            self.assertEqual(len(model.links), 30 * 31 // 2)
+
+            model = random_decomposed_model(60, 9)
+            model.cache = matrix_cache
+            model.solve(max_cluster_size=30, workers=2,
+                        backend_factory=LocalSearchBackend)
+            value = model.solution.value
+            self.assertEqual(len(matrix_cache.entries()), 4)
+            model.cache = None
+            model.solve(max_cluster_size=30, workers=2,
+                        backend_factory=LocalSearchBackend)
+            self.assertAlmostEqual(model.solution.value, value)
+
+            matrix_cache.max_size = 0
+            matrix_cache.evict()
+            self.assertEqual(matrix_cache.size(), 0)
+
+    def test_savings(self):
+        """ the savings heuristic must give feasible routes """
+        model = random_model(30, 1)
+        solution = savings.savings(model)
+        check_routes(self, model, solution)
+        self.assertLess(len(solution.routes), 30)
+
+        model = random_model(30, 2, time_windows=True)
+        check_routes(self, model, savings.savings(model))
+
+        model.add_vehicle_type(2, 0, 0, capacity=30, max_number=30,
+                               var_cost_dist=2)
+        for i in range(1, 31, 2):
+            model.points[i].incompatible_vehicles = [1]
+        solution = savings.savings(model)
+        check_routes(self, model, solution)
+        self.assertTrue(any(route.vehicle_type_id == 2
+                            for route in solution.routes))
+
+        model.vehicle_types[1].max_number = 0
+        model.vehicle_types[2].max_number = 0
+        self.assertIsNone(savings.savings(model))
+
+    def test_local_search(self):
+        """ the local search must give feasible routes not worse than
+            the routes given """
+        for seed, time_windows in ((4, False), (5, True)):
+            model = random_model(60, seed, time_windows=time_windows)
+            model.add_vehicle_type(2, 0, 0, capacity=40, max_number=60,
+                                   var_cost_dist=1.5, fixed_cost=5)
+            for i in range(1, 61, 3):
+                model.points[i].incompatible_vehicles = [1]
+            initial = savings.savings(model)
+            solution = local_search.local_search(model, initial)
+            check_routes(self, model, solution)
+            self.assertLessEqual(solution.value, initial.value + 1e-6)
+        self.assertLess(local_search.local_search(random_model(60, 0)).value,
+                        savings.savings(random_model(60, 0)).value)
+
+    def test_auto_upper_bound(self):
+        """ the upper bound must be given by the savings heuristic and its
+            solution kept if the solver does not find a better one """
+        class NoBetterBackend(StandInBackend):
+            def solve(self, payload):
+                self.payloads.append(payload)
+                return json.dumps({
+                    "Status": {"code": constants.BETTER_SOL_DOES_NOT_EXISTS,
+                               "message": "BETTER_SOL_DOES_NOT_EXISTS"},
+                    "Solution": {"bestSolutionValue": 0, "Routes": []},
+                    "Statistics": {"solutionTime": 0, "solutionValue": 0,
+                                   "bestLB": 0, "rootLB": 0, "rootTime": 0,
+                                   "nbBranchAndBoundNodes": 1}})
+
+        backend = NoBetterBackend()
+        solver.set_backend(backend)
+        try:
+            model = random_model(10, 3)
+            value = local_search.local_search(model).value
+            model.solve(auto_upper_bound=True)
+            self.assertEqual(json.loads(backend.payloads[0])["Parameters"]
+                             ["upperBound"], value)
+            self.assertEqual(model.parameters.upper_bound, 1000000)
+            self.assertEqual(model.solution.value, value)
+            check_routes(self, model, model.solution)
+        finally:
+            solver.set_backend(None)
+
+    def test_sparsify_links(self):
+        """ sparsify_links must keep the nearest and the depot links, and
+            the links must be restored if the sparse model is infeasible """
+        model = random_model(30, 6)
+        report = model.sparsify_links(5)
+        self.assertEqual(report.nb_links, 465)
+        self.assertGreater(report.nb_removed_links, 300)
+        self.assertEqual(len(model.links),
+                         report.nb_links - report.nb_removed_links)
+        self.assertEqual(model.presolve_reports, [report])
+        links = [(link["startPointId"], link["endPointId"])
+                 for link in model.links.values()]
+        self.assertEqual(sum(1 for start, _ in links if start == 0), 30)
+        for i in range(1, 31):
+            self.assertGreaterEqual(sum(1 for link in links if i in link), 6)
+
+        backend = SparseInfeasibleBackend()
+        solver.set_backend(backend)
+        try:
+            model.solve()
+            self.assertEqual(len(backend.payloads), 2)
+            self.assertEqual(len(json.loads(backend.payloads[1])["Links"]),
+                             465)
+            self.assertEqual(model.status, constants.OPTIMAL_SOL_FOUND)
+            self.assertEqual(model.links.nb_restorable(), 0)
+
+            # the links are also restored by the other ways of solving
+            def sparse_model():
+                model = random_model(30, 6)
+                model.sparsify_links(5)
+                return model
+
+            models = [sparse_model() for _ in range(2)]
+            with concurrent.futures.ThreadPoolExecutor(1) as executor:
+                self.assertTrue(
+                    models[0].submit(executor).result().is_defined())
+            asyncio.run(models[1].solve_async())
+            results = list(parallel.solve_many(
+                [sparse_model() for _ in range(2)], workers=2,
+                backend_factory=SparseInfeasibleBackend))
+            with parallel.SolverPool(
+                    workers=1,
+                    backend_factory=SparseInfeasibleBackend) as pool:
+                results.append(pool.solve(sparse_model()))
+            models += [result.model for result in results]
+            for model in models:
+                self.assertEqual(model.status, constants.OPTIMAL_SOL_FOUND)
+                self.assertEqual(model.links.nb_restorable(), 0)
+                self.assertEqual(len(model.links), 465)
+        finally:
+            solver.set_backend(None)
+
+    def test_eliminate_capacity_links(self):
+        """ links and points exceeding the capacities of the vehicle types
+            able to visit them must be removed """
+        model = solver.Model()
+        model.add_vehicle_type(1, 0, 0, capacity=10)
+        model.add_vehicle_type(2, 0, 0, capacity=20)
+        model.add_depot(0)
+        model.add_customer(1, demand=8)
+        model.add_customer(2, demand=8)
+        model.add_customer(3, demand=15)
+        model.add_customer(4, demand=5, incompatible_vehicles=[2])
+        model.add_customer(5, demand=30, penalty=100)
+        model.add_customer(6, id_customer=1, demand=25)
+        model.add_links_from_matrix([[1] * 7 for _ in range(7)])
+        report = model.eliminate_capacity_links()
+        self.assertEqual(report.nb_links, 21)
+        # 1-3, 2-3, 3-4, 1-4, 2-4 and all links of 5 and 6
+        self.assertEqual(report.nb_removed_links, 5 + 6 + 5)
+        self.assertEqual(report.details["nb_removed_points"], 1)
+        self.assertEqual(report.details["unserved_customers"], [5])
+        self.assertNotIn(6, model.points)
+        self.assertEqual(sorted((link["startPointId"], link["endPointId"])
+                                for link in model.links.values()),
+                         [(0, 1), (0, 2), (0, 3), (0, 4), (1, 2)])
+
+        model.add_customer(7, demand=21)
+        with self.assertRaises(solver.ModelError) as error:
+            model.eliminate_capacity_links()
+        self.assertEqual(error.exception.code, constants.CAPACITY_ERROR)
+
+    def test_tighten_time_windows(self):
+        """ the time windows must be tightened and the links removed or
+            directed without losing feasible routes """
+        model = random_model(40, 7, time_windows=True)
+        model.add_vehicle_type(2, 0, 0, capacity=40, max_number=40,
+                               var_cost_dist=1, tw_begin=50, tw_end=700)
+        for i in range(1, 41, 4):
+            model.points[i].incompatible_vehicles = [1]
+        data = routing.RoutingData(model)
+        routes = data.routes(local_search.local_search(model))
+        report = model.tighten_time_windows()
+        self.assertGreater(report.details["nb_tightened_points"], 0)
+        self.assertGreater(report.details["nb_directed_links"], 0)
+        tightened = routing.RoutingData(model)
+        for k, route in routes:
+            self.assertAlmostEqual(tightened.route_cost(k, route),
+                                   data.route_cost(k, route))
+
+        model = solver.Model()
+        model.add_vehicle_type(1, 0, 0, capacity=10, tw_end=100)
+        model.add_depot(0, tw_end=100)
+        model.add_customer(1, demand=1, tw_end=40)
+        model.add_customer(2, demand=1, tw_begin=40, tw_end=50,
+                           penalty=10)
+        model.add_customer(3, demand=1, tw_end=100)
+        model.add_link(0, 1, time=20)
+        model.add_link(0, 2, time=30)
+        model.add_link(0, 3, time=10)
+        model.add_link(1, 2, time=5)
+        model.add_link(2, 3, time=70)
+        report = model.tighten_time_windows()
+        self.assertEqual(report.details["unserved_customers"], [])
+        self.assertEqual(model.points[1].time_windows, (20.0, 40))
+        self.assertEqual(model.points[2].time_windows, (40, 50))
+        self.assertEqual(model.points[3].time_windows, (10.0, 90.0))
+        # 2-3 is too long, 1-2 can only be used from 1 to 2
+        self.assertEqual(report.nb_removed_links, 1)
+        self.assertNotIn((2, 3), model.links)
+        self.assertEqual(report.details["nb_directed_links"], 1)
+        self.assertEqual(model.links[1, 2][0].is_directed, True)
+
+        model.points[2].tw_end = 30
+        report = model.tighten_time_windows()
+        self.assertEqual(report.details["unserved_customers"], [2])
+        model.points[1].tw_end = 10
+        with self.assertRaises(solver.ModelError) as error:
+            model.tighten_time_windows()
+        self.assertEqual(error.exception.code, constants.TIME_WINDOWS_ERROR)
+
+    def test_bound_fleet(self):
+        """ the numbers of vehicles must be clipped to the customers they
+            can visit and bounded below by capacities and time windows """
+        model = solver.Model()
+        model.add_vehicle_type(1, 0, 0, capacity=10, max_number=5)
+        model.add_vehicle_type(2, 0, 0, capacity=20, max_number=5)
+        model.add_vehicle_type(3, 0, 0, capacity=10, max_number=5)
+        model.add_depot(0)
+        for i in range(1, 5):
+            model.add_customer(i, demand=8, incompatible_vehicles=[3])
+        model.points[4].incompatible_vehicles = [2, 3]
+        model.add_links_from_matrix([[1] * 5 for _ in range(5)])
+        report = model.bound_fleet()
+        self.assertEqual(model.vehicle_types[1].max_number, 4)
+        self.assertEqual(model.vehicle_types[2].max_number, 3)
+        self.assertEqual(model.max_total_vehicles_number, 4)
+        self.assertEqual(report.details["capacity_bound"], 2)
+        self.assertEqual(report.details["time_windows_bound"], 0)
+        # the type which can visit no customer is not given to the solver
+        self.assertEqual(report.details["removed_vehicle_types"], [3])
+        data = json.loads(model.get_json())
+        self.assertEqual([(vehicle["id"], vehicle["maxNumber"])
+                          for vehicle in data["VehicleTypes"]],
+                         [(1, 4), (2, 3)])
+        self.assertEqual(data["Points"][4]["incompatibleVehicles"], [2])
+        self.assertNotIn("incompatibleVehicles", data["Points"][1])
+
+        model.vehicle_types[1].max_number = 3
+        model.vehicle_types[2].max_number = 0
+        with self.assertRaises(solver.ModelError) as error:
+            model.bound_fleet()
+        self.assertEqual(error.exception.code, constants.FLEET_ERROR)
+
+        model = solver.Model()
+        model.add_vehicle_type(1, 0, 0, capacity=10, max_number=5)
+        model.add_depot(0)
+        for i in range(1, 4):
+            model.add_customer(i, demand=1, tw_begin=100 * i,
+                               tw_end=100 * i + 10)
+        model.add_links_from_matrix([[500] * 4 for _ in range(4)],
+                                    time=[[500] * 4 for _ in range(4)])
+        report = model.bound_fleet()
+        self.assertEqual(report.details["time_windows_bound"], 3)
+        self.assertEqual(report.details["min_nb_vehicles"], 3)
+        model.set_max_total_vehicles_number(2)
+        with self.assertRaises(solver.ModelError) as error:
+            model.bound_fleet()
+        self.assertEqual(error.exception.code, constants.FLEET_ERROR)
+
+    def test_compute_lower_bounds(self):
+        """ quick bounds must be lower than heuristic solutions and kept
+            in the statistics after the resolution """
+        for seed in range(3):
+            model = random_model(30, seed, capacity=20)
+            lower_bound = model.compute_lower_bounds()
+            self.assertGreater(lower_bound, 0)
+            value = local_search.local_search(model).value
+            self.assertLessEqual(lower_bound, value)
+            self.assertEqual(model.statistics.quick_lb, lower_bound)
+            self.assertGreaterEqual(model.statistics.quick_gap(value), 0)
+            self.assertEqual(model.statistics.min_nb_vehicles, -(-sum(
+                point.demand for point in dict.values(model.points)) // 20))
+
+        model = small_model()
+        model.vehicle_types[1].var_cost_dist = 1
+        # route 0-1-0 of cost 8
+        self.assertEqual(model.compute_lower_bounds(), 8)
+        solver.set_backend(StandInBackend())
+        try:
+            model.solve()
+        finally:
+            solver.set_backend(None)
+        self.assertEqual(model.statistics.quick_lb, 8)
+        self.assertEqual(model.statistics.quick_gap(8), 0)
+
+        # the bounds are computed again when the model changes
+        model.delete_link(0, 1)
+        model.add_link(0, 1, distance=1)
+        solver.set_backend(StandInBackend())
+        try:
+            model.solve()
+        finally:
+            solver.set_backend(None)
+        self.assertEqual(model.statistics.quick_lb, 2)
+        model.vehicle_types[1].max_number = 0
+        self.assertEqual(model.compute_lower_bounds(), float("inf"))
+        self.assertEqual(model.statistics.min_nb_vehicles, float("inf"))
+        model.vehicle_types[1].max_number = 1
+        model.points[1].penalty = 5
+        self.assertIsNone(model.compute_lower_bounds())
+        model.points[1].penalty = 0
+        model.points[1].demand = 20
+        self.assertEqual(model.compute_lower_bounds(), float("inf"))
+
+    def test_decomposed_model(self):
+        """ the clusters must be solved and their routes must visit each
+            customer once with the ids of the decomposed model """
+        for method in constants.CLUSTERING_METHODS:
+            model = random_decomposed_model(80, 6)
+            model.solve(method=method, max_cluster_size=30, workers=2,
+                        backend_factory=LocalSearchBackend)
+            self.assertEqual(model.status, constants.FEASIBLE_SOL_FOUND)
+            self.assertEqual(len(model.results), len(model.clusters))
+            self.assertTrue(all(len(cluster) <= 30
+                                for cluster in model.clusters))
+            self.assertEqual(sorted(i for cluster in model.clusters
+                                    for i in cluster), list(range(1, 81)))
+            visited = []
+            for route in model.solution.routes:
+                self.assertEqual(route.point_ids[0], 0)
+                self.assertEqual(route.point_ids[-1], 0)
+                self.assertLessEqual(sum(model.customers[i].demand
+                                         for i in route.point_ids[1:-1]),
+                                     30)
+                visited.extend(route.point_ids[1:-1])
+            self.assertEqual(sorted(visited), list(range(1, 81)))
+            self.assertAlmostEqual(model.solution.value, sum(
+                route.route_cost for route in model.solution.routes))
+
+        value = model.solution.value
+        model.solve(method="kmedoids", max_cluster_size=30, workers=2,
+                    refine=True, backend_factory=LocalSearchBackend)
+        self.assertLessEqual(model.solution.value, value + 1e-6)
+        self.assertEqual(sorted(i for route in model.solution.routes
+                                for i in route.point_ids[1:-1]),
+                         list(range(1, 81)))
+
+        # each cluster gets the vehicles it needs before the others are
+        # shared, the fleet is checked before solving
+        model = random_decomposed_model(200, 3, capacity=100)
+        model.solve(method="sweep", max_cluster_size=25,
+                    backend_factory=LocalSearchBackend)
+        needed = sum(-(-sum(point.demand
+                            for point in dict.values(result.model.points))
+                       // 100) for result in model.results)
+        model.vehicle_types[1].max_number = needed
+        model.solve(method="sweep", max_cluster_size=25,
+                    backend_factory=LocalSearchBackend)
+        self.assertEqual(model.status, constants.FEASIBLE_SOL_FOUND)
+        results = model.results
+        model.vehicle_types[1].max_number = needed - 1
+        with self.assertRaises(solver.ModelError) as error:
+            model.solve(method="sweep", max_cluster_size=25,
+                        backend_factory=LocalSearchBackend)
+        self.assertEqual(error.exception.code, constants.FLEET_ERROR)
+        self.assertIs(model.results, results)
+
+        # a type without vehicle in a cluster is left out of its model,
+        # as a maximum number of 0 is not written in the json
+        model = random_decomposed_model(300, 4, capacity=100)
+        model.vehicle_types[1].max_number = 40
+        model.add_vehicle_type(2, 0, 0, capacity=300, max_number=2,
+                               var_cost_dist=2)
+        model.solve(method="sweep", max_cluster_size=50,
+                    backend_factory=LocalSearchBackend)
+        self.assertEqual(model.status, constants.FEASIBLE_SOL_FOUND)
+        numbers = {1: 0, 2: 0}
+        for result in model.results:
+            for vehicle in json.loads(
+                    result.model.get_json())["VehicleTypes"]:
+                self.assertGreater(vehicle["maxNumber"], 0)
+                numbers[vehicle["id"]] += vehicle["maxNumber"]
+        self.assertEqual(numbers, {1: 40, 2: 2})
+
+        # each cluster needs a vehicle, even without demand
+        model = random_decomposed_model(6, 1)
+        for customer in model.customers.values():
+            customer.demand = 0
+        model.vehicle_types[1].max_number = 1
+        with self.assertRaises(solver.ModelError) as error:
+            model.solve(method="sweep", max_cluster_size=2,
+                        backend_factory=LocalSearchBackend)
+        self.assertEqual(error.exception.code, constants.FLEET_ERROR)
+
+        model = random_decomposed_model(1500, 7)
+        self.assertEqual(len(model.customers), 1500)
+        with self.assertRaises(solver.PropertyError):
+            model.solve(method="random")
+        with self.assertRaises(solver.PropertyError):
+            model.solve(max_cluster_size=1022)
+        model.coordinates = model.coordinates[1:]
+        with self.assertRaises(solver.ModelError):
+            model.solve()
+
+    def test_decomposed_model_improve(self):
+        """ the improved solution must visit each customer once and must not
+            be worse than the solution given """
+        model = random_decomposed_model(120, 8)
+        with self.assertRaises(solver.ModelError):
+            model.improve()
+        model.solve(method="sweep", max_cluster_size=40, workers=2,
+                    backend_factory=LocalSearchBackend)
+        solution = model.solution
+        nb_improvements = model.improve(routes_per_subproblem=3,
+                                        max_subproblems=12, workers=2,
+                                        backend_factory=LocalSearchBackend)
+        self.assertGreater(nb_improvements, 0)
+        self.assertLess(model.solution.value, solution.value)
+        self.assertEqual(sorted(i for route in model.solution.routes
+                                for i in route.point_ids[1:-1]),
+                         list(range(1, 121)))
+        self.assertAlmostEqual(model.solution.value, sum(
+            route.route_cost for route in model.solution.routes))
+
+        # a subproblem has only the vehicles of its routes
+        model.add_vehicle_type(2, 0, 0, capacity=60, max_number=1,
+                               var_cost_dist=3)
+        routes = model._DecomposedModel__solution_routes[:2]
+        subproblem, _, _ = model._DecomposedModel__routes_model(routes, 10)
+        self.assertEqual(json.loads(subproblem.get_json())["VehicleTypes"],
+                         [{"id": 1, "startPointId": 0, "endPointId": 0,
+                           "capacity": 30, "varCostDist": 1,
+                           "maxNumber": 2}])
+
+        model.improve(solution, routes_per_subproblem=3, max_subproblems=2,
+                      workers=2, backend_factory=LocalSearchBackend)
+        self.assertLessEqual(model.solution.value, solution.value + 1e-6)
+        self.assertEqual(sorted(i for route in model.solution.routes
+                                for i in route.point_ids[1:-1]),
+                         list(range(1, 121)))
+
+    def test_prune_parallel_links(self):
+        """ dominated parallel links must be removed and identical links
+            of opposite directions merged """
+        model = small_model()
+        model.add_customer(2, demand=1)
+        model.add_customer(3, demand=1)
+        model.add_link(0, 1, distance=3, time=1, fixed_cost=5)
+        model.add_link(1, 0, distance=6)
+        model.add_link(0, 1, distance=4)
+        model.add_link(1, 2, distance=3, is_directed=True)
+        model.add_link(2, 1, distance=3, is_directed=True)
+        model.add_link(2, 3, distance=3, is_directed=True)
+        model.add_link(3, 2, distance=4, is_directed=True)
+        model.add_link(2, 3, distance=4, is_directed=True)
+        report = model.prune_parallel_links()
+        self.assertEqual(report.nb_removed_links, 4)
+        self.assertEqual(report.details["nb_dominated_links"], 3)
+        self.assertEqual(report.details["nb_merged_links"], 1)
+        self.assertEqual(
+            sorted((link["startPointId"], link["endPointId"],
+                    link.get("isDirected", False), link.get("distance"),
+                    link.get("time", 0))
+                   for link in model.links.values()),
+            [(0, 1, False, 3.0, 1.0), (0, 1, False, 4.0, 0),
+             (1, 2, False, 3.0, 0), (2, 3, True, 3.0, 0),
+             (3, 2, True, 4.0, 0)])
+
     def test_solution(self):
         """ test class solution after resolving a cvrptw problem """
         dist_max = 15